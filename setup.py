@@ -25,6 +25,11 @@ setup(
         ],
     packages=find_packages(),
     install_requires=requirements,
+    extras_require={
+        "prometheus": ["prometheus-client"],
+        "msgpack": ["msgpack"],
+        "socks": ["httpx[socks]"]
+        },
     classifiers=[
         "Development Status :: 5 - Production/Stable",
         "Intended Audience :: Developers",
@@ -1,4 +1,5 @@
 from ._version import __version__
 
 from .client import NyaaClient
-from .rss import NyaaRSSClient
\ No newline at end of file
+from .rss import NyaaRSSClient
+from .sync import NyaaSyncClient
\ No newline at end of file
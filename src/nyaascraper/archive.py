@@ -0,0 +1,537 @@
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from queue import Queue
+from typing import Any, BinaryIO, Iterator
+from urllib.parse import urlsplit, parse_qs
+import json
+import multiprocessing
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+
+from .enums import SITE
+from .models import SearchResult, TorrentInfo, NyaaRSSFeed
+
+_FRAME = struct.Struct(">I")
+
+_PendingPage = tuple[str, str, int, bytes, float, Future]
+
+@dataclass
+class ArchiveEntry:
+    """
+    An index entry of an archived page.
+    
+    Attributes:
+        id (int): The ID of the entry, in archive order.
+        url (str): The URL of the page, including the query.
+        kind (str): The kind of the page, "search", "view" or "feed".
+        fetched (float): The Unix time the page was fetched at.
+        status (int): The status code of the response.
+        segment (str): The file name of the segment holding the page.
+        offset (int): The offset of the page record in the segment.
+        length (int): The length of the page record.
+    """
+    id: int
+    url: str
+    kind: str
+    fetched: float
+    status: int
+    segment: str
+    offset: int
+    length: int
+
+@dataclass
+class ArchivedPage:
+    """
+    A raw page read from the archive.
+    
+    Attributes:
+        url (str): The URL of the page, including the query.
+        kind (str): The kind of the page, "search", "view" or "feed".
+        fetched (float): The Unix time the page was fetched at.
+        status (int): The status code of the response.
+        content (bytes): The body of the response.
+    """
+    url: str
+    kind: str
+    fetched: float
+    status: int
+    content: bytes
+
+@dataclass
+class ReparsedPage:
+    """
+    The result of parsing an archived page again.
+    
+    Attributes:
+        url (str): The URL of the page.
+        kind (str): The kind of the page.
+        fetched (float): The Unix time the page was fetched at.
+        result (SearchResult | TorrentInfo | NyaaRSSFeed | None): The parsed page, or None if parsing failed.
+        error (str | None): A description of the parse error, if any.
+    """
+    url: str
+    kind: str
+    fetched: float
+    result: SearchResult | TorrentInfo | NyaaRSSFeed | None
+    error: str | None = None
+
+class PageArchive:
+    """
+    Append-only archive of raw responses.
+    
+    Pages are compressed one by one and appended to segment files, and an SQLite index maps each
+    URL and fetch time to the segment and offset of its record, so any page can be read without
+    decompressing the rest. Every writer appends to segments of its own, so several processes can
+    archive into the same directory. Records are self-describing; the index can be rebuilt from the
+    segments with `rebuild_index()`.
+    
+    Pages are compressed, written and indexed by a background thread, which commits up to
+    WRITE_BATCH_SIZE queued pages at once, so `append()` doesn't block the event loop. The archive
+    can be used from any thread.
+    """
+    SEGMENT_SIZE: int = 64 * 1024 * 1024
+    COMPRESSION_LEVEL: int = 6
+    WRITE_BATCH_SIZE: int = 64
+    INDEX_NAME: str = "index.sqlite"
+    
+    def __init__(
+        self: "PageArchive",
+        directory: str,
+        segment_size: int = SEGMENT_SIZE,
+        compression_level: int = COMPRESSION_LEVEL,
+        write_batch_size: int = WRITE_BATCH_SIZE
+        ) -> None:
+        """
+        Open or create an archive.
+        
+        Parameters:
+            directory (str): The directory of the archive.
+            segment_size (int, optional): The size in bytes after which a new segment is started. Defaults to SEGMENT_SIZE.
+            compression_level (int, optional): The zlib compression level of pages. Defaults to COMPRESSION_LEVEL.
+            write_batch_size (int, optional): The maximum number of pages indexed in one commit. Defaults to WRITE_BATCH_SIZE.
+        """
+        self.directory = directory
+        self.segment_size = segment_size
+        self.compression_level = compression_level
+        self.write_batch_size = write_batch_size
+        
+        os.makedirs(directory, exist_ok=True)
+        self._connection = self._connect()
+        self._connection_lock = threading.Lock()
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                fetched REAL NOT NULL,
+                status INTEGER NOT NULL,
+                segment TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_url ON pages (url, fetched);
+            CREATE INDEX IF NOT EXISTS pages_kind ON pages (kind, id);
+            """
+            )
+        
+        self._segment: str | None = None
+        self._segment_file: BinaryIO | None = None
+        self._segment_count: int = 0
+        self._pending: Queue[_PendingPage | None] = Queue()
+        self._writer: threading.Thread | None = None
+        self._writer_lock = threading.Lock()
+    
+    def _connect(self: "PageArchive") -> sqlite3.Connection:
+        """
+        Open a connection to the index.
+        """
+        connection = sqlite3.connect(
+            os.path.join(self.directory, self.INDEX_NAME), timeout=60, isolation_level=None, check_same_thread=False
+            )
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+    
+    def close(self: "PageArchive") -> None:
+        """
+        Store the pages still queued and close the archive.
+        """
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._pending.put(None)
+        if writer is not None:
+            writer.join()
+        with self._connection_lock:
+            self._connection.close()
+    
+    def flush(self: "PageArchive") -> None:
+        """
+        Wait until all queued pages are written and indexed.
+        """
+        if self._writer is not None:
+            self._pending.join()
+    
+    def _writable_segment(self: "PageArchive") -> BinaryIO:
+        """
+        Get the segment to append to, starting a new one if the current one is full.
+        """
+        if self._segment_file is not None and self._segment_file.tell() >= self.segment_size:
+            self._segment_file.close()
+            self._segment_file = None
+        
+        if self._segment_file is None:
+            self._segment = f"{time.time_ns()}-{os.getpid()}-{self._segment_count}.seg"
+            self._segment_count += 1
+            self._segment_file = open(os.path.join(self.directory, self._segment), "ab")
+        return self._segment_file
+    
+    def append(
+        self: "PageArchive",
+        kind: str,
+        url: str,
+        status: int,
+        content: bytes,
+        fetched: float | None = None
+        ) -> Future[ArchiveEntry]:
+        """
+        Queue a page to be appended to the archive by the writer thread.
+        
+        Parameters:
+            kind (str): The kind of the page, "search", "view" or "feed".
+            url (str): The URL of the page, including the query.
+            status (int): The status code of the response.
+            content (bytes): The body of the response.
+            fetched (float | None, optional): The Unix time the page was fetched at. If not specified, the current time is used. Defaults to None.
+        
+        Returns:
+            Future[ArchiveEntry]: Resolves to the index entry of the page once it is stored.
+        """
+        future: Future[ArchiveEntry] = Future()
+        fetched = time.time() if fetched is None else fetched
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_pending, name="PageArchive writer", daemon=True)
+                self._writer.start()
+            self._pending.put((kind, url, status, content, fetched, future))
+        return future
+    
+    def _write_pending(self: "PageArchive") -> None:
+        """
+        Write queued pages in batches until the archive is closed. Runs in the writer thread.
+        """
+        connection = self._connect()
+        try:
+            closing = False
+            while not closing:
+                batch: list[_PendingPage] = []
+                page = self._pending.get()
+                while page is not None:
+                    batch.append(page)
+                    if len(batch) >= self.write_batch_size or self._pending.empty():
+                        break
+                    page = self._pending.get_nowait()
+                if page is None:
+                    closing = True
+                    self._pending.task_done()
+                
+                if batch:
+                    self._write_batch(connection, batch)
+        finally:
+            if self._segment_file is not None:
+                self._segment_file.close()
+                self._segment_file = None
+            connection.close()
+    
+    def _write_batch(self: "PageArchive", connection: sqlite3.Connection, batch: list[_PendingPage]) -> None:
+        """
+        Append a batch of pages to the current segment and index them in one commit.
+        """
+        entries: list[ArchiveEntry] = []
+        try:
+            for kind, url, status, content, fetched, _ in batch:
+                header = json.dumps({"url": url, "kind": kind, "fetched": fetched, "status": status}).encode()
+                record = zlib.compress(header + b"\n" + content, self.compression_level)
+                
+                segment_file = self._writable_segment()
+                offset = segment_file.tell()
+                segment_file.write(_FRAME.pack(len(record)) + record)
+                entry = ArchiveEntry(
+                    id=0,
+                    url=url,
+                    kind=kind,
+                    fetched=fetched,
+                    status=status,
+                    segment=self._segment,
+                    offset=offset,
+                    length=_FRAME.size + len(record)
+                    )
+                entries.append(entry)
+            self._segment_file.flush()
+            
+            connection.execute("BEGIN")
+            try:
+                for entry in entries:
+                    entry.id = connection.execute(
+                        "INSERT INTO pages (url, kind, fetched, status, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (entry.url, entry.kind, entry.fetched, entry.status, entry.segment, entry.offset, entry.length)
+                        ).lastrowid
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        except Exception as exc:
+            for *_, future in batch:
+                future.set_exception(exc)
+        else:
+            for entry, (*_, future) in zip(entries, batch):
+                future.set_result(entry)
+        finally:
+            for _ in batch:
+                self._pending.task_done()
+    
+    def entries(
+        self: "PageArchive",
+        kind: str | None = None,
+        url: str | None = None,
+        latest: bool = False
+        ) -> Iterator[ArchiveEntry]:
+        """
+        Iterate over index entries, in archive order.
+        
+        Parameters:
+            kind (str | None, optional): Only yield entries of pages of this kind. Defaults to None.
+            url (str | None, optional): Only yield entries of this URL. Defaults to None.
+            latest (bool, optional): Whether to only yield the latest fetch of each URL. Defaults to False.
+        
+        Returns:
+            Iterator[ArchiveEntry]: The entries.
+        """
+        self.flush()
+        conditions: list[str] = []
+        params: list[Any] = []
+        if kind is not None:
+            conditions.append("kind = ?")
+            params.append(kind)
+        if url is not None:
+            conditions.append("url = ?")
+            params.append(url)
+        if latest:
+            conditions.append("id = (SELECT latest.id FROM pages AS latest WHERE latest.url = pages.url ORDER BY latest.fetched DESC, latest.id DESC LIMIT 1)")
+        
+        query = "SELECT id, url, kind, fetched, status, segment, offset, length FROM pages"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        with self._connection_lock:
+            rows = self._connection.execute(query + " ORDER BY id", params).fetchall()
+        for row in rows:
+            yield ArchiveEntry(*row)
+    
+    def get(self: "PageArchive", url: str, at: float | None = None) -> ArchivedPage | None:
+        """
+        Read the latest fetch of a URL.
+        
+        Parameters:
+            url (str): The URL of the page, including the query.
+            at (float | None, optional): If specified, the latest fetch at or before this Unix time is read instead. Defaults to None.
+        
+        Returns:
+            ArchivedPage | None: The page, or None if the URL was not archived (by that time).
+        """
+        self.flush()
+        with self._connection_lock:
+            row = self._connection.execute(
+                """
+                SELECT id, url, kind, fetched, status, segment, offset, length FROM pages
+                WHERE url = ? AND fetched <= ? ORDER BY fetched DESC, id DESC LIMIT 1
+                """,
+                (url, float("inf") if at is None else at)
+                ).fetchone()
+        return self.read(ArchiveEntry(*row)) if row else None
+    
+    def read(self: "PageArchive", entry: ArchiveEntry) -> ArchivedPage:
+        """
+        Read the page of an index entry.
+        
+        Parameters:
+            entry (ArchiveEntry): The index entry.
+        
+        Returns:
+            ArchivedPage: The page.
+        """
+        with open(os.path.join(self.directory, entry.segment), "rb") as file:
+            file.seek(entry.offset)
+            return _decode_record(file.read(entry.length)[_FRAME.size:])
+    
+    def rebuild_index(self: "PageArchive") -> int:
+        """
+        Rebuild the index from the segment files, e.g. after it was lost or a writer crashed
+        between writing a page and indexing it. A truncated record at the end of a segment is skipped.
+        
+        Returns:
+            int: The number of pages indexed.
+        """
+        self.flush()
+        count = 0
+        segments = sorted(name for name in os.listdir(self.directory) if name.endswith(".seg"))
+        with self._connection_lock, self._connection:
+            self._connection.execute("DELETE FROM pages")
+            for segment in segments:
+                with open(os.path.join(self.directory, segment), "rb") as file:
+                    while len(frame := file.read(_FRAME.size)) == _FRAME.size:
+                        offset = file.tell() - _FRAME.size
+                        (length,) = _FRAME.unpack(frame)
+                        record = file.read(length)
+                        if len(record) < length:
+                            break
+                        try:
+                            page = _decode_record(record)
+                        except (zlib.error, ValueError):
+                            break
+                        self._connection.execute(
+                            "INSERT INTO pages (url, kind, fetched, status, segment, offset, length) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            (page.url, page.kind, page.fetched, page.status, segment, offset, _FRAME.size + length)
+                            )
+                        count += 1
+        return count
+
+def _decode_record(record: bytes) -> ArchivedPage:
+    """
+    Decode a compressed page record.
+    """
+    header, _, content = zlib.decompress(record).partition(b"\n")
+    fields = json.loads(header)
+    return ArchivedPage(
+        url=fields["url"],
+        kind=fields["kind"],
+        fetched=fields["fetched"],
+        status=fields["status"],
+        content=content
+        )
+
+def _site_of(url: str) -> SITE:
+    """
+    Get the site a URL belongs to.
+    """
+    for site in SITE:
+        if url == site.value or url.startswith(site.value + "/") or url.startswith(site.value + "?"):
+            return site
+    raise ValueError(f"URL '{url}' is not of a known site")
+
+def _reparse_chunk(directory: str, entries: list[ArchiveEntry]) -> list[ReparsedPage]:
+    """
+    Parse archived pages with the current parsers. Runs in a worker process.
+    """
+    from .client import NyaaClient
+    from .rss import NyaaRSSClient
+    
+    clients: dict[tuple[str, SITE], NyaaClient | NyaaRSSClient] = {}
+    files: dict[str, BinaryIO] = {}
+    pages: list[ReparsedPage] = []
+    try:
+        for entry in entries:
+            try:
+                if entry.segment not in files:
+                    files[entry.segment] = open(os.path.join(directory, entry.segment), "rb")
+                file = files[entry.segment]
+                file.seek(entry.offset)
+                page = _decode_record(file.read(entry.length)[_FRAME.size:])
+                
+                site = _site_of(page.url)
+                client_class = NyaaRSSClient if page.kind == "feed" else NyaaClient
+                if (page.kind, site) not in clients:
+                    clients[page.kind, site] = client_class(site=site)
+                client = clients[page.kind, site]
+                
+                if page.kind == "search":
+                    result = client._parse_search_result(page.content)
+                elif page.kind == "view":
+                    result = client._parse_torrent_info(page.content)
+                elif page.kind == "feed":
+                    use_magnet = parse_qs(urlsplit(page.url).query).get("magnets", [""])[0].lower() == "true"
+                    result = client._parse_feed(page.content.decode("utf-8"), use_magnet=use_magnet)
+                else:
+                    raise ValueError(f"Unknown page kind: {page.kind}")
+            except Exception as exc:
+                pages.append(ReparsedPage(url=entry.url, kind=entry.kind, fetched=entry.fetched, result=None, error=repr(exc)))
+            else:
+                pages.append(ReparsedPage(url=entry.url, kind=entry.kind, fetched=entry.fetched, result=result))
+    finally:
+        for file in files.values():
+            file.close()
+    return pages
+
+def reparse(
+    directory: str,
+    kind: str | None = None,
+    latest: bool = False,
+    workers: int | None = None,
+    chunk_size: int = 50
+    ) -> Iterator[ReparsedPage]:
+    """
+    Parse archived pages again with the current parsers, in parallel worker processes.
+    
+    Pages are handed to workers in chunks of consecutive records, so segments are mostly read
+    sequentially.
+    
+    Parameters:
+        directory (str): The directory of the archive.
+        kind (str | None, optional): Only parse pages of this kind. Defaults to None.
+        latest (bool, optional): Whether to only parse the latest fetch of each URL. Defaults to False.
+        workers (int | None, optional): The number of worker processes. If not specified, the number of CPUs is used. Defaults to None.
+        chunk_size (int, optional): The number of pages per unit of work. Defaults to 50.
+    
+    Returns:
+        Iterator[ReparsedPage]: The parsed pages, in archive order.
+    """
+    archive = PageArchive(directory)
+    try:
+        entries = list(archive.entries(kind=kind, latest=latest))
+    finally:
+        archive.close()
+    
+    workers = workers or os.cpu_count() or 1
+    chunks = (entries[index:index + chunk_size] for index in range(0, len(entries), chunk_size))
+    pending: deque[Future[list[ReparsedPage]]] = deque()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        # A bounded window of chunks is in flight, so results stream out without the whole archive in memory.
+        for chunk in chunks:
+            pending.append(executor.submit(_reparse_chunk, directory, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    
+    from .utils.serialization import to_json_data
+    
+    parser = argparse.ArgumentParser(description="Parse archived nyaa pages again and write the results as JSON lines.")
+    parser.add_argument("directory")
+    parser.add_argument("--kind", choices=["search", "view", "feed"])
+    parser.add_argument("--latest", action="store_true", help="only parse the latest fetch of each URL")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--output", help="the file to write to; defaults to standard output")
+    parser.add_argument("--rebuild-index", action="store_true", help="rebuild the index from the segments first")
+    args = parser.parse_args()
+    
+    if args.rebuild_index:
+        archive = PageArchive(args.directory)
+        print(f"Indexed {archive.rebuild_index()} pages", file=sys.stderr)
+        archive.close()
+    
+    output = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        for page in reparse(args.directory, kind=args.kind, latest=args.latest, workers=args.workers):
+            output.write(json.dumps(to_json_data(page)) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
\ No newline at end of file
@@ -1,21 +1,39 @@
 from datetime import datetime
+from typing import Any, Awaitable, Callable, TypeVar
 from urllib.parse import urlparse, parse_qs
+import asyncio
+import itertools
+import os
 import re
+import time
 
 from bs4 import BeautifulSoup
 import bs4.element
 import httpx
 
-from .exceptions import TorrentNotFoundError
+from .exceptions import TorrentNotFoundError, DeadlineExceededError
+from .instrumentation import Hooks, ParseMetrics, traced_get
+from .concurrency import AdaptiveConcurrency
+from .hedging import HedgePolicy
+from .scheduler import PriorityScheduler, current_priority, priority
+from .resolver import InfoHashIndex
+from .releases import ReleaseIndex
+from .archive import PageArchive
+from .proxies import ProxyPool
+from .warmup import DNSCache, prewarm
+from .topk import search_top
+from .deadline import BatchResult, deadline as set_deadline, with_deadline
 from .enums import (
     SITE,
     QualityFilter,
     FunCategory, FapCategory,
     SortBy, SortOrder,
     TorrentType,
-    UserLevel
+    UserLevel,
+    Priority
     )
 from .utils.categories import get_category_by_id
+from .metainfo import parse_metainfo
 
 from .models import (
     SearchResult,
@@ -23,9 +41,14 @@ from .models import (
     TorrentInfo,
     User,
     File, Folder,
-    Comment
+    Comment,
+    TorrentMetainfo,
+    TorrentDownload
     )
 
+T = TypeVar("T")
+R = TypeVar("R")
+
 class NyaaClient:
     """
     Scraper client.
@@ -33,19 +56,52 @@ class NyaaClient:
     DEFAULT_SITE: SITE = SITE.FUN
     TIMEOUT: int = 30
     
-    def __init__(self: "NyaaClient", site: SITE = DEFAULT_SITE, timeout: int = TIMEOUT) -> None:
+    def __init__(
+        self: "NyaaClient",
+        site: SITE = DEFAULT_SITE,
+        timeout: int = TIMEOUT,
+        hooks: Hooks | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        hedging: HedgePolicy | None = None,
+        scheduler: PriorityScheduler | None = None,
+        info_hash_index: InfoHashIndex | None = None,
+        release_index: ReleaseIndex | None = None,
+        archive: PageArchive | None = None,
+        proxies: ProxyPool | None = None,
+        dns_cache: DNSCache | None = None
+        ) -> None:
         """
         Initialize scraper client.
         
         Parameters:
             site (SITE, optional): The site to scrape from. Defaults to DEFAULT_SITE.
             timeout (int, optional): The timeout for HTTP requests. Defaults to TIMEOUT.
+            hooks (Hooks | None, optional): Instrumentation hooks to emit request and parse metrics to. Defaults to None.
+            concurrency (AdaptiveConcurrency | None, optional): The controller limiting concurrency of batch methods. If not specified, a default controller is used. Defaults to None.
+            hedging (HedgePolicy | None, optional): The policy for hedging slow search and view requests. If not specified, requests are not hedged. Defaults to None.
+            scheduler (PriorityScheduler | None, optional): The scheduler admitting requests by priority. If not specified, requests are sent as they come. Defaults to None.
+            info_hash_index (InfoHashIndex | None, optional): The index to record the info hash of every parsed torrent in. Defaults to None.
+            release_index (ReleaseIndex | None, optional): The index to parse and record the name of every parsed torrent in. Defaults to None.
+            archive (PageArchive | None, optional): The archive to store the raw search and view pages in. Defaults to None.
+            proxies (ProxyPool | None, optional): The egress proxies to spread requests over. If not specified, requests are sent directly. Defaults to None.
+            dns_cache (DNSCache | None, optional): The DNS cache to resolve host names with, which can be shared by many clients. Defaults to None.
         """
         self._site = site
         self.base_url = site.value
         self.timeout = timeout
+        self.hooks = hooks
+        self.concurrency = concurrency or AdaptiveConcurrency(hooks=hooks)
+        self.hedging = hedging
+        self.scheduler = scheduler
+        self.info_hash_index = info_hash_index
+        self.release_index = release_index
+        self.archive = archive
+        self.proxies = proxies
         
         self._http_client: httpx.AsyncClient = httpx.AsyncClient(timeout=self.timeout)
+        self._in_flight: int = 0
+        if dns_cache is not None:
+            dns_cache.install(self._http_client)
     
     @property
     def site(self: "NyaaClient") -> SITE:
@@ -68,6 +124,183 @@ class NyaaClient:
         self._site = new_site
         self.base_url = new_site.value
     
+    async def warmup(self: "NyaaClient", connections: int = 1, sites: list[SITE] | None = None) -> None:
+        """
+        Resolve the sites and open pooled connections to them ahead of the first request.
+        
+        Connections are kept open for the keep-alive expiry of the pool, 5 seconds by default,
+        so warm up shortly before the requests. With a proxy pool, connections to the proxies are opened.
+        
+        Parameters:
+            connections (int, optional): The number of connections to open to each site or proxy. Defaults to 1.
+            sites (list[SITE] | None, optional): The sites to connect to. If not specified, the site of the client. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If a connection could not be opened.
+        """
+        urls = [self._site_and_url(site)[1] for site in (sites or [self.site])]
+        if self.proxies is None:
+            await prewarm(self._http_client, urls, connections)
+        else:
+            await asyncio.gather(*(
+                prewarm(proxy.http_client(self.proxies.timeout), urls, connections) for proxy in self.proxies.proxies
+                ))
+    
+    async def _get(
+        self: "NyaaClient",
+        url: str,
+        params: dict | None = None,
+        hedge: str | None = None,
+        deadline: float | None = None
+        ) -> httpx.Response:
+        """
+        Send a GET request, hedging it if a hedge policy is set.
+        
+        Parameters:
+            url (str): The URL of the request.
+            params (dict | None, optional): The query parameters of the request. Defaults to None.
+            hedge (str | None, optional): The kind of request for the hedge policy. If not specified, the request is not hedged. Defaults to None.
+            deadline (float | None, optional): Seconds the request may take, including waiting for a slot. The deadline of the caller, if any, still applies. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during the request.
+            DeadlineExceededError: If the deadline passed first. The request is cancelled.
+        
+        Returns:
+            httpx.Response: The response of the request.
+        """
+        with set_deadline(deadline):
+            if hedge is not None and self.hedging is not None:
+                return await with_deadline(self.hedging.run(hedge, lambda: self._send(url, params)))
+            return await with_deadline(self._send(url, params))
+    
+    async def _send(self: "NyaaClient", url: str, params: dict | None = None) -> httpx.Response:
+        """
+        Send a GET request, emitting request metrics if hooks are set.
+        
+        Parameters:
+            url (str): The URL of the request.
+            params (dict | None, optional): The query parameters of the request. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during the request.
+        
+        Returns:
+            httpx.Response: The response of the request.
+        """
+        if self.scheduler is not None:
+            async with self.scheduler.slot():
+                return await self.__send(url, params)
+        return await self.__send(url, params)
+    
+    async def __send(self: "NyaaClient", url: str, params: dict | None = None) -> httpx.Response:
+        """
+        Send a GET request once admitted, emitting request metrics if hooks are set.
+        
+        Parameters:
+            url (str): The URL of the request.
+            params (dict | None, optional): The query parameters of the request. Defaults to None.
+        
+        Returns:
+            httpx.Response: The response of the request.
+        """
+        if self.proxies is not None:
+            # The pool calls this once per attempt, so the attempt number counts the retries.
+            attempts = itertools.count()
+            return await self.proxies.request(lambda http_client: self.__send_with(http_client, url, params, next(attempts)))
+        return await self.__send_with(self._http_client, url, params)
+    
+    async def __send_with(
+        self: "NyaaClient",
+        http_client: httpx.AsyncClient,
+        url: str,
+        params: dict | None = None,
+        retries: int = 0
+        ) -> httpx.Response:
+        """
+        Send a GET request with an HTTP client, emitting request metrics if hooks are set.
+        
+        Parameters:
+            http_client (httpx.AsyncClient): The HTTP client, of the client itself or of a proxy.
+            url (str): The URL of the request.
+            params (dict | None, optional): The query parameters of the request. Defaults to None.
+            retries (int, optional): The number of earlier attempts of the request. Defaults to 0.
+        
+        Returns:
+            httpx.Response: The response of the request.
+        """
+        if self.hooks is None:
+            return await http_client.get(url, params=params)
+        
+        self._in_flight += 1
+        try:
+            return await traced_get(http_client, self.hooks, url, params=params, in_flight=self._in_flight, retries=retries)
+        finally:
+            self._in_flight -= 1
+    
+    def _emit_parse(self: "NyaaClient", phase: str, url: str, started: float, rows: int) -> None:
+        """
+        Emit metrics of a parse phase if hooks are set.
+        
+        Parameters:
+            phase (str): The parse phase.
+            url (str): The URL of the parsed page.
+            started (float): The `time.perf_counter()` value of when parsing started.
+            rows (int): The number of rows parsed.
+        """
+        if self.hooks is not None:
+            self.hooks.emit(
+                "parse",
+                ParseMetrics(phase=phase, url=url, parse_time=time.perf_counter() - started, rows=rows)
+                )
+    
+    async def _run_batch(
+        self: "NyaaClient",
+        func: Callable[[T], Awaitable[R]],
+        items: list[T],
+        deadline: float | None = None
+        ) -> BatchResult[R]:
+        """
+        Run a coroutine function over items concurrently, limited by the concurrency controller.
+        
+        Requests run at Priority.BULK unless a priority is set by the caller. If one call raises,
+        the calls still running are cancelled before the error is raised. Calls still running when
+        the deadline passes are cancelled and left incomplete.
+        
+        Parameters:
+            func (Callable[[T], Awaitable[R]]): The coroutine function to call with each item.
+            items (list[T]): The items.
+            deadline (float | None, optional): Seconds the batch may take. The deadline of the caller, if any, still applies. Defaults to None.
+        
+        Returns:
+            BatchResult[R]: The results, in the order of the items, with None for incomplete items.
+        """
+        async def limited(item: T) -> R:
+            async with self.concurrency.slot():
+                return await func(item)
+        
+        async def run(item: T) -> tuple[bool, R | None]:
+            try:
+                return True, await with_deadline(limited(item))
+            except DeadlineExceededError:
+                return False, None
+        
+        level = current_priority()
+        with priority(Priority.BULK if level is None else level), set_deadline(deadline):
+            tasks = [asyncio.ensure_future(run(item)) for item in items]
+        try:
+            outcomes = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        
+        return BatchResult(
+            [result for _, result in outcomes],
+            incomplete=[item for item, (finished, _) in zip(items, outcomes) if not finished]
+            )
+    
     async def search(
         self: "NyaaClient",
         term: str | None = None,
@@ -76,7 +309,9 @@ class NyaaClient:
         category: FunCategory | FapCategory | None = None,
         sort_by: str | None = None,
         sort_order: str | None = None,
-        page: int = 1
+        page: int = 1,
+        deadline: float | None = None,
+        site: SITE | None = None
         ) -> SearchResult:
         """
         Search torrents.
@@ -89,20 +324,24 @@ class NyaaClient:
             sort_by (SortBy | None, optional): Sort results by. Defaults to None.
             sort_order (SortOrder | None, optional): Sort order of search. Defaults to None.
             page (int, optional): Page number of search result. Defaults to 1.
+            deadline (float | None, optional): Seconds the request may take before it is cancelled. Defaults to None.
+            site (SITE | None, optional): The site to search, for this search only. If not specified, the site of the client is used. Defaults to None.
         
         Raises:
             httpx.HTTPError: If an HTTP-related error occurs during the request.
+            DeadlineExceededError: If the deadline passed before the response arrived.
         
         Returns:
             SearchResult: Result of the search.
         """
+        site, base_url = self._site_and_url(site)
         if category is None:
-            category = get_category_by_id(self.site, "0_0")
+            category = get_category_by_id(site, "0_0")
         
         if username:
-            url = f"{self.base_url}/user/{username}"
+            url = f"{base_url}/user/{username}"
         else:
-            url = self.base_url
+            url = base_url
         
         params = {
             "q": term,
@@ -112,18 +351,73 @@ class NyaaClient:
             **({"o": sort_order.value} if sort_order else {}),
             "p": page
         }
-        response: httpx.Response = await self._http_client.get(url, params=params)
+        response: httpx.Response = await self._get(url, params=params, hedge="search", deadline=deadline)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, "html.parser")
+        if self.archive is not None:
+            self.archive.append("search", str(response.url), response.status_code, response.content)
+        
+        started = time.perf_counter()
+        result = self._parse_search_result(response.content, site=site)
+        self._emit_parse("search", str(response.url), started, len(result.torrents))
+        if self.info_hash_index is not None:
+            self.info_hash_index.add_search_result(result)
+        if self.release_index is not None:
+            self.release_index.add_search_result(result)
+        return result
+    
+    def _site_and_url(self: "NyaaClient", site: SITE | None) -> tuple[SITE, str]:
+        """
+        Get the site of a request and its base URL, which is `base_url` for the site of the client.
+        
+        Parameters:
+            site (SITE | None): The site of the request. If None, the site of the client.
+        
+        Returns:
+            tuple[SITE, str]: The site and its base URL.
+        """
+        if site is None or site == self.site:
+            return self.site, self.base_url
+        return site, site.value
+    
+    def _parse_search_result(self: "NyaaClient", content: bytes | str, site: SITE | None = None) -> SearchResult:
+        """
+        Parse a search result page.
+        
+        Parameters:
+            content (bytes | str): The HTML of the search result page.
+            site (SITE | None, optional): The site of the page. If not specified, the site of the client. Defaults to None.
+        
+        Returns:
+            SearchResult: Result of the search.
+        """
+        soup = BeautifulSoup(content, "html.parser")
+        try:
+            return self.__extract_search_result(soup, site)
+        finally:
+            self.__tear_down(soup)
+    
+    def __extract_search_result(self: "NyaaClient", soup: BeautifulSoup, site: SITE | None) -> SearchResult:
+        """
+        Extract the result of a search from the parsed page. Every value is a plain `str` or number,
+        so the result doesn't reference the tree.
+        
+        Parameters:
+            soup (BeautifulSoup): The parsed search result page.
+            site (SITE | None): The site of the page.
+        
+        Returns:
+            SearchResult: Result of the search.
+        """
+        site, base_url = self._site_and_url(site)
         
         torrents: list[SearchResultTorrent] = []
         rows = soup.select("table.torrent-list tbody tr")
         for row in rows:
             category_ = get_category_by_id(
-                site=self.site,
+                site=site,
                 category_id=row.select_one("a[href^='/?c=']")["href"][4:]
                 )
-            category_icon_url = self.base_url + row.find("img", class_="category-icon")["src"]
+            category_icon_url = base_url + row.find("img", class_="category-icon")["src"]
             
             total_comments, view_id, name = 0, None, None
             for tag in row.select("td[colspan='2'] a"):
@@ -134,7 +428,7 @@ class NyaaClient:
                     name = tag["title"]
             
             tds = row.find_all("td", class_="text-center")
-            torrent_url = self.base_url + tds[0].select_one("a[href^='/download/']")["href"]
+            torrent_url = base_url + tds[0].select_one("a[href^='/download/']")["href"]
             magnet_link = tds[0].select_one("a[href^='magnet:?xt=']")["href"]
             
             size = tds[1].text
@@ -196,7 +490,8 @@ class NyaaClient:
                 query_params = parse_qs(urlparse(next_tag["href"]).query)
                 next_page = int(query_params.get("p")[0])
             
-            available_pages = int(pagination.find_all("li")[-2].find("a").text)
+            # On the last page, the last page link is the active one, "<n> (current)".
+            available_pages = int(re.search(r"\d+", pagination.find_all("li")[-2].find("a").text).group())
         elif torrents:
             # Pagination won't be available if there is only one page of results.
             # Therefore, if at least one torrent exists, it indicates that there is one page.
@@ -215,29 +510,151 @@ class NyaaClient:
             available_pages=available_pages
             )
     
-    async def get_torrent_info(self: "NyaaClient", view_id: int) -> TorrentInfo:
+    async def get_torrent_info(self: "NyaaClient", view_id: int, deadline: float | None = None) -> TorrentInfo:
         """
         Get torrent information.
         
         Parameters:
             view_id (int): View-ID of the torrent.
+            deadline (float | None, optional): Seconds the request may take before it is cancelled. Defaults to None.
         
         Raises:
             httpx.HTTPError: If an HTTP-related error occurs during the request.
             TorrentNotFoundError: If the torrent of view id not found.
+            DeadlineExceededError: If the deadline passed before the response arrived.
         
         Returns:
             TorrentInfo: Information of the torrent.
         """
         url = self.base_url + f"/view/{view_id}"
-        response: httpx.Response = await self._http_client.get(url)
+        response: httpx.Response = await self._get(url, hedge="view", deadline=deadline)
         response.raise_for_status()
+        if self.archive is not None:
+            self.archive.append("view", str(response.url), response.status_code, response.content)
         
         if response.status_code == 404:
             raise TorrentNotFoundError(f"Torrent '{view_id}' not found")
         
-        soup = BeautifulSoup(response, "html.parser")
+        started = time.perf_counter()
+        torrent_info = self._parse_torrent_info(response.content)
+        self._emit_parse("torrent_info", url, started, len(torrent_info.files) + len(torrent_info.comments))
+        if self.info_hash_index is not None:
+            self.info_hash_index.add_torrent_info(view_id, torrent_info)
+        if self.release_index is not None:
+            self.release_index.add(view_id, torrent_info.name)
+        return torrent_info
+    
+    async def search_many(
+        self: "NyaaClient",
+        searches: list[dict[str, Any]],
+        deadline: float | None = None
+        ) -> BatchResult[SearchResult]:
+        """
+        Run many searches concurrently.
         
+        Parameters:
+            searches (list[dict[str, Any]]): Keyword arguments of `search()` for each search.
+            deadline (float | None, optional): Seconds the batch may take. Searches still running then are cancelled. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during a request.
+        
+        Returns:
+            BatchResult[SearchResult]: Results of the searches, in the order of the searches. Searches cut off by the deadline are None and listed in `incomplete`.
+        """
+        return await self._run_batch(lambda kwargs: self.search(**kwargs), searches, deadline=deadline)
+    
+    async def search_top(
+        self: "NyaaClient",
+        queries: list[dict[str, Any]],
+        k: int,
+        sort_by: SortBy = SortBy.SEEDERS,
+        sort_order: SortOrder = SortOrder.DESCENDING,
+        sites: list[SITE] | None = None,
+        deadline: float | None = None
+        ) -> list[SearchResultTorrent]:
+        """
+        Get the top K torrents over several searches and sites, e.g. the 100 most seeded of a few shows on both sites.
+        
+        Searches run concurrently and sorted by nyaa. Their pages are merged in order, and further
+        pages of a search are only fetched while it still has torrents in the top K.
+        
+        Parameters:
+            queries (list[dict[str, Any]]): Keyword arguments of `search()` for each search, without sorting or page. A search with a category only runs on the site of the category.
+            k (int): The number of torrents to get.
+            sort_by (SortBy, optional): The order of the torrents. Defaults to SortBy.SEEDERS.
+            sort_order (SortOrder, optional): The sort order. Defaults to SortOrder.DESCENDING.
+            sites (list[SITE] | None, optional): The sites to run every search on. If not specified, the site of the client. Defaults to None.
+            deadline (float | None, optional): Seconds the whole call may take before it is cancelled. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during a request.
+            DeadlineExceededError: If the deadline passed first.
+        
+        Returns:
+            list[SearchResultTorrent]: Up to K torrents in order, without duplicates.
+        """
+        with set_deadline(deadline):
+            return await with_deadline(search_top(self, queries, k, sort_by, sort_order, sites))
+    
+    async def get_torrent_infos(self: "NyaaClient", view_ids: list[int], deadline: float | None = None) -> BatchResult[TorrentInfo]:
+        """
+        Get information of many torrents concurrently.
+        
+        Parameters:
+            view_ids (list[int]): View-IDs of the torrents.
+            deadline (float | None, optional): Seconds the batch may take. Requests still running then are cancelled. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during a request.
+            TorrentNotFoundError: If a torrent of view id not found.
+        
+        Returns:
+            BatchResult[TorrentInfo]: Information of the torrents, in the order of the View-IDs. Torrents cut off by the deadline are None and listed in `incomplete`.
+        """
+        return await self._run_batch(self.get_torrent_info, view_ids, deadline=deadline)
+    
+    def _parse_torrent_info(self: "NyaaClient", content: bytes | str) -> TorrentInfo:
+        """
+        Parse a torrent view page.
+        
+        Parameters:
+            content (bytes | str): The HTML of the torrent view page.
+        
+        Returns:
+            TorrentInfo: Information of the torrent.
+        """
+        soup = BeautifulSoup(content, "html.parser")
+        try:
+            return self.__extract_torrent_info(soup)
+        finally:
+            self.__tear_down(soup)
+    
+    @staticmethod
+    def __tear_down(soup: BeautifulSoup) -> None:
+        """
+        Destroy a parsed page. The tree is full of reference cycles, so it would otherwise live until a full GC.
+        
+        `decompose()` of the BeautifulSoup object itself leaves its children alone, so they are decomposed first.
+        
+        Parameters:
+            soup (BeautifulSoup): The parsed page.
+        """
+        for element in list(soup.contents):
+            element.decompose()
+        soup.decompose()
+    
+    def __extract_torrent_info(self: "NyaaClient", soup: BeautifulSoup) -> TorrentInfo:
+        """
+        Extract information of a torrent from the parsed view page. Every value is a plain `str`
+        or number, so the information doesn't reference the tree.
+        
+        Parameters:
+            soup (BeautifulSoup): The parsed torrent view page.
+        
+        Returns:
+            TorrentInfo: Information of the torrent.
+        """
         name = soup.select_one("div.panel-heading h3.panel-title").get_text(strip=True)
         
         rows = soup.select("div.panel-body div.row")
@@ -283,6 +700,7 @@ class NyaaClient:
                 username=user_tag["href"][6:],
                 profile_url=self.base_url + user_tag["href"],
                 photo_url=self.base_url + image_src if image_src.startswith("/") else image_src,
+                user_level=UserLevel.from_level_str(level_str=user_tag["title"].split()[0].lower()),
                 is_banned="BANNED" in user_tag["title"]
                 )
             
@@ -290,7 +708,6 @@ class NyaaClient:
                 Comment(
                     id=int(comment["id"].split("-")[1]),
                     user=user,
-                    user_level=UserLevel.from_level_str(level_str=user_tag["title"].split()[0].lower()),
                     is_uploader="(uploader)" in comment.select_one("div.col-md-2 p").text,
                     timestamp=datetime.utcfromtimestamp(int(comment.find("small", attrs={"data-timestamp": True})["data-timestamp"])),
                     text=comment.find("div", class_="comment-content").text
@@ -316,6 +733,133 @@ class NyaaClient:
             comments=comments
             )
     
+    async def download_torrent(
+        self: "NyaaClient",
+        torrent: str | int,
+        directory: str | None = None,
+        deadline: float | None = None
+        ) -> TorrentDownload:
+        """
+        Download and parse a .torrent file.
+        
+        Parameters:
+            torrent (str | int): The URL of the torrent file, or the View-ID of the torrent.
+            directory (str | None, optional): The directory to save the torrent file to, as "<info_hash>.torrent". If not specified, the file is kept in memory. Defaults to None.
+            deadline (float | None, optional): Seconds the download may take before it is cancelled. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during the request.
+            BencodeError: If the downloaded file is not a valid torrent file.
+            DeadlineExceededError: If the deadline passed before the file was downloaded.
+        
+        Returns:
+            TorrentDownload: The downloaded torrent file.
+        """
+        url, data, metainfo = await self.__fetch_torrent(torrent, deadline=deadline)
+        return await self.__store_torrent(url, data, metainfo, directory)
+    
+    async def download_torrents(
+        self: "NyaaClient",
+        torrents: list[str | int],
+        directory: str | None = None,
+        deadline: float | None = None
+        ) -> BatchResult[TorrentDownload]:
+        """
+        Download and parse many .torrent files concurrently.
+        
+        Torrent files with the same info hash are only returned (and saved) once.
+        
+        Parameters:
+            torrents (list[str | int]): URLs of torrent files, or View-IDs of torrents.
+            directory (str | None, optional): The directory to save the torrent files to, as "<info_hash>.torrent". If not specified, the files are kept in memory. Defaults to None.
+            deadline (float | None, optional): Seconds the downloads may take. Downloads still running then are cancelled. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during a request.
+            BencodeError: If a downloaded file is not a valid torrent file.
+        
+        Returns:
+            BatchResult[TorrentDownload]: The downloaded torrent files, in the order of their first occurrence. Torrents cut off by the deadline are listed in `incomplete`.
+        """
+        seen: set[str] = set()
+        downloads: BatchResult[TorrentDownload] = BatchResult()
+        
+        fetched = await self._run_batch(self.__fetch_torrent, list(dict.fromkeys(torrents)), deadline=deadline)
+        downloads.incomplete = fetched.incomplete
+        for download in fetched:
+            if download is None:
+                continue
+            url, data, metainfo = download
+            if metainfo.info_hash in seen:
+                continue
+            seen.add(metainfo.info_hash)
+            downloads.append(await self.__store_torrent(url, data, metainfo, directory))
+        return downloads
+    
+    async def __fetch_torrent(
+        self: "NyaaClient",
+        torrent: str | int,
+        deadline: float | None = None
+        ) -> tuple[str, bytes, TorrentMetainfo]:
+        """
+        Fetch and parse a .torrent file.
+        
+        Parameters:
+            torrent (str | int): The URL of the torrent file, or the View-ID of the torrent.
+            deadline (float | None, optional): Seconds the request may take before it is cancelled. Defaults to None.
+        
+        Returns:
+            tuple[str, bytes, TorrentMetainfo]: The URL, raw contents and parsed metainfo of the torrent file.
+        """
+        url = torrent if isinstance(torrent, str) else f"{self.base_url}/download/{torrent}.torrent"
+        response: httpx.Response = await self._get(url, deadline=deadline)
+        response.raise_for_status()
+        
+        started = time.perf_counter()
+        metainfo = parse_metainfo(response.content)
+        self._emit_parse("metainfo", url, started, len(metainfo.files))
+        return url, response.content, metainfo
+    
+    async def __store_torrent(
+        self: "NyaaClient",
+        url: str,
+        data: bytes,
+        metainfo: TorrentMetainfo,
+        directory: str | None
+        ) -> TorrentDownload:
+        """
+        Save a fetched .torrent file to a directory, or keep it in memory.
+        
+        Parameters:
+            url (str): The URL of the torrent file.
+            data (bytes): The raw contents of the torrent file.
+            metainfo (TorrentMetainfo): The parsed metainfo of the torrent file.
+            directory (str | None): The directory to save the torrent file to. If None, the file is kept in memory.
+        
+        Returns:
+            TorrentDownload: The downloaded torrent file.
+        """
+        if directory is None:
+            return TorrentDownload(url=url, metainfo=metainfo, data=data)
+        
+        path = os.path.join(directory, f"{metainfo.info_hash}.torrent")
+        await asyncio.to_thread(self.__write_file, path, data)
+        return TorrentDownload(url=url, metainfo=metainfo, path=path)
+    
+    @staticmethod
+    def __write_file(path: str, data: bytes) -> None:
+        """
+        Write data to a file atomically.
+        
+        Parameters:
+            path (str): The path of the file.
+            data (bytes): The data to write.
+        """
+        temp_path = f"{path}.part"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, path)
+    
     def __extract_files_and_folders(self: "NyaaClient", tag: bs4.element.Tag) -> list[File | Folder]:
         """
         Extract files and folders from a BeautifulSoup element tag containing <ul> tag.
@@ -0,0 +1,168 @@
+from collections import deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+import asyncio
+import time
+
+import httpx
+
+from .instrumentation import Hooks
+
+@dataclass
+class ConcurrencySample:
+    """
+    A change of the concurrency limit.
+    
+    Attributes:
+        timestamp (float): The `time.time()` value of when the limit changed.
+        limit (int): The new concurrency limit.
+        reason (str): The reason of the change, one of "increase", "throttled", "timeout", "error" or "latency".
+    """
+    timestamp: float
+    limit: int
+    reason: str
+
+class AdaptiveConcurrency:
+    """
+    Additive-increase/multiplicative-decrease (AIMD) concurrency controller.
+    
+    The limit grows by `increase` for every `limit` successful requests and is multiplied by
+    `decrease` on 429/503 responses, timeouts, connection errors or latency spikes. Back-offs
+    within one average latency of the previous back-off are treated as the same congestion event.
+    """
+    INITIAL: int = 4
+    MINIMUM: int = 1
+    MAXIMUM: int = 64
+    INCREASE: float = 1.0
+    DECREASE: float = 0.5
+    LATENCY_SPIKE: float = 2.0
+    HISTORY_SIZE: int = 256
+    THROTTLE_STATUS_CODES: frozenset[int] = frozenset({429, 503})
+    
+    def __init__(
+        self: "AdaptiveConcurrency",
+        initial: int = INITIAL,
+        minimum: int = MINIMUM,
+        maximum: int = MAXIMUM,
+        increase: float = INCREASE,
+        decrease: float = DECREASE,
+        latency_spike: float = LATENCY_SPIKE,
+        hooks: Hooks | None = None
+        ) -> None:
+        """
+        Initialize the controller.
+        
+        Parameters:
+            initial (int, optional): The initial concurrency limit. Defaults to INITIAL.
+            minimum (int, optional): The lowest concurrency limit. Defaults to MINIMUM.
+            maximum (int, optional): The highest concurrency limit. Defaults to MAXIMUM.
+            increase (float, optional): How much the limit grows per round of successful requests. Defaults to INCREASE.
+            decrease (float, optional): The factor the limit is multiplied by on back-off. Defaults to DECREASE.
+            latency_spike (float, optional): Back off when a request takes longer than this many times the average latency. Defaults to LATENCY_SPIKE.
+            hooks (Hooks | None, optional): Hooks to emit "concurrency" events to when the limit changes. Defaults to None.
+        """
+        if not 1 <= minimum <= initial <= maximum:
+            raise ValueError("Expected 1 <= minimum <= initial <= maximum")
+        
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_spike = latency_spike
+        self.hooks = hooks
+        
+        self._limit: float = float(initial)
+        self._in_flight: int = 0
+        self._average_latency: float | None = None
+        self._last_decrease: float = 0.0
+        self._condition = asyncio.Condition()
+        self.history: deque[ConcurrencySample] = deque(maxlen=self.HISTORY_SIZE)
+    
+    @property
+    def limit(self: "AdaptiveConcurrency") -> int:
+        """
+        Getter property for the current concurrency limit.
+        
+        Returns:
+            int: The current concurrency limit.
+        """
+        return int(self._limit)
+    
+    @property
+    def in_flight(self: "AdaptiveConcurrency") -> int:
+        """
+        Getter property for the number of requests currently admitted.
+        
+        Returns:
+            int: The number of requests in flight.
+        """
+        return self._in_flight
+    
+    @asynccontextmanager
+    async def slot(self: "AdaptiveConcurrency") -> AsyncIterator[None]:
+        """
+        Wait for a free slot under the current limit and hold it for the duration of the block.
+        
+        The outcome of the block adjusts the limit: exceptions of throttling, timeout or connection
+        errors back off, slow blocks back off, and anything else counts as a success.
+        """
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._in_flight < self.limit)
+            self._in_flight += 1
+        
+        started = time.perf_counter()
+        error: BaseException | None = None
+        try:
+            yield
+        except BaseException as exc:
+            error = exc
+            raise
+        finally:
+            self._record(time.perf_counter() - started, error)
+            async with self._condition:
+                self._in_flight -= 1
+                self._condition.notify_all()
+    
+    def _record(self: "AdaptiveConcurrency", latency: float, error: BaseException | None) -> None:
+        """
+        Adjust the limit after a request.
+        
+        Parameters:
+            latency (float): Seconds the request took.
+            error (BaseException | None): The exception raised by the request, if any.
+        """
+        reason = None
+        if isinstance(error, httpx.HTTPStatusError) and error.response.status_code in self.THROTTLE_STATUS_CODES:
+            reason = "throttled"
+        elif isinstance(error, httpx.TimeoutException):
+            reason = "timeout"
+        elif isinstance(error, httpx.TransportError):
+            reason = "error"
+        elif error is not None:
+            return
+        
+        if reason is None and error is None:
+            if self._average_latency is not None and latency > self._average_latency * self.latency_spike:
+                reason = "latency"
+            self._average_latency = latency if self._average_latency is None else 0.9 * self._average_latency + 0.1 * latency
+        
+        previous = self.limit
+        if reason is None:
+            self._limit = min(self.maximum, self._limit + self.increase / max(self._limit, 1.0))
+            if self.limit == previous:
+                return
+            reason = "increase"
+        else:
+            now = time.perf_counter()
+            if now - self._last_decrease < (self._average_latency or 0.0):
+                return
+            self._last_decrease = now
+            self._limit = max(self.minimum, self._limit * self.decrease)
+            if self.limit == previous:
+                return
+        
+        sample = ConcurrencySample(timestamp=time.time(), limit=self.limit, reason=reason)
+        self.history.append(sample)
+        if self.hooks is not None:
+            self.hooks.emit("concurrency", sample)
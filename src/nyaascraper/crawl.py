@@ -0,0 +1,417 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import time
+
+import httpx
+
+from .archive import PageArchive
+from .client import NyaaClient
+from .enums import SITE, QualityFilter, SortBy, SortOrder
+from .exceptions import TorrentNotFoundError
+from .utils.categories import get_category_by_id
+from .utils.serialization import to_json_data
+
+@dataclass
+class CrawlTask:
+    """
+    A unit of crawl work.
+    
+    Attributes:
+        id (int): The ID of the task.
+        kind (str): The kind of the task, "view" or "search".
+        payload (dict[str, Any]): The arguments of the task.
+        attempts (int): The number of times the task has been leased.
+    """
+    id: int
+    kind: str
+    payload: dict[str, Any]
+    attempts: int
+
+class WorkQueue:
+    """
+    Crawl work queue stored in a SQLite file.
+    
+    Workers lease tasks for a limited time; tasks of workers that die are leased again once their
+    lease expires, until they have been leased MAX_ATTEMPTS times. Results are stored in the same file.
+    
+    By default the file uses SQLite's WAL journal, which only works for processes on one host. To
+    share the queue between machines, put the file on a network filesystem with working file locks
+    and open it with `shared=True` everywhere, which uses the rollback journal instead.
+    """
+    LEASE_SECONDS: float = 300.0
+    MAX_ATTEMPTS: int = 3
+    
+    def __init__(self: "WorkQueue", path: str, shared: bool = False) -> None:
+        """
+        Open or create a work queue.
+        
+        Parameters:
+            path (str): The path of the SQLite file.
+            shared (bool, optional): Whether the file is shared between machines. Defaults to False.
+        """
+        self.path = path
+        self.shared = shared
+        self._connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        if shared:
+            self._connection.execute("PRAGMA journal_mode=DELETE")
+            self._connection.execute("PRAGMA synchronous=FULL")
+        else:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                owner TEXT,
+                lease_expires REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status ON tasks (status, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                task_id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                data TEXT NOT NULL,
+                fetched REAL NOT NULL
+            );
+            """
+            )
+    
+    def close(self: "WorkQueue") -> None:
+        """
+        Close the work queue.
+        """
+        self._connection.close()
+    
+    def add(self: "WorkQueue", kind: str, payloads: Iterable[dict[str, Any]]) -> None:
+        """
+        Add tasks to the queue.
+        
+        Parameters:
+            kind (str): The kind of the tasks, "view" or "search".
+            payloads (Iterable[dict[str, Any]]): The arguments of each task.
+        """
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO tasks (kind, payload) VALUES (?, ?)",
+                ((kind, json.dumps(to_json_data(payload))) for payload in payloads)
+                )
+    
+    def add_view_range(self: "WorkQueue", start: int, stop: int) -> None:
+        """
+        Add a task for every View-ID in a range.
+        
+        Parameters:
+            start (int): The first View-ID.
+            stop (int): The View-ID after the last one.
+        """
+        self.add("view", ({"view_id": view_id} for view_id in range(start, stop)))
+    
+    def add_searches(self: "WorkQueue", searches: Iterable[dict[str, Any]]) -> None:
+        """
+        Add a task for every search.
+        
+        Parameters:
+            searches (Iterable[dict[str, Any]]): Keyword arguments of `NyaaClient.search()` for each search.
+        """
+        self.add("search", searches)
+    
+    def lease(
+        self: "WorkQueue",
+        owner: str,
+        count: int,
+        lease_seconds: float = LEASE_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS
+        ) -> list[CrawlTask]:
+        """
+        Lease pending tasks, or tasks whose lease has expired.
+        
+        Tasks whose lease has expired after `max_attempts` leases are marked failed instead,
+        so a task that keeps killing its workers is not leased forever.
+        
+        Parameters:
+            owner (str): The name of the worker leasing the tasks.
+            count (int): The maximum number of tasks to lease.
+            lease_seconds (float, optional): How long the tasks are leased for. Defaults to LEASE_SECONDS.
+            max_attempts (int, optional): The number of leases after which an expired task is marked failed. Defaults to MAX_ATTEMPTS.
+        
+        Returns:
+            list[CrawlTask]: The leased tasks. Empty if there is nothing to lease right now; other workers may still hold leases.
+        """
+        now = time.time()
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._connection.execute(
+                """
+                UPDATE tasks SET status = 'failed', error = 'Lease expired ' || attempts || ' times'
+                WHERE status = 'leased' AND lease_expires < ? AND attempts >= ?
+                """,
+                (now, max_attempts)
+                )
+            rows = self._connection.execute(
+                """
+                SELECT id, kind, payload, attempts FROM tasks
+                WHERE status = 'pending' OR (status = 'leased' AND lease_expires < ?)
+                LIMIT ?
+                """,
+                (now, count)
+                ).fetchall()
+            self._connection.executemany(
+                "UPDATE tasks SET status = 'leased', owner = ?, lease_expires = ?, attempts = attempts + 1 WHERE id = ?",
+                ((owner, now + lease_seconds, row[0]) for row in rows)
+                )
+            self._connection.execute("COMMIT")
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        
+        return [
+            CrawlTask(id=task_id, kind=kind, payload=json.loads(payload), attempts=attempts + 1)
+            for task_id, kind, payload, attempts in rows
+            ]
+    
+    def complete(self: "WorkQueue", task: CrawlTask, result: Any = None) -> None:
+        """
+        Mark a task as done and store its result.
+        
+        Parameters:
+            task (CrawlTask): The task.
+            result (Any, optional): The result of the task. If None, no result is stored. Defaults to None.
+        """
+        with self._connection:
+            if result is not None:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO results (task_id, kind, data, fetched) VALUES (?, ?, ?, ?)",
+                    (task.id, task.kind, json.dumps(to_json_data(result)), time.time())
+                    )
+            self._connection.execute("UPDATE tasks SET status = 'done', error = NULL WHERE id = ?", (task.id,))
+    
+    def fail(self: "WorkQueue", task: CrawlTask, error: str, max_attempts: int = MAX_ATTEMPTS) -> None:
+        """
+        Record a failed attempt of a task. The task is retried until it has been attempted `max_attempts` times.
+        
+        Parameters:
+            task (CrawlTask): The task.
+            error (str): A description of the error.
+            max_attempts (int, optional): The number of attempts after which the task is marked failed. Defaults to MAX_ATTEMPTS.
+        """
+        status = "failed" if task.attempts >= max_attempts else "pending"
+        with self._connection:
+            self._connection.execute("UPDATE tasks SET status = ?, error = ? WHERE id = ?", (status, error, task.id))
+    
+    def leased(self: "WorkQueue") -> int:
+        """
+        Count tasks that are currently leased, including tasks whose lease has expired.
+        
+        Returns:
+            int: The number of leased tasks.
+        """
+        return self._connection.execute("SELECT COUNT(*) FROM tasks WHERE status = 'leased'").fetchone()[0]
+    
+    def progress(self: "WorkQueue") -> dict[str, int]:
+        """
+        Count tasks by status.
+        
+        Returns:
+            dict[str, int]: The number of tasks that are "pending", "leased", "done" and "failed".
+        """
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        counts.update(self._connection.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall())
+        return counts
+    
+    def results(self: "WorkQueue", kind: str | None = None) -> Iterable[dict[str, Any]]:
+        """
+        Iterate over stored results.
+        
+        Parameters:
+            kind (str | None, optional): Only yield results of tasks of this kind. Defaults to None.
+        
+        Returns:
+            Iterable[dict[str, Any]]: The results as JSON-compatible data, in task order.
+        """
+        query = "SELECT data FROM results" + (" WHERE kind = ?" if kind else "") + " ORDER BY task_id"
+        for (data,) in self._connection.execute(query, (kind,) if kind else ()):
+            yield json.loads(data)
+
+def _search_kwargs(site: SITE, payload: dict[str, Any]) -> dict[str, Any]:
+    """
+    Convert a stored search payload back into `NyaaClient.search()` keyword arguments.
+    """
+    kwargs = dict(payload)
+    if "quality_filter" in kwargs:
+        kwargs["quality_filter"] = QualityFilter(kwargs["quality_filter"])
+    if kwargs.get("category") is not None:
+        kwargs["category"] = get_category_by_id(site, kwargs["category"])
+    if kwargs.get("sort_by") is not None:
+        kwargs["sort_by"] = SortBy(kwargs["sort_by"])
+    if kwargs.get("sort_order") is not None:
+        kwargs["sort_order"] = SortOrder(kwargs["sort_order"])
+    return kwargs
+
+async def _work(
+    queue_path: str,
+    site: SITE,
+    owner: str,
+    batch_size: int,
+    archive_directory: str | None = None,
+    shared: bool = False,
+    poll_interval: float = 5.0
+    ) -> None:
+    """
+    Work on a queue until no task is pending or leased.
+    
+    While other workers hold leases, the queue is polled every `poll_interval` seconds,
+    so tasks of workers that died are picked up once their lease expires.
+    """
+    queue = WorkQueue(queue_path, shared=shared)
+    archive = PageArchive(archive_directory) if archive_directory is not None else None
+    client = NyaaClient(site=site, archive=archive)
+    
+    async def run(task: CrawlTask) -> None:
+        try:
+            if task.kind == "view":
+                result = await client.get_torrent_info(task.payload["view_id"])
+            elif task.kind == "search":
+                result = await client.search(**_search_kwargs(site, task.payload))
+            else:
+                raise ValueError(f"Unknown task kind: {task.kind}")
+        except TorrentNotFoundError:
+            queue.complete(task)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code == 404:
+                queue.complete(task)
+            else:
+                queue.fail(task, repr(exc))
+        except (httpx.HTTPError, ValueError, LookupError, AttributeError, TypeError) as exc:
+            queue.fail(task, repr(exc))
+        else:
+            queue.complete(task, result)
+    
+    try:
+        while True:
+            if tasks := queue.lease(owner, batch_size):
+                await client._run_batch(run, tasks)
+            elif queue.leased():
+                await asyncio.sleep(poll_interval)
+            else:
+                break
+    finally:
+        await client._http_client.aclose()
+        queue.close()
+        if archive is not None:
+            archive.close()
+
+def _worker_main(
+    queue_path: str,
+    site: SITE,
+    owner: str,
+    batch_size: int,
+    archive_directory: str | None = None,
+    shared: bool = False,
+    poll_interval: float = 5.0
+    ) -> None:
+    """
+    Entry point of a worker process.
+    """
+    asyncio.run(_work(queue_path, site, owner, batch_size, archive_directory, shared, poll_interval))
+
+class CrawlRunner:
+    """
+    Runs a crawl over a WorkQueue in several worker processes, each with its own event loop and client.
+    
+    Several runners on one host can work on the same queue file. Runners on several machines
+    can too when the file is on a shared filesystem and every runner passes `shared=True`.
+    """
+    BATCH_SIZE: int = 50
+    PROGRESS_INTERVAL: float = 1.0
+    POLL_INTERVAL: float = 5.0
+    
+    def __init__(
+        self: "CrawlRunner",
+        queue_path: str,
+        workers: int | None = None,
+        site: SITE = SITE.FUN,
+        batch_size: int = BATCH_SIZE,
+        archive_directory: str | None = None,
+        shared: bool = False,
+        poll_interval: float = POLL_INTERVAL
+        ) -> None:
+        """
+        Initialize the crawl runner.
+        
+        Parameters:
+            queue_path (str): The path of the work queue SQLite file.
+            workers (int | None, optional): The number of worker processes. If not specified, the number of CPUs is used. Defaults to None.
+            site (SITE, optional): The site to crawl. Defaults to SITE.FUN.
+            batch_size (int, optional): The number of tasks a worker leases at once. Defaults to BATCH_SIZE.
+            archive_directory (str | None, optional): The directory of a PageArchive to store the raw pages in. Defaults to None.
+            shared (bool, optional): Whether the queue file is shared between machines. See WorkQueue. Defaults to False.
+            poll_interval (float, optional): Seconds an idle worker waits before checking for expired leases again. Defaults to POLL_INTERVAL.
+        """
+        self.queue_path = queue_path
+        self.workers = workers or os.cpu_count() or 1
+        self.site = site
+        self.batch_size = batch_size
+        self.archive_directory = archive_directory
+        self.shared = shared
+        self.poll_interval = poll_interval
+    
+    def run(
+        self: "CrawlRunner",
+        on_progress: Callable[[dict[str, int]], None] | None = None,
+        progress_interval: float = PROGRESS_INTERVAL
+        ) -> dict[str, int]:
+        """
+        Run the crawl until no task is pending or leased and all workers have exited.
+        
+        Parameters:
+            on_progress (Callable[[dict[str, int]], None] | None, optional): Called periodically with the task counts of the queue. Defaults to None.
+            progress_interval (float, optional): Seconds between progress reports. Defaults to PROGRESS_INTERVAL.
+        
+        Returns:
+            dict[str, int]: The final task counts of the queue.
+        """
+        WorkQueue(self.queue_path, shared=self.shared).close()
+        context = multiprocessing.get_context("spawn")
+        host = socket.gethostname()
+        processes = [
+            context.Process(
+                target=_worker_main,
+                args=(
+                    self.queue_path,
+                    self.site,
+                    f"{host}:{os.getpid()}:{index}",
+                    self.batch_size,
+                    self.archive_directory,
+                    self.shared,
+                    self.poll_interval
+                    ),
+                daemon=True
+                )
+            for index in range(self.workers)
+            ]
+        for process in processes:
+            process.start()
+        
+        queue = WorkQueue(self.queue_path, shared=self.shared)
+        try:
+            while any(process.is_alive() for process in processes):
+                for process in processes:
+                    process.join(timeout=progress_interval / len(processes))
+                if on_progress is not None:
+                    on_progress(queue.progress())
+            return queue.progress()
+        finally:
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+            queue.close()
@@ -0,0 +1,94 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Generic, Iterable, Iterator, TypeVar
+import asyncio
+
+from .exceptions import DeadlineExceededError
+
+R = TypeVar("R")
+
+_deadline: ContextVar[float | None] = ContextVar("nyaascraper_deadline", default=None)
+
+@contextmanager
+def deadline(seconds: float | None) -> Iterator[float | None]:
+    """
+    Give requests made in the block, including those of tasks started in it, a time budget.
+    
+    A deadline set inside another one can only shorten it. Must be used on a running event loop.
+    
+    Parameters:
+        seconds (float | None): The time budget in seconds. If None, the current deadline is kept.
+    
+    Returns:
+        float | None: The deadline in event loop time, or None if there is no deadline.
+    """
+    expires = _deadline.get()
+    if seconds is not None:
+        until = asyncio.get_running_loop().time() + seconds
+        expires = until if expires is None else min(expires, until)
+    
+    token = _deadline.set(expires)
+    try:
+        yield expires
+    finally:
+        _deadline.reset(token)
+
+def remaining() -> float | None:
+    """
+    Get the time left before the current deadline.
+    
+    Returns:
+        float | None: Seconds left, negative once passed, or None if there is no deadline.
+    """
+    expires = _deadline.get()
+    if expires is None:
+        return None
+    return expires - asyncio.get_running_loop().time()
+
+async def with_deadline(awaitable: Awaitable[R]) -> R:
+    """
+    Await an awaitable, cancelling it when the current deadline passes.
+    
+    Parameters:
+        awaitable (Awaitable[R]): The awaitable.
+    
+    Raises:
+        DeadlineExceededError: If the deadline passed before the awaitable finished.
+    
+    Returns:
+        R: The result of the awaitable.
+    """
+    timeout = remaining()
+    if timeout is None:
+        return await awaitable
+    try:
+        return await asyncio.wait_for(awaitable, max(timeout, 0.0))
+    except asyncio.TimeoutError as exc:
+        raise DeadlineExceededError("Deadline exceeded") from exc
+
+class BatchResult(list, Generic[R]):
+    """
+    Results of a batch method, in the order of the items.
+    
+    If the deadline of the batch passed first, the items left unfinished have None in their place
+    and are listed in `incomplete`, so they can be retried.
+    
+    Attributes:
+        incomplete (list[Any]): The items whose requests were cancelled by the deadline.
+    """
+    def __init__(self: "BatchResult[R]", results: Iterable[R] = (), incomplete: list[Any] | None = None) -> None:
+        super().__init__(results)
+        self.incomplete: list[Any] = [] if incomplete is None else incomplete
+    
+    @property
+    def complete(self: "BatchResult[R]") -> bool:
+        """
+        Getter property for whether every item finished before the deadline.
+        
+        Returns:
+            bool: True if no item was left incomplete.
+        """
+        return not self.incomplete
+    
+    def __repr__(self: "BatchResult[R]") -> str:
+        return f"BatchResult({list.__repr__(self)}, incomplete={self.incomplete!r})"
\ No newline at end of file
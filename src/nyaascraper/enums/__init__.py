@@ -3,4 +3,6 @@ from .quality_filter import QualityFilter
 from .categories import FunCategory, FapCategory
 from .sorting import SortBy, SortOrder
 from .torrent_type import TorrentType
-from .user_level import UserLevel
\ No newline at end of file
+from .user_level import UserLevel
+from .priority import Priority
+from .proxy_state import ProxyState
\ No newline at end of file
@@ -0,0 +1,14 @@
+from enum import IntEnum
+
+class Priority(IntEnum):
+    """
+    Priorities of requests. Lower values are served first.
+    
+    Members:
+        INTERACTIVE (int): User-facing requests.
+        NORMAL (int): Regular requests.
+        BULK (int): Background crawl requests.
+    """
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
\ No newline at end of file
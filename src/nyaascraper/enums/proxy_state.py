@@ -0,0 +1,14 @@
+from enum import Enum
+
+class ProxyState(Enum):
+    """
+    Health states of a proxy of a proxy pool.
+    
+    Members:
+        HEALTHY (str): The proxy takes requests.
+        EVICTED (str): The proxy timed out or was throttled, and takes no requests until its cooldown ends.
+        PROBING (str): The cooldown of the proxy ended, and one request at a time tests whether it recovered.
+    """
+    HEALTHY = "healthy"
+    EVICTED = "evicted"
+    PROBING = "probing"
\ No newline at end of file
@@ -1,3 +1,15 @@
 class TorrentNotFoundError(Exception):
     """Raised when the torrent with the specified View-ID is not found."""
+    pass
+
+class BencodeError(ValueError):
+    """Raised when bencoded data, such as a .torrent file, is malformed."""
+    pass
+
+class TrackerError(Exception):
+    """Raised when a BitTorrent tracker rejects or fails to answer a scrape request."""
+    pass
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when the deadline of a call passes before its requests finished."""
     pass
\ No newline at end of file
@@ -0,0 +1,183 @@
+from bisect import bisect_left
+from typing import Awaitable, Callable
+import asyncio
+import time
+
+import httpx
+
+class LatencyHistogram:
+    """
+    Histogram of request latencies with logarithmic buckets, from 1 ms to about 60 s.
+    """
+    GROWTH: float = 1.25
+    LOWEST: float = 0.001
+    HIGHEST: float = 60.0
+    
+    def __init__(self: "LatencyHistogram") -> None:
+        """
+        Initialize an empty histogram.
+        """
+        self.bounds: list[float] = [self.LOWEST]
+        while self.bounds[-1] < self.HIGHEST:
+            self.bounds.append(self.bounds[-1] * self.GROWTH)
+        
+        self.counts: list[int] = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+    
+    def record(self: "LatencyHistogram", latency: float) -> None:
+        """
+        Record a latency.
+        
+        Parameters:
+            latency (float): The latency in seconds.
+        """
+        self.counts[bisect_left(self.bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+    
+    def percentile(self: "LatencyHistogram", fraction: float) -> float | None:
+        """
+        Estimate a latency percentile.
+        
+        Parameters:
+            fraction (float): The percentile as a fraction, e.g. 0.95 for p95.
+        
+        Returns:
+            float | None: The upper bound of the bucket containing the percentile, or None if the histogram is empty.
+        """
+        if not self.count:
+            return None
+        
+        target = fraction * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            cumulative += count
+            if cumulative >= target:
+                return self.bounds[min(index, len(self.bounds) - 1)]
+        return self.bounds[-1]
+    
+    def buckets(self: "LatencyHistogram") -> list[tuple[float, int]]:
+        """
+        Get the non-empty buckets of the histogram.
+        
+        Returns:
+            list[tuple[float, int]]: (upper bound in seconds, count) pairs. The last bound is infinity.
+        """
+        bounds = [*self.bounds, float("inf")]
+        return [(bounds[index], count) for index, count in enumerate(self.counts) if count]
+
+class HedgePolicy:
+    """
+    Policy for hedged requests.
+    
+    If a request hasn't completed after the `percentile` latency of previous requests of the same
+    kind, a duplicate is sent. The first successful response is used and the other is cancelled.
+    Each request earns `budget` hedge tokens (up to `burst`) and each hedge costs one token, so
+    hedges add at most `budget` extra load.
+    """
+    PERCENTILE: float = 0.95
+    MIN_DELAY: float = 0.05
+    BUDGET: float = 0.1
+    BURST: float = 10.0
+    MIN_SAMPLES: int = 20
+    
+    def __init__(
+        self: "HedgePolicy",
+        percentile: float = PERCENTILE,
+        min_delay: float = MIN_DELAY,
+        budget: float = BUDGET,
+        burst: float = BURST,
+        min_samples: int = MIN_SAMPLES
+        ) -> None:
+        """
+        Initialize the hedge policy.
+        
+        Parameters:
+            percentile (float, optional): The latency percentile after which a hedge is sent, as a fraction. Defaults to PERCENTILE.
+            min_delay (float, optional): The minimum delay before a hedge in seconds. Defaults to MIN_DELAY.
+            budget (float, optional): The maximum ratio of hedged to total requests. Defaults to BUDGET.
+            burst (float, optional): The maximum number of hedge tokens that can be saved up. Defaults to BURST.
+            min_samples (int, optional): The number of latencies to record before hedging starts. Defaults to MIN_SAMPLES.
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.budget = budget
+        self.burst = burst
+        self.min_samples = min_samples
+        
+        self.histograms: dict[str, LatencyHistogram] = {}
+        self.requests: int = 0
+        self.hedges: int = 0
+        self.hedge_wins: int = 0
+        self._tokens: float = 0.0
+    
+    def delay(self: "HedgePolicy", kind: str) -> float | None:
+        """
+        Get the delay before a hedge is sent for a kind of request.
+        
+        Parameters:
+            kind (str): The kind of request, e.g. "search" or "view".
+        
+        Returns:
+            float | None: The delay in seconds, or None if not enough latencies are recorded yet.
+        """
+        histogram = self.histograms.get(kind)
+        if histogram is None or histogram.count < self.min_samples:
+            return None
+        return max(self.min_delay, histogram.percentile(self.percentile))
+    
+    @staticmethod
+    def _is_success(task: asyncio.Task) -> bool:
+        """
+        Check whether a finished request task produced a usable response.
+        """
+        if task.cancelled() or task.exception() is not None:
+            return False
+        status_code = task.result().status_code
+        return status_code != 429 and status_code < 500
+    
+    async def run(self: "HedgePolicy", kind: str, send: Callable[[], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a request, hedging it if it is slow and the budget allows.
+        
+        Parameters:
+            kind (str): The kind of request, used to pick the latency histogram.
+            send (Callable[[], Awaitable[httpx.Response]]): A function sending the request.
+        
+        Raises:
+            httpx.HTTPError: If every attempt failed with an HTTP-related error.
+        
+        Returns:
+            httpx.Response: The first successful response, or the first failed one if none succeeded.
+        """
+        histogram = self.histograms.setdefault(kind, LatencyHistogram())
+        self.requests += 1
+        self._tokens = min(self.burst, self._tokens + self.budget)
+        
+        started = time.perf_counter()
+        primary = asyncio.ensure_future(send())
+        pending = {primary}
+        try:
+            delay = self.delay(kind)
+            if delay is not None:
+                await asyncio.wait(pending, timeout=delay)
+                if not primary.done() and self._tokens >= 1:
+                    self._tokens -= 1
+                    self.hedges += 1
+                    pending.add(asyncio.ensure_future(send()))
+            
+            first_failure = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if self._is_success(task):
+                        histogram.record(time.perf_counter() - started)
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    first_failure = first_failure or task
+            return first_failure.result()
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,333 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable
+import time
+
+import httpx
+
+@dataclass
+class RequestMetrics:
+    """
+    Timings and sizes of a single HTTP request.
+    
+    Connection timings are None when the request reused a pooled connection.
+    
+    Attributes:
+        method (str): The HTTP method of the request.
+        url (str): The URL of the request.
+        status_code (int | None): The status code of the response. None if the request failed.
+        bytes_received (int): The number of body bytes received.
+        dns_time (float | None): Seconds spent resolving the host name, measured when the client resolves through a DNSCache.
+        connect_time (float | None): Seconds spent opening the TCP connection, including the DNS lookup when it isn't measured separately.
+        tls_time (float | None): Seconds spent on the TLS handshake.
+        ttfb (float | None): Seconds from sending the request until the response headers arrived.
+        download_time (float | None): Seconds spent downloading the response body.
+        total_time (float): Total seconds spent on the request.
+        retries (int): The number of earlier attempts of the request, e.g. on other proxies of a proxy pool.
+        error (BaseException | None): The exception raised by the request, if any.
+    """
+    method: str
+    url: str
+    status_code: int | None
+    bytes_received: int
+    dns_time: float | None
+    connect_time: float | None
+    tls_time: float | None
+    ttfb: float | None
+    download_time: float | None
+    total_time: float
+    retries: int = 0
+    error: BaseException | None = None
+
+@dataclass
+class ParseMetrics:
+    """
+    Timings of a parse phase.
+    
+    Attributes:
+        phase (str): The parse phase, one of "search", "torrent_info", "metainfo" or "feed".
+        url (str): The URL of the parsed page.
+        parse_time (float): Seconds spent parsing the page and building models.
+        rows (int): The number of rows (torrents, files or comments) parsed.
+    """
+    phase: str
+    url: str
+    parse_time: float
+    rows: int
+
+@dataclass
+class PoolMetrics:
+    """
+    Saturation of the connection pool at the start of a request.
+    
+    Attributes:
+        in_flight (int): The number of requests in flight, including the new one.
+        max_connections (int | None): The maximum number of connections of the pool. None if unbounded.
+    """
+    in_flight: int
+    max_connections: int | None
+
+class Hooks:
+    """
+    Registry of instrumentation callbacks.
+    
+    Events:
+        request (RequestMetrics): Emitted after every HTTP request.
+        parse (ParseMetrics): Emitted after every parse phase.
+        pool (PoolMetrics): Emitted before every HTTP request.
+        retry (RequestMetrics): Emitted after every retried attempt of a request, along with its "request" event.
+        cache_hit (str): Emitted with the cache key when a lookup or response is served from a cache, e.g. "dns:nyaa.si:443".
+        concurrency (ConcurrencySample): Emitted when an adaptive concurrency limit changes.
+        proxy (ProxySample): Emitted when a proxy of a proxy pool changes state.
+    """
+    EVENTS: tuple[str, ...] = ("request", "parse", "pool", "retry", "cache_hit", "concurrency", "proxy")
+    
+    def __init__(self: "Hooks") -> None:
+        """
+        Initialize an empty hook registry.
+        """
+        self._listeners: dict[str, list[Callable[[Any], None]]] = {event: [] for event in self.EVENTS}
+    
+    def on(self: "Hooks", event: str, callback: Callable[[Any], None]) -> Callable[[Any], None]:
+        """
+        Register a callback for an event.
+        
+        Parameters:
+            event (str): The name of the event.
+            callback (Callable[[Any], None]): The callback, called with the event payload.
+        
+        Raises:
+            ValueError: If the event is not known.
+        
+        Returns:
+            Callable[[Any], None]: The callback, so this method can be used as a decorator factory.
+        """
+        if event not in self._listeners:
+            raise ValueError(f"Unknown event: {event}")
+        
+        self._listeners[event].append(callback)
+        return callback
+    
+    def off(self: "Hooks", event: str, callback: Callable[[Any], None]) -> None:
+        """
+        Unregister a callback for an event.
+        
+        Parameters:
+            event (str): The name of the event.
+            callback (Callable[[Any], None]): The callback to remove.
+        """
+        if callback in self._listeners.get(event, []):
+            self._listeners[event].remove(callback)
+    
+    def has_listeners(self: "Hooks", event: str) -> bool:
+        """
+        Check whether an event has any callbacks.
+        
+        Parameters:
+            event (str): The name of the event.
+        
+        Returns:
+            bool: True if at least one callback is registered.
+        """
+        return bool(self._listeners.get(event))
+    
+    def emit(self: "Hooks", event: str, payload: Any) -> None:
+        """
+        Call every callback registered for an event.
+        
+        Parameters:
+            event (str): The name of the event.
+            payload (Any): The payload passed to the callbacks.
+        """
+        for callback in self._listeners.get(event, ()):
+            callback(payload)
+
+class _RequestTrace:
+    """
+    Collects httpcore trace events of a single request into RequestMetrics timings.
+    """
+    def __init__(self: "_RequestTrace") -> None:
+        self.started: dict[str, float] = {}
+        self.durations: dict[str, float] = {}
+        self.request_sent: float | None = None
+        self.headers_received: float | None = None
+        self.dns_time: float | None = None
+    
+    async def __call__(self: "_RequestTrace", event_name: str, info: dict) -> None:
+        now = time.perf_counter()
+        step, _, state = event_name.rpartition(".")
+        if state == "started":
+            self.started[step] = now
+        elif state in ("complete", "failed") and step in self.started:
+            self.durations[step] = now - self.started[step]
+        
+        if step.endswith("send_request_headers") and state == "started":
+            self.request_sent = now
+        elif step.endswith("receive_response_headers") and state == "complete":
+            self.headers_received = now
+    
+    def duration(self: "_RequestTrace", suffix: str) -> float | None:
+        for step, duration in self.durations.items():
+            if step.endswith(suffix):
+                return duration
+        return None
+
+# The trace of the request sent by the current task, for timings httpcore doesn't trace itself.
+_current_trace: ContextVar[_RequestTrace | None] = ContextVar("nyaascraper_request_trace", default=None)
+
+def record_dns_time(seconds: float) -> None:
+    """
+    Record time spent resolving a host name for the request being traced in the current task, if any.
+    
+    Parameters:
+        seconds (float): The seconds spent on the lookup.
+    """
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.dns_time = (trace.dns_time or 0.0) + seconds
+
+async def traced_get(
+    http_client: httpx.AsyncClient,
+    hooks: Hooks,
+    url: str,
+    params: dict | None = None,
+    in_flight: int = 1,
+    retries: int = 0
+    ) -> httpx.Response:
+    """
+    Send a GET request and emit its metrics to the hooks.
+    
+    Parameters:
+        http_client (httpx.AsyncClient): The HTTP client to send the request with.
+        hooks (Hooks): The hooks to emit the metrics to.
+        url (str): The URL of the request.
+        params (dict | None, optional): The query parameters of the request. Defaults to None.
+        in_flight (int, optional): The number of requests in flight, including this one. Defaults to 1.
+        retries (int, optional): The number of earlier attempts of the request. If not 0, a "retry" event is emitted too. Defaults to 0.
+    
+    Raises:
+        httpx.HTTPError: If an HTTP-related error occurs during the request.
+    
+    Returns:
+        httpx.Response: The response of the request.
+    """
+    if hooks.has_listeners("pool"):
+        limits = getattr(getattr(http_client, "_transport", None), "_pool", None)
+        hooks.emit("pool", PoolMetrics(in_flight=in_flight, max_connections=getattr(limits, "_max_connections", None)))
+    
+    trace = _RequestTrace()
+    token = _current_trace.set(trace)
+    started = time.perf_counter()
+    response, error = None, None
+    try:
+        response = await http_client.get(url, params=params, extensions={"trace": trace})
+        return response
+    except BaseException as exc:
+        error = exc
+        raise
+    finally:
+        finished = time.perf_counter()
+        _current_trace.reset(token)
+        ttfb = None
+        if trace.request_sent is not None and trace.headers_received is not None:
+            ttfb = trace.headers_received - trace.request_sent
+        connect_time = trace.duration("connect_tcp")
+        if connect_time is not None and trace.dns_time is not None:
+            connect_time = max(connect_time - trace.dns_time, 0.0)
+        
+        metrics = RequestMetrics(
+            method="GET",
+            url=str(response.url) if response is not None else url,
+            status_code=response.status_code if response is not None else None,
+            bytes_received=len(response.content) if response is not None else 0,
+            dns_time=trace.dns_time,
+            connect_time=connect_time,
+            tls_time=trace.duration("start_tls"),
+            ttfb=ttfb,
+            download_time=trace.duration("receive_response_body"),
+            total_time=finished - started,
+            retries=retries,
+            error=error
+            )
+        hooks.emit("request", metrics)
+        if retries:
+            hooks.emit("retry", metrics)
+
+class PrometheusExporter:
+    """
+    Exports hook events as Prometheus metrics.
+    
+    Requires the optional `prometheus-client` package.
+    """
+    def __init__(self: "PrometheusExporter", hooks: Hooks, registry: Any = None, namespace: str = "nyaascraper") -> None:
+        """
+        Register Prometheus metrics and subscribe them to the hooks.
+        
+        Parameters:
+            hooks (Hooks): The hooks to subscribe to.
+            registry (prometheus_client.CollectorRegistry | None, optional): The registry to register metrics in. Defaults to the global registry.
+            namespace (str, optional): The namespace of the metrics. Defaults to "nyaascraper".
+        
+        Raises:
+            ImportError: If prometheus-client is not installed.
+        """
+        try:
+            import prometheus_client
+        except ImportError as exc:
+            raise ImportError("PrometheusExporter requires prometheus-client: pip install nyaasi-scraper[prometheus]") from exc
+        
+        kwargs = {"namespace": namespace, **({"registry": registry} if registry is not None else {})}
+        self.request_seconds = prometheus_client.Histogram(
+            "request_seconds", "Time spent on HTTP requests, by phase.", ["phase"], **kwargs
+            )
+        self.response_bytes = prometheus_client.Counter(
+            "response_bytes", "Bytes received in HTTP response bodies.", **kwargs
+            )
+        self.requests = prometheus_client.Counter(
+            "requests", "HTTP requests, by status code.", ["status"], **kwargs
+            )
+        self.parse_seconds = prometheus_client.Histogram(
+            "parse_seconds", "Time spent parsing pages, by page type.", ["phase"], **kwargs
+            )
+        self.parsed_rows = prometheus_client.Counter(
+            "parsed_rows", "Rows parsed from pages, by page type.", ["phase"], **kwargs
+            )
+        self.retries = prometheus_client.Counter("retries", "Retried HTTP requests.", **kwargs)
+        self.cache_hits = prometheus_client.Counter("cache_hits", "Responses served from a cache.", **kwargs)
+        self.pool_in_flight = prometheus_client.Gauge(
+            "pool_in_flight", "HTTP requests in flight at the start of the last request.", **kwargs
+            )
+        self.concurrency_limit = prometheus_client.Gauge(
+            "concurrency_limit", "Current adaptive concurrency limit.", **kwargs
+            )
+        self.concurrency_changes = prometheus_client.Counter(
+            "concurrency_changes", "Adaptive concurrency limit changes, by reason.", ["reason"], **kwargs
+            )
+        self.proxy_state_changes = prometheus_client.Counter(
+            "proxy_state_changes", "Proxy pool state changes, by new state and reason.", ["state", "reason"], **kwargs
+            )
+        
+        hooks.on("request", self._on_request)
+        hooks.on("parse", self._on_parse)
+        hooks.on("pool", lambda metrics: self.pool_in_flight.set(metrics.in_flight))
+        hooks.on("retry", lambda metrics: self.retries.inc())
+        hooks.on("cache_hit", lambda key: self.cache_hits.inc())
+        hooks.on("concurrency", self._on_concurrency)
+        hooks.on("proxy", lambda sample: self.proxy_state_changes.labels(state=sample.state.value, reason=sample.reason).inc())
+    
+    def _on_request(self: "PrometheusExporter", metrics: RequestMetrics) -> None:
+        self.requests.labels(status=str(metrics.status_code or "error")).inc()
+        self.response_bytes.inc(metrics.bytes_received)
+        self.request_seconds.labels(phase="total").observe(metrics.total_time)
+        for phase in ("dns", "connect", "tls", "ttfb", "download"):
+            value = getattr(metrics, "ttfb" if phase == "ttfb" else f"{phase}_time")
+            if value is not None:
+                self.request_seconds.labels(phase=phase).observe(value)
+    
+    def _on_concurrency(self: "PrometheusExporter", sample: Any) -> None:
+        self.concurrency_limit.set(sample.limit)
+        self.concurrency_changes.labels(reason=sample.reason).inc()
+    
+    def _on_parse(self: "PrometheusExporter", metrics: ParseMetrics) -> None:
+        self.parse_seconds.labels(phase=metrics.phase).observe(metrics.parse_time)
+        self.parsed_rows.labels(phase=metrics.phase).inc(metrics.rows)
@@ -0,0 +1,905 @@
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from email.utils import formatdate
+from html import escape
+from typing import Any, Awaitable, Callable
+from urllib.parse import unquote_to_bytes, urlsplit
+import asyncio
+import json
+import pickle
+import random
+import re
+import statistics
+import struct
+import time
+import timeit
+import tracemalloc
+import zlib
+
+import httpx
+
+from .client import NyaaClient
+from .rss import NyaaRSSClient
+from .warmup import DNSCache
+from .enums import SITE
+from .utils import codec
+from .utils.bencode import bencode
+from .utils.httpserver import Request, read_request, format_response
+
+@dataclass
+class MockNyaaConfig:
+    """
+    Shape and behaviour of the pages served by MockNyaaServer.
+    
+    Attributes:
+        rows (int, optional): Torrents per search, user and RSS page. Defaults to 75.
+        total_results (int, optional): Total results of every search, for pagination. Defaults to 1000.
+        torrents (int, optional): The highest View-ID that exists; higher ones return 404. Defaults to 1000000.
+        files (int, optional): Files in the file tree of every torrent. Defaults to 10.
+        folders (int, optional): Folders the files are spread over. 0 puts files at the top level. Defaults to 1.
+        comments (int, optional): Comments on every torrent. Defaults to 5.
+        latency (float, optional): Seconds every response is delayed by. Defaults to 0.0.
+        jitter (float, optional): Extra random delay of up to this many seconds. Defaults to 0.0.
+        error_rate (float, optional): The fraction of requests answered with 500. Defaults to 0.0.
+        throttle_rate (float, optional): The fraction of requests answered with 429. Defaults to 0.0.
+        seed (int | None, optional): The seed of the random delays and injected errors. Defaults to None.
+    """
+    rows: int = 75
+    total_results: int = 1000
+    torrents: int = 1000000
+    files: int = 10
+    folders: int = 1
+    comments: int = 5
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    seed: int | None = None
+
+class MockNyaaServer:
+    """
+    Local HTTP server serving synthetic nyaa pages for load and integration tests.
+    
+    Pages follow the markup of the real site closely enough for NyaaClient and NyaaRSSClient to
+    parse them, and are generated from the View-IDs, so the same URL always returns the same page.
+    
+    Routes (HEAD is answered like GET, without the body):
+        GET /?q=&p= : A search page.
+        GET /user/<username>?p= : A user page.
+        GET /?page=rss : An RSS feed.
+        GET /view/<view_id> : A torrent view page.
+        GET /download/<view_id>.torrent : A torrent file.
+    """
+    def __init__(self: "MockNyaaServer", config: MockNyaaConfig | None = None, host: str = "127.0.0.1", port: int = 0) -> None:
+        """
+        Initialize the server.
+        
+        Parameters:
+            config (MockNyaaConfig | None, optional): The shape and behaviour of the pages. If not specified, the defaults are used. Defaults to None.
+            host (str, optional): The host to listen on. Defaults to "127.0.0.1".
+            port (int, optional): The port to listen on. 0 picks a free port. Defaults to 0.
+        """
+        self.config = config or MockNyaaConfig()
+        self.host = host
+        self.port = port
+        self.requests: Counter[str] = Counter()
+        self._random = random.Random(self.config.seed)
+        self._server: asyncio.Server | None = None
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+    
+    @property
+    def url(self: "MockNyaaServer") -> str:
+        """
+        Getter property for the base URL of the server. Set it as `base_url` of a client.
+        
+        Returns:
+            str: The base URL.
+        """
+        return f"http://{self.host}:{self.port}"
+    
+    async def start(self: "MockNyaaServer") -> None:
+        """
+        Start listening. The actual port is stored in `port`.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, backlog=1024)
+        self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def close(self: "MockNyaaServer") -> None:
+        """
+        Stop listening and close open connections.
+        """
+        if self._server is not None:
+            self._server.close()
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+    
+    async def __aenter__(self: "MockNyaaServer") -> "MockNyaaServer":
+        await self.start()
+        return self
+    
+    async def __aexit__(self: "MockNyaaServer", *exc_info: Any) -> None:
+        await self.close()
+    
+    async def _handle(self: "MockNyaaServer", reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections[asyncio.current_task()] = writer
+        try:
+            while (request := await read_request(reader)) is not None:
+                response = await self._respond(request)
+                writer.write(response)
+                await writer.drain()
+                if not request.keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+    
+    async def _respond(self: "MockNyaaServer", request: Request) -> bytes:
+        """
+        Build the response to a request, after the configured delay.
+        """
+        config = self.config
+        if config.latency or config.jitter:
+            await asyncio.sleep(config.latency + self._random.random() * config.jitter)
+        
+        route, status, body, content_type, headers = self._route(request)
+        roll = self._random.random()
+        if status == 200 and roll < config.throttle_rate:
+            status, body, content_type, headers = 429, b"Too Many Requests", "text/plain; charset=utf-8", {"Retry-After": "1"}
+        elif status == 200 and roll < config.throttle_rate + config.error_rate:
+            status, body, content_type, headers = 500, b"Internal Server Error", "text/plain; charset=utf-8", {}
+        
+        self.requests[f"{route} {status}"] += 1
+        response = format_response(status, body, content_type=content_type, headers=headers, keep_alive=request.keep_alive)
+        if request.method == "HEAD":
+            # Keep the Content-Length of the body that isn't sent.
+            return response[:response.index(b"\r\n\r\n") + 4]
+        return response
+    
+    def _route(self: "MockNyaaServer", request: Request) -> tuple[str, int, bytes, str, dict[str, str]]:
+        html = "text/html; charset=utf-8"
+        page = max(int(request.query.get("p", 1) or 1), 1)
+        if request.method not in ("GET", "HEAD"):
+            return "other", 405, b"Method Not Allowed", "text/plain; charset=utf-8", {}
+        if request.path == "/" and request.query.get("page") == "rss":
+            magnets = request.query.get("magnets", "").lower() == "true"
+            return "feed", 200, self.feed_page(magnets).encode(), "application/xml; charset=utf-8", {}
+        if request.path == "/":
+            return "search", 200, self.search_page(page, term=request.query.get("q"), sort=self._sort(request)).encode(), html, {}
+        if (match := re.fullmatch(r"/user/([^/]+)", request.path)):
+            return "user", 200, self.search_page(page, match[1], request.query.get("q"), self._sort(request)).encode(), html, {}
+        if (match := re.fullmatch(r"/view/(\d+)", request.path)) and 0 < int(match[1]) <= self.config.torrents:
+            return "view", 200, self.view_page(int(match[1])).encode(), html, {}
+        if (match := re.fullmatch(r"/download/(\d+)\.torrent", request.path)) and 0 < int(match[1]) <= self.config.torrents:
+            return "download", 200, self.torrent_file(int(match[1])), "application/x-bittorrent", {}
+        return "other", 404, b"Not Found", "text/plain; charset=utf-8", {}
+    
+    @staticmethod
+    def _sort(request: Request) -> tuple[str, str] | None:
+        if "s" not in request.query and "o" not in request.query:
+            return None
+        return request.query.get("s", "id"), request.query.get("o", "desc")
+    
+    @staticmethod
+    def _name(view_id: int) -> str:
+        return f"[Group{view_id % 7}] Show {view_id % 97} - {view_id % 24 + 1:02d} [1080p][{view_id:08X}].mkv"
+    
+    def search_page(
+        self: "MockNyaaServer",
+        page: int = 1,
+        username: str | None = None,
+        term: str | None = None,
+        sort: tuple[str, str] | None = None
+        ) -> str:
+        """
+        Generate a search or user page.
+        
+        Each search term gets a different range of View-IDs. Sorting follows the generated values of the rows.
+        
+        Parameters:
+            page (int, optional): The page number. Defaults to 1.
+            username (str | None, optional): The user of a user page. Defaults to None.
+            term (str | None, optional): The search term. Defaults to None.
+            sort (tuple[str, str] | None, optional): The "s" and "o" parameters, e.g. ("seeders", "desc"). If not specified, newest first. Defaults to None.
+        
+        Returns:
+            str: The HTML of the page.
+        """
+        config = self.config
+        pages = max((config.total_results + config.rows - 1) // config.rows, 1)
+        start = (min(page, pages) - 1) * config.rows
+        count = max(min(config.rows, config.total_results - start), 0)
+        newest = config.torrents
+        if term:
+            newest -= zlib.crc32(term.encode()) % max(config.torrents - config.total_results, 1)
+        if sort is None or sort == ("id", "desc"):
+            view_ids = range(newest - start, newest - start - count, -1)
+        else:
+            keys = {
+                "id": lambda view_id: view_id,
+                "size": lambda view_id: view_id % 1000,
+                "seeders": lambda view_id: view_id % 500,
+                "leechers": lambda view_id: view_id % 50,
+                "downloads": lambda view_id: view_id % 5000,
+                "comments": lambda view_id: 0
+                }
+            key = keys.get(sort[0], keys["id"])
+            candidates = range(newest, newest - config.total_results, -1)
+            view_ids = sorted(candidates, key=lambda view_id: (key(view_id), view_id), reverse=sort[1] != "asc")[start:start + count]
+        rows = []
+        for view_id in view_ids:
+            name = escape(self._name(view_id))
+            rows.append(
+                f'<tr class="{"success" if view_id % 5 == 0 else "default"}">'
+                '<td><a href="/?c=1_2" title="Anime - English-translated"><img src="/static/img/icons/nyaa/1_2.png" alt="Anime - English-translated" class="category-icon"></a></td>'
+                f'<td colspan="2"><a href="/view/{view_id}#comments" class="comments" title="{config.comments} comments"><i class="fa fa-comments-o"></i>{config.comments}</a>\n'
+                f'<a href="/view/{view_id}" title="{name}">{name}</a></td>'
+                f'<td class="text-center"><a href="/download/{view_id}.torrent"><i class="fa fa-fw fa-download"></i></a>\n'
+                f'<a href="magnet:?xt=urn:btih:{view_id:040x}&amp;dn={view_id}&amp;tr=http%3A%2F%2Fnyaa.tracker.wf%3A7777%2Fannounce"><i class="fa fa-fw fa-magnet"></i></a></td>'
+                f'<td class="text-center">{view_id % 1000 / 10 + 0.1:.1f} GiB</td>'
+                f'<td class="text-center" data-timestamp="{1700000000 + view_id}">2023-11-14 22:13</td>'
+                f'<td class="text-center">{view_id % 500}</td><td class="text-center">{view_id % 50}</td><td class="text-center">{view_id % 5000}</td></tr>'
+                )
+        
+        links = [f'<li class="previous"><a rel="prev" href="?p={page - 1}">&laquo;</a></li>' if page > 1 else '<li class="disabled"><span>&laquo;</span></li>']
+        for number in range(max(page - 4, 1), min(page + 4, pages) + 1):
+            if number == page:
+                links.append(f'<li class="active"><a href="#">{number} <span class="sr-only">(current)</span></a></li>')
+            else:
+                links.append(f'<li><a href="?p={number}">{number}</a></li>')
+        links.append(f'<li class="next"><a rel="next" href="?p={page + 1}">&raquo;</a></li>' if page < pages else '<li class="disabled"><span>&raquo;</span></li>')
+        
+        header = f'<div class="header"><h3>{escape(username)}</h3></div>' if username else ""
+        return (
+            f'<html><body>{header}<div class="table-responsive"><table class="table table-bordered table-hover table-striped torrent-list">'
+            f'<thead></thead><tbody>{"".join(rows)}</tbody></table></div>'
+            f'<div class="center"><div class="pagination-page-info">Displaying results {start + 1}-{start + count} out of {config.total_results} results.<br>Please refine your search.</div>'
+            f'<ul class="pagination">{"".join(links)}</ul></div></body></html>'
+            )
+    
+    def view_page(self: "MockNyaaServer", view_id: int) -> str:
+        """
+        Generate a torrent view page.
+        
+        Parameters:
+            view_id (int): The View-ID of the torrent.
+        
+        Returns:
+            str: The HTML of the page.
+        """
+        config = self.config
+        files = [f'<li><i class="fa fa-file"></i>Episode {index + 1:02d}.mkv <span class="file-size">(350.{index % 10} MiB)</span></li>' for index in range(config.files)]
+        if config.folders:
+            per_folder = (len(files) + config.folders - 1) // config.folders or 1
+            tree = "".join(
+                f'<li><a href="" class="folder"><i class="fa fa-folder-open"></i>Folder {index + 1}</a><ul>{"".join(files[index * per_folder:(index + 1) * per_folder])}</ul></li>'
+                for index in range(config.folders)
+                )
+        else:
+            tree = "".join(files)
+        
+        comments = "".join(
+            f'<div class="panel panel-default comment-panel" id="com-{view_id * 100 + index}"><div class="panel-body"><div class="col-md-2">'
+            f'<p><a class="text-default" href="/user/commenter{index}" title="User">commenter{index}</a>{" (uploader)" if index == 0 else ""}</p>'
+            '<img class="avatar" src="/static/img/avatar/default.png" alt="User"></div>'
+            f'<div class="comment-body col-md-10"><small data-timestamp="{1700000100 + index}">2023-11-14 22:15</small>'
+            f'<div class="comment-content" id="torrent-comment{index}">Thanks for episode {view_id % 24 + 1}!</div></div></div></div>'
+            for index in range(config.comments)
+            )
+        
+        return (
+            f'<html><body><div class="panel panel-success"><div class="panel-heading"><h3 class="panel-title">{escape(self._name(view_id))}</h3></div>'
+            '<div class="panel-body">'
+            '<div class="row"><div class="col-md-1">Category:</div><div class="col-md-5"><a href="/?c=1_0">Anime</a> - <a href="/?c=1_2">English-translated</a></div>'
+            f'<div class="col-md-1">Date:</div><div class="col-md-5" data-timestamp="{1700000000 + view_id}">2023-11-14 22:13</div></div>'
+            f'<div class="row"><div class="col-md-1">Submitter:</div><div class="col-md-5"><a class="text-success" href="/user/Group{view_id % 7}" title="Trusted">Group{view_id % 7}</a></div>'
+            f'<div class="col-md-1">Seeders:</div><div class="col-md-5"><span style="color: green;">{view_id % 500}</span></div></div>'
+            '<div class="row"><div class="col-md-1">Information:</div><div class="col-md-5">No information.</div>'
+            f'<div class="col-md-1">Leechers:</div><div class="col-md-5"><span style="color: red;">{view_id % 50}</span></div></div>'
+            f'<div class="row"><div class="col-md-1">File size:</div><div class="col-md-5">{view_id % 1000 / 10 + 0.1:.1f} GiB</div>'
+            f'<div class="col-md-1">Completed:</div><div class="col-md-5">{view_id % 5000}</div></div>'
+            f'<div class="row"><div class="col-md-1">Info hash:</div><div class="col-md-5"><kbd>{view_id:040x}</kbd></div></div>'
+            f'</div><div class="panel-footer clearfix"><a href="/download/{view_id}.torrent"><i class="fa fa-download fa-fw"></i>Download Torrent</a> or '
+            f'<a href="magnet:?xt=urn:btih:{view_id:040x}&amp;dn={view_id}" class="card-footer-item"><i class="fa fa-magnet fa-fw"></i>Magnet</a></div></div>'
+            '<div class="panel panel-default"><div markdown-text class="panel-body" id="torrent-description">#### Release notes\nEncoded from the Blu-ray.</div></div>'
+            f'<div class="panel panel-default"><div class="panel-heading"><h3 class="panel-title">File list</h3></div><div class="torrent-file-list panel-body"><ul>{tree}</ul></div></div>'
+            f'<div id="comments" class="panel panel-default"><div class="panel-heading"><h3 class="panel-title">Comments - {config.comments}</h3></div>{comments}</div>'
+            '</body></html>'
+            )
+    
+    def feed_page(self: "MockNyaaServer", magnets: bool = False) -> str:
+        """
+        Generate an RSS feed.
+        
+        Parameters:
+            magnets (bool, optional): Whether item links are magnet links. Defaults to False.
+        
+        Returns:
+            str: The XML of the feed.
+        """
+        config = self.config
+        items = []
+        for view_id in range(config.torrents, max(config.torrents - config.rows, 0), -1):
+            link = f"magnet:?xt=urn:btih:{view_id:040x}" if magnets else f"{self.url}/download/{view_id}.torrent"
+            items.append(
+                f'<item><title>{escape(self._name(view_id))}</title><link>{escape(link)}</link>'
+                f'<guid isPermaLink="true">{self.url}/view/{view_id}</guid><pubDate>{formatdate(1700000000 + view_id)}</pubDate>'
+                f'<nyaa:seeders>{view_id % 500}</nyaa:seeders><nyaa:leechers>{view_id % 50}</nyaa:leechers><nyaa:downloads>{view_id % 5000}</nyaa:downloads>'
+                f'<nyaa:infoHash>{view_id:040x}</nyaa:infoHash><nyaa:categoryId>1_2</nyaa:categoryId><nyaa:category>Anime - English-translated</nyaa:category>'
+                f'<nyaa:size>{view_id % 1000 / 10 + 0.1:.1f} GiB</nyaa:size><nyaa:comments>{config.comments}</nyaa:comments>'
+                f'<nyaa:trusted>{"Yes" if view_id % 5 == 0 else "No"}</nyaa:trusted><nyaa:remake>No</nyaa:remake>'
+                f'<description><![CDATA[<a href="{self.url}/view/{view_id}">#{view_id} | {escape(self._name(view_id))}</a>]]></description></item>'
+                )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?><rss xmlns:atom="http://www.w3.org/2005/Atom" xmlns:nyaa="https://nyaa.si/xmlns/nyaa" version="2.0">'
+            f'<channel><title>Nyaa - Home - Torrent File RSS</title><description>RSS Feed for Home</description><link>{self.url}/</link>'
+            f'{"".join(items)}</channel></rss>'
+            )
+    
+    def torrent_file(self: "MockNyaaServer", view_id: int) -> bytes:
+        """
+        Generate a torrent file.
+        
+        Parameters:
+            view_id (int): The View-ID of the torrent.
+        
+        Returns:
+            bytes: The bencoded metainfo.
+        """
+        piece_length = 1 << 20
+        files = [
+            {b"length": 350 * 1024 * 1024 + index, b"path": [f"Folder {index % max(self.config.folders, 1) + 1}".encode(), f"Episode {index + 1:02d}.mkv".encode()]}
+            for index in range(max(self.config.files, 1))
+            ]
+        pieces = -(-sum(file[b"length"] for file in files) // piece_length)
+        return bencode({
+            b"announce": b"http://nyaa.tracker.wf:7777/announce",
+            b"info": {
+                b"name": self._name(view_id).encode(),
+                b"piece length": piece_length,
+                b"pieces": view_id.to_bytes(20, "big") * pieces,
+                b"files": files
+                }
+            })
+
+class MockTracker(asyncio.DatagramProtocol):
+    """
+    Local stand-in BitTorrent tracker answering UDP (BEP 15) and HTTP (BEP 48) scrape requests.
+    
+    Peer counts are derived from the info hash: seeders from its first byte, leechers from its
+    second and completed downloads from its third, times ten.
+    
+    Attributes:
+        udp_packets (int): The number of UDP scrape packets received.
+        http_requests (int): The number of HTTP scrape requests received.
+    """
+    def __init__(
+        self: "MockTracker",
+        host: str = "127.0.0.1",
+        drop_rate: float = 0.0,
+        omit_rate: float = 0.0,
+        seed: int | None = None
+        ) -> None:
+        """
+        Initialize the tracker.
+        
+        Parameters:
+            host (str, optional): The host to listen on. Defaults to "127.0.0.1".
+            drop_rate (float, optional): The fraction of UDP packets left unanswered. Defaults to 0.0.
+            omit_rate (float, optional): The fraction of info hashes left out of HTTP scrape responses, as for torrents the tracker doesn't know. Defaults to 0.0.
+            seed (int | None, optional): The seed of the dropped packets and omitted info hashes. Defaults to None.
+        """
+        self.host = host
+        self.drop_rate = drop_rate
+        self.omit_rate = omit_rate
+        self.udp_packets: int = 0
+        self.http_requests: int = 0
+        self.udp_port: int = 0
+        self.http_port: int = 0
+        self._random = random.Random(seed)
+        self._transport: asyncio.DatagramTransport | None = None
+        self._server: asyncio.Server | None = None
+    
+    @property
+    def udp_url(self: "MockTracker") -> str:
+        """
+        Getter property for the UDP announce URL.
+        
+        Returns:
+            str: The announce URL.
+        """
+        return f"udp://{self.host}:{self.udp_port}/announce"
+    
+    @property
+    def http_url(self: "MockTracker") -> str:
+        """
+        Getter property for the HTTP announce URL.
+        
+        Returns:
+            str: The announce URL.
+        """
+        return f"http://{self.host}:{self.http_port}/announce"
+    
+    @staticmethod
+    def counts(info_hash: bytes) -> tuple[int, int, int]:
+        """
+        Get the peer counts served for an info hash.
+        
+        Parameters:
+            info_hash (bytes): The raw info hash.
+        
+        Returns:
+            tuple[int, int, int]: The seeders, leechers and completed downloads.
+        """
+        return info_hash[0], info_hash[1], info_hash[2] * 10
+    
+    async def start(self: "MockTracker") -> None:
+        """
+        Start listening on a free UDP port and a free TCP port.
+        """
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(lambda: self, local_addr=(self.host, 0))
+        self.udp_port = self._transport.get_extra_info("sockname")[1]
+        self._server = await asyncio.start_server(self._handle, self.host, 0)
+        self.http_port = self._server.sockets[0].getsockname()[1]
+    
+    async def close(self: "MockTracker") -> None:
+        """
+        Stop listening.
+        """
+        if self._transport is not None:
+            self._transport.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+    
+    async def __aenter__(self: "MockTracker") -> "MockTracker":
+        await self.start()
+        return self
+    
+    async def __aexit__(self: "MockTracker", *exc_info: Any) -> None:
+        await self.close()
+    
+    def datagram_received(self: "MockTracker", data: bytes, addr: tuple) -> None:
+        if len(data) < 16 or self._random.random() < self.drop_rate:
+            return
+        connection_id, action, transaction_id = struct.unpack_from(">QII", data)
+        if action == 0 and connection_id == 0x41727101980:
+            self._transport.sendto(struct.pack(">IIQ", 0, transaction_id, 0x1234), addr)
+        elif action == 2 and connection_id == 0x1234:
+            self.udp_packets += 1
+            hashes = data[16:]
+            response = struct.pack(">II", 2, transaction_id)
+            for index in range(0, len(hashes) - len(hashes) % 20, 20):
+                seeders, leechers, completed = self.counts(hashes[index:index + 20])
+                response += struct.pack(">III", seeders, completed, leechers)
+            self._transport.sendto(response, addr)
+        else:
+            self._transport.sendto(struct.pack(">II", 3, transaction_id) + b"Connection ID mismatch", addr)
+    
+    async def _handle(self: "MockTracker", reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while (request := await read_request(reader)) is not None:
+                writer.write(self._scrape_response(request))
+                await writer.drain()
+                if not request.keep_alive:
+                    return
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    def _scrape_response(self: "MockTracker", request: Request) -> bytes:
+        if request.path != "/scrape":
+            return format_response(404, b"Not Found", keep_alive=request.keep_alive)
+        
+        self.http_requests += 1
+        files = {}
+        # Info hashes repeat and aren't text, so the raw query string is split.
+        for part in request.query_string.split("&"):
+            name, _, value = part.partition("=")
+            if name == "info_hash" and len(info_hash := unquote_to_bytes(value)) == 20 and self._random.random() >= self.omit_rate:
+                seeders, leechers, completed = self.counts(info_hash)
+                files[info_hash] = {b"complete": seeders, b"incomplete": leechers, b"downloaded": completed}
+        return format_response(200, bencode({b"files": files}), content_type="text/plain", keep_alive=request.keep_alive)
+
+@dataclass
+class OperationStats:
+    """
+    Latency statistics of an operation of a load test.
+    
+    Attributes:
+        count (int): The number of completed calls.
+        errors (int): The number of calls that raised.
+        p50 (float | None): The median latency in seconds.
+        p90 (float | None): The 90th percentile latency in seconds.
+        p99 (float | None): The 99th percentile latency in seconds.
+        max (float | None): The maximum latency in seconds.
+    """
+    count: int
+    errors: int
+    p50: float | None
+    p90: float | None
+    p99: float | None
+    max: float | None
+
+@dataclass
+class LoadReport:
+    """
+    The result of a load test.
+    
+    Attributes:
+        duration (float): The duration of the test in seconds.
+        calls (int): The number of calls made, including failed ones.
+        throughput (float): Calls per second.
+        operations (dict[str, OperationStats]): Statistics by operation.
+        errors (dict[str, int]): The number of errors by operation and error.
+        peak_traced_memory (int | None): The peak memory allocated by Python during the test in bytes, if traced.
+        max_rss (int | None): The peak resident set size of the process in bytes, where available.
+        server_requests (dict[str, int]): Requests served by the mock server by route and status, if one was used.
+    """
+    duration: float
+    calls: int
+    throughput: float
+    operations: dict[str, OperationStats]
+    errors: dict[str, int]
+    peak_traced_memory: int | None = None
+    max_rss: int | None = None
+    server_requests: dict[str, int] = field(default_factory=dict)
+    
+    def summary(self: "LoadReport") -> str:
+        """
+        Format the report as a text table.
+        
+        Returns:
+            str: The report.
+        """
+        def ms(value: float | None) -> str:
+            return "-" if value is None else f"{value * 1000:.1f}"
+        
+        lines = [
+            f"{self.calls} calls in {self.duration:.1f} s, {self.throughput:.1f} calls/s",
+            f"{'operation':<10} {'count':>7} {'errors':>7} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+            ]
+        for name, stats in self.operations.items():
+            lines.append(
+                f"{name:<10} {stats.count:>7} {stats.errors:>7} {ms(stats.p50):>9} {ms(stats.p90):>9} {ms(stats.p99):>9} {ms(stats.max):>9}"
+                )
+        for error, count in sorted(self.errors.items(), key=lambda item: -item[1]):
+            lines.append(f"error: {error} x{count}")
+        if self.peak_traced_memory is not None:
+            lines.append(f"peak traced memory: {self.peak_traced_memory / 1024 / 1024:.1f} MiB")
+        if self.max_rss is not None:
+            lines.append(f"max RSS: {self.max_rss / 1024 / 1024:.1f} MiB")
+        if self.server_requests:
+            lines.append("server: " + ", ".join(f"{key} x{count}" for key, count in sorted(self.server_requests.items())))
+        return "\n".join(lines)
+
+def _percentile(latencies: list[float], fraction: float) -> float | None:
+    """
+    Get a nearest-rank percentile of sorted latencies.
+    """
+    if not latencies:
+        return None
+    return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)]
+
+def _max_rss() -> int | None:
+    """
+    Get the peak resident set size of the process in bytes, where the platform reports it.
+    """
+    try:
+        import resource
+        import sys
+    except ImportError:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+DEFAULT_MIX: dict[str, float] = {"search": 3, "user": 1, "view": 4, "views": 1, "download": 1, "feed": 1}
+
+async def run_load(
+    base_url: str,
+    duration: float = 10.0,
+    users: int = 20,
+    mix: dict[str, float] | None = None,
+    batch_size: int = 20,
+    torrents: int = 1000000,
+    client: NyaaClient | None = None,
+    rss_client: NyaaRSSClient | None = None,
+    trace_memory: bool = False,
+    seed: int | None = None
+    ) -> LoadReport:
+    """
+    Run a load test against a nyaa-like server through NyaaClient and NyaaRSSClient.
+    
+    Virtual users call randomly picked operations back to back until the duration has passed:
+    "search" and "user" search pages, "view" gets a torrent view page, "views" gets a batch of view
+    pages through `get_torrent_infos()`, "download" downloads a torrent file and "feed" gets an RSS feed.
+    
+    Parameters:
+        base_url (str): The base URL of the server, e.g. `MockNyaaServer.url`.
+        duration (float, optional): Seconds to run for. Defaults to 10.0.
+        users (int, optional): The number of concurrent virtual users. Defaults to 20.
+        mix (dict[str, float] | None, optional): Relative weights of the operations. If not specified, DEFAULT_MIX is used. Defaults to None.
+        batch_size (int, optional): View pages per "views" call. Defaults to 20.
+        torrents (int, optional): The highest View-ID to request. Defaults to 1000000.
+        client (NyaaClient | None, optional): The client to use, e.g. with hedging or a scheduler configured. If not specified, a default client is used. Defaults to None.
+        rss_client (NyaaRSSClient | None, optional): The RSS client to use. If not specified, a default client is used. Defaults to None.
+        trace_memory (bool, optional): Whether to trace Python memory allocations, which slows the test down. Defaults to False.
+        seed (int | None, optional): The seed of the operation and View-ID choices. Defaults to None.
+    
+    Returns:
+        LoadReport: The report of the test.
+    """
+    mix = mix or DEFAULT_MIX
+    own_clients: list[NyaaClient | NyaaRSSClient] = []
+    if client is None:
+        client = NyaaClient(site=SITE.FUN)
+        own_clients.append(client)
+    if rss_client is None:
+        rss_client = NyaaRSSClient(site=SITE.FUN)
+        own_clients.append(rss_client)
+    client.base_url = rss_client.base_url = base_url.rstrip("/")
+    chooser = random.Random(seed)
+    
+    def view_id() -> int:
+        return chooser.randint(1, torrents)
+    
+    operations: dict[str, Callable[[], Awaitable[Any]]] = {
+        "search": lambda: client.search(term=f"show {chooser.randint(0, 96)}", page=chooser.randint(1, 5)),
+        "user": lambda: client.search(username=f"Group{chooser.randint(0, 6)}"),
+        "view": lambda: client.get_torrent_info(view_id()),
+        "views": lambda: client.get_torrent_infos([view_id() for _ in range(batch_size)]),
+        "download": lambda: client.download_torrent(view_id()),
+        "feed": lambda: rss_client.get_feed(term=f"show {chooser.randint(0, 96)}")
+        }
+    names = [name for name in mix if mix[name] > 0]
+    unknown = set(names) - set(operations)
+    if unknown:
+        raise ValueError(f"Unknown operations: {', '.join(sorted(unknown))}")
+    weights = [mix[name] for name in names]
+    
+    latencies: dict[str, list[float]] = {name: [] for name in names}
+    failures: Counter[str] = Counter()
+    failures_by_operation: Counter[str] = Counter()
+    
+    if trace_memory:
+        tracemalloc.start()
+    started = time.perf_counter()
+    deadline = started + duration
+    
+    async def user() -> None:
+        while time.perf_counter() < deadline:
+            name = chooser.choices(names, weights)[0]
+            call_started = time.perf_counter()
+            try:
+                await operations[name]()
+            except Exception as exc:
+                failures_by_operation[name] += 1
+                detail = f"{exc.response.status_code}" if isinstance(exc, httpx.HTTPStatusError) else type(exc).__name__
+                failures[f"{name} {detail}"] += 1
+            else:
+                latencies[name].append(time.perf_counter() - call_started)
+    
+    try:
+        await asyncio.gather(*(user() for _ in range(users)))
+        elapsed = time.perf_counter() - started
+        peak_traced_memory = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+        for own_client in own_clients:
+            await own_client._http_client.aclose()
+    
+    stats: dict[str, OperationStats] = {}
+    for name in names:
+        values = sorted(latencies[name])
+        stats[name] = OperationStats(
+            count=len(values),
+            errors=failures_by_operation[name],
+            p50=_percentile(values, 0.5),
+            p90=_percentile(values, 0.9),
+            p99=_percentile(values, 0.99),
+            max=values[-1] if values else None
+            )
+    calls = sum(len(values) for values in latencies.values()) + sum(failures.values())
+    return LoadReport(
+        duration=elapsed,
+        calls=calls,
+        throughput=calls / elapsed if elapsed else 0.0,
+        operations=stats,
+        errors=dict(failures),
+        peak_traced_memory=peak_traced_memory,
+        max_rss=_max_rss()
+        )
+
+async def run_mock_load(config: MockNyaaConfig | None = None, **kwargs: Any) -> LoadReport:
+    """
+    Run a load test against a MockNyaaServer started for the test.
+    
+    Parameters:
+        config (MockNyaaConfig | None, optional): The shape and behaviour of the mock pages. Defaults to None.
+        **kwargs: Keyword arguments of `run_load()`.
+    
+    Returns:
+        LoadReport: The report of the test, including the requests served by the mock server.
+    """
+    async with MockNyaaServer(config) as server:
+        kwargs.setdefault("torrents", server.config.torrents)
+        report = await run_load(server.url, **kwargs)
+        report.server_requests = dict(server.requests)
+        return report
+
+async def run_startup_benchmark(base_url: str, runs: int = 20) -> dict[str, tuple[float, float]]:
+    """
+    Measure the latency of the first request of new clients, cold and with the start-up optimizations.
+    
+    Each case creates `runs` new clients one after another and times the request of a search page,
+    leaving out the parsing, which doesn't depend on the connection. The cases are a cold client,
+    one with a shared DNS cache that already holds the host, one warmed up with `warmup()`
+    before the request, and one with both.
+    
+    Parameters:
+        base_url (str): The base URL of the server. Use a host name rather than an IP literal, so the lookup is measured.
+        runs (int, optional): The number of clients per case. Defaults to 20.
+    
+    Returns:
+        dict[str, tuple[float, float]]: The median seconds of the warm-up and of the first request, by case.
+    """
+    url = urlsplit(base_url)
+    shared = DNSCache()
+    await shared.resolve(url.hostname, url.port or (443 if url.scheme == "https" else 80))
+    cases = {
+        "cold": (None, False),
+        "shared dns cache": (shared, False),
+        "warmup()": (None, True),
+        "dns cache + warmup()": (shared, True)
+        }
+    
+    async def first_request(dns_cache: DNSCache | None, warm: bool) -> tuple[float, float]:
+        client = NyaaClient(dns_cache=dns_cache)
+        client.base_url = base_url
+        try:
+            started = time.perf_counter()
+            if warm:
+                await client.warmup()
+            warmed = time.perf_counter()
+            await client._get(client.base_url, params={"q": "test"})
+            return warmed - started, time.perf_counter() - warmed
+        finally:
+            await client._http_client.aclose()
+    
+    results: dict[str, tuple[float, float]] = {}
+    for name, (dns_cache, warm) in cases.items():
+        samples = [await first_request(dns_cache, warm) for _ in range(runs)]
+        results[name] = (
+            statistics.median(sample[0] for sample in samples),
+            statistics.median(sample[1] for sample in samples)
+            )
+    return results
+
+def run_codec_benchmark(runs: int = 200) -> dict[tuple[str, str], tuple[int, float, float]]:
+    """
+    Compare the compact model encoding with `asdict` + JSON and pickle on large parsed pages.
+    
+    Parameters:
+        runs (int, optional): The number of encodes and decodes timed per method. Defaults to 200.
+    
+    Returns:
+        dict[tuple[str, str], tuple[int, float, float]]: The encoded size and the mean seconds of an encode and a decode, by model and method.
+    """
+    server = MockNyaaServer(MockNyaaConfig(rows=75, files=50, folders=5, comments=20))
+    client, rss_client = NyaaClient(), NyaaRSSClient()
+    client.base_url = rss_client.base_url = server.url
+    samples = {
+        "SearchResult": client._parse_search_result(server.search_page()),
+        "TorrentInfo": client._parse_torrent_info(server.view_page(1234)),
+        "NyaaRSSFeed": rss_client._parse_feed(server.feed_page())
+        }
+    formats = [format for format in codec.FORMATS if format == "json" or codec._default_format() == "msgpack"]
+    
+    results: dict[tuple[str, str], tuple[int, float, float]] = {}
+    for name, sample in samples.items():
+        cls = type(sample)
+        methods: dict[str, tuple[Callable[[], bytes], Callable[[bytes], Any]]] = {
+            "asdict+json": (lambda: json.dumps(asdict(sample), default=str).encode(), json.loads),
+            "pickle": (lambda: pickle.dumps(sample, protocol=pickle.HIGHEST_PROTOCOL), pickle.loads),
+            **{
+                f"codec {format}": ((lambda format=format: codec.encode(sample, format)), (lambda data: codec.decode(cls, data)))
+                for format in formats
+                }
+            }
+        for method, (dump, load) in methods.items():
+            data = dump()
+            results[name, method] = (
+                len(data),
+                timeit.timeit(dump, number=runs) / runs,
+                timeit.timeit(lambda: load(data), number=runs) / runs
+                )
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Load-test the nyaa clients against a local mock nyaa server.")
+    parser.add_argument("--serve", action="store_true", help="only run the mock server, until interrupted")
+    parser.add_argument("--url", help="drive an already running server instead of starting one")
+    parser.add_argument("--startup", action="store_true", help="benchmark the first request of new clients instead")
+    parser.add_argument("--runs", type=int, default=20, help="clients per case of --startup")
+    parser.add_argument("--codec", action="store_true", help="benchmark the compact model encoding instead")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--mix", help="operation weights, e.g. search=3,view=4,feed=1")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--trace-memory", action="store_true")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--rows", type=int, default=MockNyaaConfig.rows)
+    parser.add_argument("--files", type=int, default=MockNyaaConfig.files)
+    parser.add_argument("--folders", type=int, default=MockNyaaConfig.folders)
+    parser.add_argument("--comments", type=int, default=MockNyaaConfig.comments)
+    parser.add_argument("--latency", type=float, default=MockNyaaConfig.latency)
+    parser.add_argument("--jitter", type=float, default=MockNyaaConfig.jitter)
+    parser.add_argument("--error-rate", type=float, default=MockNyaaConfig.error_rate)
+    parser.add_argument("--throttle-rate", type=float, default=MockNyaaConfig.throttle_rate)
+    args = parser.parse_args()
+    
+    config = MockNyaaConfig(
+        rows=args.rows,
+        files=args.files,
+        folders=args.folders,
+        comments=args.comments,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        seed=args.seed
+        )
+    mix = {name: float(weight) for name, _, weight in (part.partition("=") for part in args.mix.split(","))} if args.mix else None
+    load_kwargs = dict(
+        duration=args.duration,
+        users=args.users,
+        mix=mix,
+        batch_size=args.batch_size,
+        trace_memory=args.trace_memory,
+        seed=args.seed
+        )
+    
+    async def startup(base_url: str) -> None:
+        print(f"{'case':<22}{'warm-up ms':>12}{'first request ms':>18}")
+        for name, (warmup, request) in (await run_startup_benchmark(base_url, args.runs)).items():
+            print(f"{name:<22}{warmup * 1000:>12.2f}{request * 1000:>18.2f}")
+    
+    async def main() -> None:
+        if args.codec:
+            print(f"{'model':<13} {'method':<16} {'bytes':>8} {'encode us':>10} {'decode us':>10}")
+            for (name, method), (size, encode_time, decode_time) in run_codec_benchmark().items():
+                print(f"{name:<13} {method:<16} {size:>8} {encode_time * 1e6:>10.1f} {decode_time * 1e6:>10.1f}")
+        elif args.startup:
+            if args.url:
+                await startup(args.url)
+            else:
+                async with MockNyaaServer(config, host=args.host, port=args.port) as server:
+                    # A host name rather than the IP literal, so the lookup is part of the cold start.
+                    await startup(server.url.replace("127.0.0.1", "localhost"))
+        elif args.serve:
+            server = MockNyaaServer(config, host=args.host, port=args.port)
+            await server.start()
+            print(f"Serving mock nyaa at {server.url}")
+            try:
+                await server._server.serve_forever()
+            finally:
+                await server.close()
+        elif args.url:
+            print((await run_load(args.url, **load_kwargs)).summary())
+        else:
+            print((await run_mock_load(config, **load_kwargs)).summary())
+    
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
\ No newline at end of file
@@ -0,0 +1,110 @@
+from datetime import datetime
+from typing import Any
+import hashlib
+
+from .exceptions import BencodeError
+from .utils.bencode import decode_value
+from .models import MetainfoFile, TorrentMetainfo
+
+def _text(value: bytes | None) -> str | None:
+    """
+    Decode a bencoded string as UTF-8, replacing invalid bytes.
+    """
+    return value.decode("utf-8", "replace") if isinstance(value, bytes) else None
+
+def _size(value: Any, field: str) -> int:
+    """
+    Check that a value is a non-negative integer.
+    """
+    if not isinstance(value, int) or value < 0:
+        raise BencodeError(f"Torrent file {field} is not a non-negative integer")
+    return value
+
+def _files(info: dict[bytes, Any], name: str) -> list[MetainfoFile]:
+    """
+    Extract the files of an info dictionary, checking the types of the file list.
+    """
+    if b"files" not in info:
+        return [MetainfoFile(path=name, size=_size(info.get(b"length", 0), "length"))]
+    
+    entries = info[b"files"]
+    if not isinstance(entries, list):
+        raise BencodeError("Torrent file list is not a list")
+    
+    files: list[MetainfoFile] = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise BencodeError("Torrent file entry is not a dictionary")
+        parts = entry.get(b"path.utf-8", entry.get(b"path"))
+        if not isinstance(parts, list) or not all(isinstance(part, bytes) for part in parts):
+            raise BencodeError("Torrent file path is not a list of strings")
+        files.append(MetainfoFile(path="/".join(_text(part) for part in parts), size=_size(entry.get(b"length"), "file length")))
+    return files
+
+def _creation_date(value: Any) -> datetime | None:
+    """
+    Convert a creation date, ignoring values that are not a valid timestamp.
+    """
+    if not isinstance(value, int):
+        return None
+    try:
+        return datetime.utcfromtimestamp(value)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+def parse_metainfo(data: bytes) -> TorrentMetainfo:
+    """
+    Parse a .torrent file.
+    
+    The info hash is computed over the raw bytes of the info dictionary, so it matches the
+    info hash shown by nyaa even if the file is not canonically encoded.
+    
+    Parameters:
+        data (bytes): The contents of the .torrent file.
+    
+    Raises:
+        BencodeError: If the data is not a valid .torrent file.
+    
+    Returns:
+        TorrentMetainfo: The parsed metainfo.
+    """
+    spans: dict[bytes, tuple[int, int]] = {}
+    root, end = decode_value(data, 0, spans=spans)
+    if not isinstance(root, dict) or end != len(data):
+        raise BencodeError("Torrent file is not a single bencoded dictionary")
+    
+    info = root.get(b"info")
+    if not isinstance(info, dict) or b"info" not in spans:
+        raise BencodeError("Torrent file has no info dictionary")
+    
+    start, stop = spans[b"info"]
+    info_hash = hashlib.sha1(data[start:stop]).hexdigest()
+    
+    name = _text(info.get(b"name.utf-8", info.get(b"name"))) or info_hash
+    files = _files(info, name)
+    pieces = info.get(b"pieces", b"")
+    if not isinstance(pieces, bytes):
+        raise BencodeError("Torrent file pieces are not a string")
+    
+    # Trackers are optional, so malformed announce lists are skipped rather than rejected.
+    announce_list = root.get(b"announce-list")
+    tiers = [tier for tier in announce_list if isinstance(tier, list)] if isinstance(announce_list, list) else []
+    trackers: list[str] = []
+    for tier in [[root.get(b"announce")], *tiers]:
+        for url in tier:
+            if (url := _text(url)) and url not in trackers:
+                trackers.append(url)
+    
+    return TorrentMetainfo(
+        info_hash=info_hash,
+        name=name,
+        total_size=sum(file.size for file in files),
+        piece_length=_size(info.get(b"piece length", 0), "piece length"),
+        piece_count=len(pieces) // 20,
+        files=files,
+        trackers=trackers,
+        private=info.get(b"private") == 1,
+        comment=_text(root.get(b"comment")),
+        created_by=_text(root.get(b"created by")),
+        creation_date=_creation_date(root.get(b"creation date"))
+        )
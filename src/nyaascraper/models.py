@@ -4,9 +4,10 @@ from datetime import datetime
 import time
 
 from .enums import FunCategory, FapCategory, TorrentType, UserLevel
+from .utils.codec import Codec
 
 @dataclass
-class SearchResultTorrent:
+class SearchResultTorrent(Codec):
     """
     Represents a search result torrent.
     
@@ -39,7 +40,7 @@ class SearchResultTorrent:
     total_comments: int
 
 @dataclass
-class SearchResult:
+class SearchResult(Codec):
     """
     Search result.
     
@@ -63,7 +64,7 @@ class SearchResult:
     available_pages: int | None = None
 
 @dataclass
-class User:
+class User(Codec):
     """
     An User.
     
@@ -81,7 +82,7 @@ class User:
     is_banned: bool | None = None
 
 @dataclass
-class File:
+class File(Codec):
     """
     A File.
     
@@ -93,7 +94,7 @@ class File:
     size: str
 
 @dataclass
-class Folder:
+class Folder(Codec):
     """
     A Folder.
     
@@ -105,7 +106,7 @@ class Folder:
     files: list[Union[File, "Folder"]]
 
 @dataclass
-class Comment:
+class Comment(Codec):
     """
     A Comment.
     
@@ -123,7 +124,7 @@ class Comment:
     text: str
 
 @dataclass
-class TorrentInfo:
+class TorrentInfo(Codec):
     """
     Torrent information.
     
@@ -163,7 +164,7 @@ class TorrentInfo:
     comments: list[Comment]
 
 @dataclass
-class NyaaRSSTorrent:
+class NyaaRSSTorrent(Codec):
     """
     Represents a torrent entry from Nyaa RSS feed.
     
@@ -202,7 +203,7 @@ class NyaaRSSTorrent:
     total_comments: int
 
 @dataclass
-class NyaaRSSFeed:
+class NyaaRSSFeed(Codec):
     """
     Nyaa RSS Feed.
     
@@ -213,4 +214,83 @@ class NyaaRSSFeed:
     """
     title: str
     description: str
-    torrents: list[NyaaRSSTorrent]
\ No newline at end of file
+    torrents: list[NyaaRSSTorrent]
+
+@dataclass
+class MetainfoFile(Codec):
+    """
+    A file listed in a .torrent file.
+    
+    Attributes:
+        path (str): The path of the file, relative to the torrent root and joined with "/".
+        size (int): The size of the file in bytes.
+    """
+    path: str
+    size: int
+
+@dataclass
+class TorrentMetainfo(Codec):
+    """
+    Metainfo parsed from a .torrent file.
+    
+    Attributes:
+        info_hash (str): The hex-encoded SHA-1 info hash of the torrent.
+        name (str): The suggested name of the torrent.
+        total_size (int): The total size of the torrent in bytes.
+        piece_length (int): The size of each piece in bytes.
+        piece_count (int): The number of pieces.
+        files (list[MetainfoFile]): A list of files in the torrent.
+        trackers (list[str]): A list of tracker announce URLs.
+        private (bool): Indicates if the torrent is private.
+        comment (str | None, optional): The comment of the torrent. Defaults to None.
+        created_by (str | None, optional): The program that created the torrent. Defaults to None.
+        creation_date (datetime | None, optional): The time the torrent was created. Defaults to None.
+    """
+    info_hash: str
+    name: str
+    total_size: int
+    piece_length: int
+    piece_count: int
+    files: list[MetainfoFile]
+    trackers: list[str]
+    private: bool
+    comment: str | None = None
+    created_by: str | None = None
+    creation_date: datetime | None = None
+
+@dataclass
+class TorrentDownload(Codec):
+    """
+    A downloaded .torrent file.
+    
+    Attributes:
+        url (str): The URL the torrent file was downloaded from.
+        metainfo (TorrentMetainfo): The parsed metainfo of the torrent file.
+        path (str | None, optional): The path the torrent file was saved to. None if kept in memory. Defaults to None.
+        data (bytes | None, optional): The raw torrent file. None if saved to disk. Defaults to None.
+    """
+    url: str
+    metainfo: TorrentMetainfo
+    path: str | None = None
+    data: bytes | None = None
+
+
+@dataclass
+class TrackerScrape(Codec):
+    """
+    Peer counts of a torrent reported by a tracker.
+    
+    Attributes:
+        info_hash (str): The info hash of the torrent, as lower-case hex.
+        tracker (str): The announce URL of the tracker.
+        seeders (int | None): The number of seeders. None if the scrape failed.
+        leechers (int | None): The number of leechers. None if the scrape failed.
+        completed (int | None): The number of completed downloads. None if the scrape failed.
+        error (str | None, optional): Why the scrape failed, if it did. Defaults to None.
+    """
+    info_hash: str
+    tracker: str
+    seeders: int | None
+    leechers: int | None
+    completed: int | None
+    error: str | None = None
\ No newline at end of file
@@ -0,0 +1,338 @@
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterable
+import asyncio
+import time
+
+import httpx
+
+from .enums import ProxyState
+from .instrumentation import Hooks
+
+@dataclass
+class ProxySample:
+    """
+    A change of the state of a proxy.
+    
+    Attributes:
+        timestamp (float): The `time.time()` value of when the state changed.
+        proxy (str): The URL of the proxy.
+        state (ProxyState): The new state.
+        reason (str): The reason of the change, one of "throttled", "blocked", "timeout", "error" or "recovered".
+    """
+    timestamp: float
+    proxy: str
+    state: ProxyState
+    reason: str
+
+class Proxy:
+    """
+    An egress proxy with a connection pool, rate limit and health state of its own.
+    
+    Attributes:
+        url (str): The URL of the proxy, e.g. "http://host:8080" or "socks5://host:1080".
+        rate (float | None): The maximum requests per second sent through the proxy. None if unlimited.
+        burst (int): The number of requests the proxy may send at once before the rate applies.
+        max_connections (int): The size of the connection pool of the proxy.
+        in_flight (int): The number of requests in flight through the proxy.
+        requests (int): The number of finished requests sent through the proxy.
+        errors (int): The number of those that timed out, failed to connect or were throttled or blocked.
+        failures (int): The number of consecutive failures, which sets the length of the next cooldown.
+        evicted_until (float | None): The `time.monotonic()` value the cooldown ends at. None while healthy.
+    """
+    MAX_CONNECTIONS: int = 10
+    BURST: int = 1
+    
+    def __init__(
+        self: "Proxy",
+        url: str,
+        rate: float | None = None,
+        burst: int = BURST,
+        max_connections: int = MAX_CONNECTIONS
+        ) -> None:
+        """
+        Initialize the proxy. Its HTTP client is created on first use.
+        
+        Parameters:
+            url (str): The URL of the proxy. SOCKS proxies require `pip install nyaasi-scraper[socks]`.
+            rate (float | None, optional): The maximum requests per second. Defaults to None.
+            burst (int, optional): The number of requests sent at once before the rate applies. Defaults to BURST.
+            max_connections (int, optional): The size of the connection pool. Defaults to MAX_CONNECTIONS.
+        """
+        self.url = url
+        self.rate = rate
+        self.burst = burst
+        self.max_connections = max_connections
+        
+        self.in_flight: int = 0
+        self.requests: int = 0
+        self.errors: int = 0
+        self.failures: int = 0
+        self.evicted_until: float | None = None
+        
+        self._probing: bool = False
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+        self._http_client: httpx.AsyncClient | None = None
+    
+    def state(self: "Proxy", now: float | None = None) -> ProxyState:
+        """
+        Get the health state of the proxy.
+        
+        Parameters:
+            now (float | None, optional): The current `time.monotonic()` value. Defaults to None.
+        
+        Returns:
+            ProxyState: The state of the proxy.
+        """
+        if self.evicted_until is None:
+            return ProxyState.HEALTHY
+        now = time.monotonic() if now is None else now
+        return ProxyState.EVICTED if now < self.evicted_until else ProxyState.PROBING
+    
+    @property
+    def load(self: "Proxy") -> float:
+        """
+        Getter property for the share of the connection pool in use.
+        
+        Returns:
+            float: The requests in flight divided by the pool size.
+        """
+        return self.in_flight / self.max_connections
+    
+    def http_client(self: "Proxy", timeout: float) -> httpx.AsyncClient:
+        """
+        Get the HTTP client sending requests through the proxy, creating it on first use.
+        
+        Parameters:
+            timeout (float): The timeout for HTTP requests, used when the client is created.
+        
+        Returns:
+            httpx.AsyncClient: The HTTP client.
+        """
+        if self._http_client is None:
+            self._http_client = httpx.AsyncClient(
+                proxy=self.url,
+                timeout=timeout,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+                )
+        return self._http_client
+    
+    def _delay(self: "Proxy", now: float) -> float:
+        """
+        Refill the token bucket and get the seconds until it admits another request.
+        """
+        if self.rate is None:
+            return 0.0
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        return max(0.0, (1.0 - self._tokens) / self.rate)
+    
+    def __repr__(self: "Proxy") -> str:
+        return f"Proxy({self.url!r}, state={self.state().value}, in_flight={self.in_flight}, requests={self.requests}, errors={self.errors})"
+
+class ProxyPool:
+    """
+    Spreads requests over egress proxies, so throughput scales with the number of egress IPs.
+    
+    Each request goes through the proxy that can send it soonest under its rate limit, the least
+    loaded one among equals. Proxies that time out, fail to connect, get throttled (429/503) or get
+    blocked (403) are evicted for a cooldown that doubles with each consecutive failure, or lasts as long as the
+    Retry-After header asks. Once it ends, one request at a time probes the proxy until one succeeds
+    and the proxy is healthy again. A request that failed that way is retried on another proxy
+    if one is available right away.
+    """
+    TIMEOUT: int = 30
+    COOLDOWN: float = 30.0
+    MAX_COOLDOWN: float = 600.0
+    RETRIES: int = 1
+    THROTTLE_STATUS_CODES: frozenset[int] = frozenset({429, 503})
+    BLOCKED_STATUS_CODES: frozenset[int] = frozenset({403})
+    
+    def __init__(
+        self: "ProxyPool",
+        proxies: Iterable[str | Proxy],
+        rate: float | None = None,
+        max_connections: int = Proxy.MAX_CONNECTIONS,
+        timeout: int = TIMEOUT,
+        cooldown: float = COOLDOWN,
+        max_cooldown: float = MAX_COOLDOWN,
+        retries: int = RETRIES,
+        hooks: Hooks | None = None
+        ) -> None:
+        """
+        Initialize the pool.
+        
+        Parameters:
+            proxies (Iterable[str | Proxy]): The proxies, as URLs or as Proxy objects with settings of their own.
+            rate (float | None, optional): The maximum requests per second of proxies given as URLs. Defaults to None.
+            max_connections (int, optional): The connection pool size of proxies given as URLs. Defaults to Proxy.MAX_CONNECTIONS.
+            timeout (int, optional): The timeout for HTTP requests. Defaults to TIMEOUT.
+            cooldown (float, optional): Seconds a proxy is evicted for after its first failure. Defaults to COOLDOWN.
+            max_cooldown (float, optional): The longest cooldown. Defaults to MAX_COOLDOWN.
+            retries (int, optional): How often a failed request is retried on another proxy. Defaults to RETRIES.
+            hooks (Hooks | None, optional): Hooks to emit "proxy" events to when a proxy changes state. Defaults to None.
+        
+        Raises:
+            ValueError: If no proxies are given.
+        """
+        self.proxies: list[Proxy] = [
+            proxy if isinstance(proxy, Proxy) else Proxy(proxy, rate=rate, max_connections=max_connections)
+            for proxy in proxies
+            ]
+        if not self.proxies:
+            raise ValueError("A proxy pool needs at least one proxy")
+        
+        self.timeout = timeout
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.retries = retries
+        self.hooks = hooks
+        self._condition = asyncio.Condition()
+    
+    def healthy(self: "ProxyPool") -> list[Proxy]:
+        """
+        Get the proxies that are not evicted.
+        
+        Returns:
+            list[Proxy]: The healthy and probing proxies.
+        """
+        now = time.monotonic()
+        return [proxy for proxy in self.proxies if proxy.state(now) is not ProxyState.EVICTED]
+    
+    async def request(self: "ProxyPool", send: Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]) -> httpx.Response:
+        """
+        Send a request through a proxy of the pool.
+        
+        Parameters:
+            send (Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]): A function sending the request with the HTTP client of a proxy.
+        
+        Raises:
+            httpx.HTTPError: If the request failed on every attempt.
+        
+        Returns:
+            httpx.Response: The response, which is throttled or blocked if every attempt was.
+        """
+        for attempt in range(self.retries + 1):
+            proxy, delay = await self._acquire()
+            try:
+                if delay:
+                    await asyncio.sleep(delay)
+                response = await send(proxy.http_client(self.timeout))
+            except httpx.TransportError as exc:
+                await self._release(proxy, "timeout" if isinstance(exc, httpx.TimeoutException) else "error")
+                if attempt < self.retries and self.healthy():
+                    continue
+                raise
+            except BaseException:
+                await self._release(proxy, None)
+                raise
+            
+            if response.status_code in self.BLOCKED_STATUS_CODES:
+                await self._release(proxy, "blocked")
+            elif response.status_code in self.THROTTLE_STATUS_CODES:
+                await self._release(proxy, "throttled", self._retry_after(response))
+            else:
+                await self._release(proxy, "success")
+                return response
+            
+            if attempt >= self.retries or not self.healthy():
+                return response
+    
+    async def _acquire(self: "ProxyPool") -> tuple[Proxy, float]:
+        """
+        Pick the proxy for a request, waiting while every proxy is evicted or busy probing.
+        
+        Returns:
+            tuple[Proxy, float]: The proxy and the seconds to wait for its rate limit.
+        """
+        async with self._condition:
+            while True:
+                now = time.monotonic()
+                best: Proxy | None = None
+                best_key: tuple[float, float] | None = None
+                next_probe: float | None = None
+                for proxy in self.proxies:
+                    state = proxy.state(now)
+                    if state is ProxyState.EVICTED:
+                        next_probe = proxy.evicted_until if next_probe is None else min(next_probe, proxy.evicted_until)
+                        continue
+                    if state is ProxyState.PROBING and proxy.in_flight:
+                        continue
+                    key = (proxy._delay(now), proxy.load)
+                    if best_key is None or key < best_key:
+                        best, best_key = proxy, key
+                
+                if best is not None:
+                    if best.state(now) is ProxyState.PROBING:
+                        best._probing = True
+                    if best.rate is not None:
+                        best._tokens -= 1.0
+                    best.in_flight += 1
+                    return best, best_key[0]
+                
+                try:
+                    await asyncio.wait_for(self._condition.wait(), None if next_probe is None else max(next_probe - now, 0.0))
+                except asyncio.TimeoutError:
+                    pass
+    
+    async def _release(self: "ProxyPool", proxy: Proxy, outcome: str | None, retry_after: float | None = None) -> None:
+        """
+        Return a proxy after a request and update its health by the outcome.
+        
+        Parameters:
+            proxy (Proxy): The proxy.
+            outcome (str | None): "success", a failure reason, or None if the request was interrupted.
+            retry_after (float | None, optional): Seconds the proxy was asked to wait. Defaults to None.
+        """
+        async with self._condition:
+            proxy.in_flight -= 1
+            probing, proxy._probing = proxy._probing, False
+            
+            if outcome == "success":
+                proxy.requests += 1
+                if probing:
+                    proxy.failures = 0
+                    proxy.evicted_until = None
+                    self._emit(proxy, ProxyState.HEALTHY, "recovered")
+                elif proxy.evicted_until is None:
+                    proxy.failures = 0
+            elif outcome is not None:
+                proxy.requests += 1
+                proxy.errors += 1
+                # Requests sent before the proxy was evicted don't extend its cooldown.
+                if probing or proxy.evicted_until is None:
+                    proxy.failures += 1
+                    cooldown = min(self.max_cooldown, self.cooldown * 2 ** (proxy.failures - 1))
+                    proxy.evicted_until = time.monotonic() + max(cooldown, retry_after or 0.0)
+                    self._emit(proxy, ProxyState.EVICTED, outcome)
+            
+            self._condition.notify_all()
+    
+    @staticmethod
+    def _retry_after(response: httpx.Response) -> float | None:
+        """
+        Get the seconds of the Retry-After header of a response, if given in seconds.
+        """
+        try:
+            return float(response.headers["retry-after"])
+        except (KeyError, ValueError):
+            return None
+    
+    def _emit(self: "ProxyPool", proxy: Proxy, state: ProxyState, reason: str) -> None:
+        if self.hooks is not None:
+            self.hooks.emit("proxy", ProxySample(timestamp=time.time(), proxy=proxy.url, state=state, reason=reason))
+    
+    async def close(self: "ProxyPool") -> None:
+        """
+        Close the HTTP clients of the proxies.
+        """
+        for proxy in self.proxies:
+            if proxy._http_client is not None:
+                await proxy._http_client.aclose()
+                proxy._http_client = None
+    
+    async def __aenter__(self: "ProxyPool") -> "ProxyPool":
+        return self
+    
+    async def __aexit__(self: "ProxyPool", *exc_info: Any) -> None:
+        await self.close()
\ No newline at end of file
@@ -0,0 +1,401 @@
+from dataclasses import dataclass
+from typing import Hashable, Iterable
+import re
+
+from .models import SearchResult, SearchResultTorrent, NyaaRSSFeed, NyaaRSSTorrent
+
+_EXTENSION = re.compile(r"\.(mkv|mp4|avi|m2ts|ts|webm|wmv|flac|mp3|zip|rar|7z)$", re.IGNORECASE)
+_LEADING_GROUP = re.compile(r"^\s*[\[【]([^\]】]+)[\]】]\s*")
+_TRAILING_GROUP = re.compile(r"-([A-Za-z0-9]+)$")
+_BRACKETS = re.compile(r"\[[^\]]*\]|【[^】]*】")
+_PARENTHESES = re.compile(r"\([^)]*\)")
+_CHECKSUM = re.compile(r"[\[(]([0-9A-Fa-f]{8})[\])]")
+_RESOLUTION = re.compile(r"\b(?:(\d{3,4})[pi]|\d{3,4}x(\d{3,4})|(4k|uhd))\b", re.IGNORECASE)
+_VIDEO_CODEC = re.compile(r"\b(x26[45]|h\.?26[45]|hevc|avc|av1|xvid|vp9)\b", re.IGNORECASE)
+_AUDIO_CODEC = re.compile(r"\b(aac|flac|opus|e-?ac-?3|ac-?3|ddp?\+?(?:\s?[257]\.[01])?|dts(?:-hd)?|truehd|mp3)\b", re.IGNORECASE)
+_SOURCE = re.compile(r"\b(blu-?ray|bdrip|bd|web-?dl|web-?rip|web|dvd(?:rip)?|hdtv|tv)\b", re.IGNORECASE)
+_BATCH = re.compile(r"\b(batch|complete|全集)\b", re.IGNORECASE)
+_YEAR = re.compile(r"\b(19[5-9]\d|20\d\d)\b")
+
+# Episode notations, tried in order. Each one gives the season, the first and last episode and the version.
+_EPISODES: list[re.Pattern] = [
+    re.compile(r"\bS(?P<season>\d{1,2})E(?P<episode>\d{1,4})(?:v(?P<version>\d))?(?:\s*-\s*(?:S\d{1,2})?E(?P<end>\d{1,4}))?\b", re.IGNORECASE),
+    re.compile(r"(?:\s[-–]\s*|\()(?P<episode>\d{1,4})\s*(?:-|~|to)\s*(?P<end>\d{1,4})\b", re.IGNORECASE),
+    re.compile(r"\s[-–]\s+(?:EP?|Episode\s?)?(?P<episode>\d{1,4}(?:\.\d)?)(?:v(?P<version>\d))?(?=\s|\(|$)", re.IGNORECASE),
+    re.compile(r"\b(?:EP?|Episode\s?)(?P<episode>\d{1,4})(?:v(?P<version>\d))?\b", re.IGNORECASE)
+    ]
+_SEASON = re.compile(r"\b(?:S(\d{1,2})|Season\s?(\d{1,2})|(\d{1,2})(?:st|nd|rd|th)\s+Season)\b", re.IGNORECASE)
+
+@dataclass
+class ReleaseName:
+    """
+    The parts of a torrent name, as far as they could be recognised.
+    
+    Attributes:
+        title (str): The series title, with tags, episode and metadata removed.
+        group (str | None, optional): The release group, from a leading "[Group]" or a scene-style "-GROUP" suffix. Defaults to None.
+        season (int | None, optional): The season number. Defaults to None.
+        episode (float | None, optional): The episode number, or the first one of a batch. Defaults to None.
+        episode_end (float | None, optional): The last episode of a batch range. Defaults to None.
+        version (int | None, optional): The release version, e.g. 2 for "05v2". Defaults to None.
+        is_batch (bool, optional): Whether the torrent holds a range of episodes or is marked as a batch. Defaults to False.
+        resolution (str | None, optional): The vertical resolution, e.g. "1080p", or "2160p" for 4K. Defaults to None.
+        video_codec (str | None, optional): The video codec, e.g. "HEVC", "AVC". Defaults to None.
+        audio_codec (str | None, optional): The audio codec, uppercased, e.g. "AAC". Defaults to None.
+        source (str | None, optional): The source, e.g. "BD", "WEB-DL". Defaults to None.
+        checksum (str | None, optional): The CRC32 of the file, uppercased. Defaults to None.
+        extension (str | None, optional): The file extension, lowercased. Defaults to None.
+    """
+    title: str
+    group: str | None = None
+    season: int | None = None
+    episode: float | None = None
+    episode_end: float | None = None
+    version: int | None = None
+    is_batch: bool = False
+    resolution: str | None = None
+    video_codec: str | None = None
+    audio_codec: str | None = None
+    source: str | None = None
+    checksum: str | None = None
+    extension: str | None = None
+
+_VIDEO_CODECS: dict[str, str] = {"x265": "HEVC", "h265": "HEVC", "hevc": "HEVC", "x264": "AVC", "h264": "AVC", "avc": "AVC"}
+_SOURCES: dict[str, str] = {"bluray": "BD", "bdrip": "BD", "bd": "BD", "webdl": "WEB-DL", "webrip": "WEB-DL", "web": "WEB-DL", "dvdrip": "DVD"}
+
+def _number(value: str | None) -> float | int | None:
+    if value is None:
+        return None
+    number = float(value)
+    return int(number) if number.is_integer() else number
+
+def series_key(title: str) -> str:
+    """
+    Normalize a series title for lookups, ignoring case, punctuation and spacing.
+    
+    Parameters:
+        title (str): The title.
+    
+    Returns:
+        str: The key, e.g. "sousou no frieren" for "Sousou no Frieren".
+    """
+    return " ".join(re.findall(r"\w+", title.casefold()))
+
+def parse_release_name(name: str) -> ReleaseName:
+    """
+    Parse a torrent name into the series title, episode, release group and media metadata.
+    
+    Understands the usual fansub notations, e.g. "[Group] Title - 05v2 (1080p) [ABCD1234].mkv",
+    "[Group] Title (01-12) [BD 1080p]" and "Title S02E05", as well as scene names like
+    "Title.S01E05.1080p.WEB-DL.x264-GROUP". Parts that aren't recognised are left as None.
+    
+    Parameters:
+        name (str): The torrent name.
+    
+    Returns:
+        ReleaseName: The parts of the name.
+    """
+    text = name.strip()
+    extension = None
+    if (match := _EXTENSION.search(text)):
+        extension = match.group(1).lower()
+        text = text[:match.start()]
+    
+    checksum = None
+    if (match := _CHECKSUM.search(text)):
+        checksum = match.group(1).upper()
+    
+    group = None
+    if (match := _LEADING_GROUP.match(text)):
+        group = match.group(1).strip()
+        text = text[match.end():]
+    
+    # Scene names separate words with dots or underscores instead of spaces.
+    if " " not in text:
+        if group is None and (match := _TRAILING_GROUP.search(text)) and "." in text[:match.start()]:
+            group = match.group(1)
+            text = text[:match.start()]
+        # Dots between digits, as in "5.1", are kept.
+        text = re.sub(r"(?<!\d)[._]|[._](?!\d)", " ", text)
+    
+    resolution = None
+    if (match := _RESOLUTION.search(name)):
+        height, width_height, uhd = match.groups()
+        resolution = "2160p" if uhd else f"{height or width_height}p"
+    
+    video_codec = None
+    if (match := _VIDEO_CODEC.search(name)):
+        codec = match.group(1).lower().replace(".", "")
+        video_codec = _VIDEO_CODECS.get(codec, codec.upper())
+    
+    audio_codec = None
+    if (match := _AUDIO_CODEC.search(name)):
+        audio_codec = match.group(1).upper()
+    
+    source = None
+    if (match := _SOURCE.search(name)):
+        source_tag = match.group(1).lower().replace("-", "")
+        source = _SOURCES.get(source_tag, source_tag.upper())
+    
+    # The title and episode are in the text outside the square brackets, which hold the metadata.
+    core = _BRACKETS.sub(" ", text)
+    
+    season, episode, episode_end, version = None, None, None, None
+    cut = len(core)
+    for pattern in _EPISODES:
+        if (match := pattern.search(core)):
+            parts = match.groupdict()
+            season = _number(parts.get("season"))
+            episode = _number(parts["episode"])
+            episode_end = _number(parts.get("end"))
+            version = _number(parts.get("version"))
+            cut = match.start()
+            break
+    
+    if season is None and (match := _SEASON.search(core[:cut] if episode is not None else core)):
+        season = int(next(value for value in match.groups() if value is not None))
+        cut = min(cut, match.start())
+    
+    # The title also ends at metadata or a year, e.g. "Title 2019 1080p WEB-DL", unless the title is a year.
+    for pattern in (_RESOLUTION, _VIDEO_CODEC, _SOURCE, _BATCH, _YEAR):
+        if (match := pattern.search(core, 0, cut)) and core[:match.start()].strip():
+            cut = min(cut, match.start())
+    
+    # A cut inside parentheses, e.g. at "Season 2" of "Title (Season 2)", moves to the opening parenthesis.
+    if (opening := core.rfind("(", 0, cut)) > core.rfind(")", 0, cut):
+        cut = opening
+    
+    title = _PARENTHESES.sub(" ", core[:cut])
+    title = re.sub(r"\s+", " ", title).strip(" -–_|~")
+    
+    if episode_end is not None and episode is not None and episode_end <= episode:
+        episode_end = None
+    
+    return ReleaseName(
+        title=title,
+        group=group,
+        season=season,
+        episode=episode,
+        episode_end=episode_end,
+        version=version,
+        is_batch=episode_end is not None or bool(_BATCH.search(name)),
+        resolution=resolution,
+        video_codec=video_codec,
+        audio_codec=audio_codec,
+        source=source,
+        checksum=checksum,
+        extension=extension
+        )
+
+class ReleaseIndex:
+    """
+    Parsed torrent names indexed by series, season, episode, release group and resolution.
+    
+    Each name is parsed once and cached by View-ID, so torrents seen again in later searches and
+    feeds cost a dictionary lookup. Pass the index to NyaaClient and NyaaRSSClient to add every
+    torrent they parse. Lookups intersect the matching sets of View-IDs instead of scanning names.
+    
+    Names without a season are indexed as season 1, as fansub releases usually only mark later seasons.
+    """
+    def __init__(self: "ReleaseIndex") -> None:
+        """
+        Initialize an empty index.
+        """
+        self._names: dict[int, str] = {}
+        self._releases: dict[int, ReleaseName] = {}
+        self._by_series: dict[str, set[int]] = {}
+        self._by_season: dict[int, set[int]] = {}
+        self._by_episode: dict[float, set[int]] = {}
+        self._by_group: dict[str, set[int]] = {}
+        self._by_resolution: dict[str, set[int]] = {}
+        self._batches: set[int] = set()
+    
+    def __len__(self: "ReleaseIndex") -> int:
+        return len(self._releases)
+    
+    def __contains__(self: "ReleaseIndex", view_id: int) -> bool:
+        return view_id in self._releases
+    
+    def _keys(self: "ReleaseIndex", release: ReleaseName) -> list[tuple[dict, Hashable]]:
+        """
+        Get the index sets a release belongs in, as (index, key) pairs.
+        """
+        keys: list[tuple[dict, Hashable]] = [
+            (self._by_series, series_key(release.title)),
+            (self._by_season, release.season or 1)
+            ]
+        if release.episode is not None and not release.is_batch:
+            keys.append((self._by_episode, release.episode))
+        if release.group is not None:
+            keys.append((self._by_group, release.group.casefold()))
+        if release.resolution is not None:
+            keys.append((self._by_resolution, release.resolution))
+        return keys
+    
+    def add(self: "ReleaseIndex", view_id: int, name: str) -> ReleaseName:
+        """
+        Parse and index the name of a torrent, unless it is cached already.
+        
+        Parameters:
+            view_id (int): The View-ID of the torrent.
+            name (str): The name of the torrent. A renamed torrent is parsed again.
+        
+        Returns:
+            ReleaseName: The parts of the name.
+        """
+        if self._names.get(view_id) == name:
+            return self._releases[view_id]
+        self.remove(view_id)
+        
+        release = parse_release_name(name)
+        self._names[view_id] = name
+        self._releases[view_id] = release
+        for index, key in self._keys(release):
+            index.setdefault(key, set()).add(view_id)
+        if release.is_batch:
+            self._batches.add(view_id)
+        return release
+    
+    def add_torrents(self: "ReleaseIndex", torrents: Iterable[SearchResultTorrent | NyaaRSSTorrent]) -> None:
+        """
+        Index the names of torrents.
+        
+        Parameters:
+            torrents (Iterable[SearchResultTorrent | NyaaRSSTorrent]): The torrents.
+        """
+        for torrent in torrents:
+            self.add(torrent.view_id, torrent.name)
+    
+    def add_search_result(self: "ReleaseIndex", result: SearchResult) -> None:
+        """
+        Index the torrent names of a search result.
+        
+        Parameters:
+            result (SearchResult): The search result.
+        """
+        self.add_torrents(result.torrents)
+    
+    def add_feed(self: "ReleaseIndex", feed: NyaaRSSFeed) -> None:
+        """
+        Index the torrent names of an RSS feed.
+        
+        Parameters:
+            feed (NyaaRSSFeed): The RSS feed.
+        """
+        self.add_torrents(feed.torrents)
+    
+    def remove(self: "ReleaseIndex", view_id: int) -> None:
+        """
+        Remove a torrent from the index, if present.
+        
+        Parameters:
+            view_id (int): The View-ID of the torrent.
+        """
+        if (release := self._releases.pop(view_id, None)) is None:
+            return
+        del self._names[view_id]
+        for index, key in self._keys(release):
+            view_ids = index[key]
+            view_ids.discard(view_id)
+            if not view_ids:
+                del index[key]
+        self._batches.discard(view_id)
+    
+    def get(self: "ReleaseIndex", view_id: int) -> ReleaseName | None:
+        """
+        Get the parsed name of a torrent.
+        
+        Parameters:
+            view_id (int): The View-ID of the torrent.
+        
+        Returns:
+            ReleaseName | None: The parts of the name, or None if the torrent is not in the index.
+        """
+        return self._releases.get(view_id)
+    
+    def find(
+        self: "ReleaseIndex",
+        series: str | None = None,
+        season: int | None = None,
+        episode: float | None = None,
+        group: str | None = None,
+        resolution: str | None = None,
+        batches: bool = False
+        ) -> list[int]:
+        """
+        Find torrents by the parts of their names. Every given part must match.
+        
+        Episode numbers restart every season, so a lookup of an episode without a season is one of season 1.
+        
+        Parameters:
+            series (str | None, optional): The series title, matched exactly after `series_key()`. Defaults to None.
+            season (int | None, optional): The season number. If not specified, any season matches, or season 1 if an episode is given. Defaults to None.
+            episode (float | None, optional): The episode number. Defaults to None.
+            group (str | None, optional): The release group, case-insensitively. Defaults to None.
+            resolution (str | None, optional): The resolution, e.g. "1080p". Defaults to None.
+            batches (bool, optional): Whether to include batches, which match an episode within their range. Defaults to False.
+        
+        Returns:
+            list[int]: The View-IDs of the matching torrents, newest first.
+        """
+        filters: list[set[int]] = []
+        if series is not None:
+            filters.append(self._by_series.get(series_key(series), set()))
+        if season is not None or episode is not None:
+            filters.append(self._by_season.get(season or 1, set()))
+        if group is not None:
+            filters.append(self._by_group.get(group.casefold(), set()))
+        if resolution is not None:
+            filters.append(self._by_resolution.get(resolution.lower(), set()))
+        
+        def narrow(candidates: set[int] | None) -> set[int]:
+            # Intersect from the smallest set, so the work is bounded by the rarest part.
+            sets = sorted(filters + ([candidates] if candidates is not None else []), key=len)
+            if not sets:
+                return set(self._releases)
+            matched = set(sets[0])
+            for other in sets[1:]:
+                matched &= other
+            return matched
+        
+        if episode is None:
+            matched = narrow(None)
+            if not batches:
+                matched -= self._batches
+        else:
+            matched = narrow(self._by_episode.get(episode, set()))
+            if batches:
+                for view_id in narrow(self._batches):
+                    release = self._releases[view_id]
+                    # A batch without a range, e.g. "Complete", can't be matched to an episode.
+                    if release.episode is not None and release.episode <= episode <= (release.episode_end or release.episode):
+                        matched.add(view_id)
+        return sorted(matched, reverse=True)
+    
+    def episodes(self: "ReleaseIndex", series: str, season: int = 1) -> dict[float, list[int]]:
+        """
+        Group the single-episode torrents of a season of a series by episode.
+        
+        Parameters:
+            series (str): The series title, matched exactly after `series_key()`.
+            season (int, optional): The season number. Defaults to 1.
+        
+        Returns:
+            dict[float, list[int]]: The View-IDs by episode number in ascending order, newest first.
+        """
+        grouped: dict[float, list[int]] = {}
+        view_ids = self._by_series.get(series_key(series), set()) & self._by_season.get(season, set())
+        for view_id in sorted(view_ids, reverse=True):
+            release = self._releases[view_id]
+            if release.episode is not None and not release.is_batch:
+                grouped.setdefault(release.episode, []).append(view_id)
+        return dict(sorted(grouped.items()))
+    
+    def series(self: "ReleaseIndex") -> list[str]:
+        """
+        Get the series keys in the index.
+        
+        Returns:
+            list[str]: The keys, sorted.
+        """
+        return sorted(self._by_series)
\ No newline at end of file
@@ -0,0 +1,186 @@
+from typing import Iterable, TYPE_CHECKING
+import sqlite3
+import threading
+
+import httpx
+
+from .models import SearchResult, TorrentInfo, NyaaRSSFeed
+from .utils.magnet import normalize_info_hash, parse_magnet
+
+if TYPE_CHECKING:
+    from .client import NyaaClient
+
+class InfoHashIndex:
+    """
+    Index from info hashes to View-IDs.
+    
+    Pass it to NyaaClient and NyaaRSSClient to record the info hash of every torrent they parse.
+    If a path is given, the index is kept in a SQLite file and survives restarts. The index can be
+    used from any thread.
+    """
+    def __init__(self: "InfoHashIndex", path: str | None = None) -> None:
+        """
+        Initialize the index.
+        
+        Parameters:
+            path (str | None, optional): The path of a SQLite file to keep the index in. If not specified, the index is kept in memory. Defaults to None.
+        """
+        self.path = path
+        self._view_ids: dict[str, int] = {}
+        self._connection: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        if path is not None:
+            self._connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS info_hashes (info_hash TEXT PRIMARY KEY, view_id INTEGER NOT NULL)"
+                )
+    
+    def __len__(self: "InfoHashIndex") -> int:
+        if self._connection is not None:
+            with self._lock:
+                return self._connection.execute("SELECT COUNT(*) FROM info_hashes").fetchone()[0]
+        return len(self._view_ids)
+    
+    def close(self: "InfoHashIndex") -> None:
+        """
+        Close the SQLite file, if any.
+        """
+        if self._connection is not None:
+            with self._lock:
+                self._connection.close()
+    
+    def add_many(self: "InfoHashIndex", entries: Iterable[tuple[str, int]]) -> None:
+        """
+        Record many info hashes.
+        
+        Parameters:
+            entries (Iterable[tuple[str, int]]): (info hash, View-ID) pairs. Invalid info hashes are skipped.
+        """
+        normalized = [
+            (info_hash, view_id)
+            for raw_info_hash, view_id in entries
+            if (info_hash := normalize_info_hash(raw_info_hash)) is not None
+            ]
+        if self._connection is not None:
+            with self._lock, self._connection:
+                self._connection.executemany(
+                    "INSERT OR REPLACE INTO info_hashes (info_hash, view_id) VALUES (?, ?)", normalized
+                    )
+        else:
+            self._view_ids.update(normalized)
+    
+    def add(self: "InfoHashIndex", info_hash: str, view_id: int) -> None:
+        """
+        Record an info hash.
+        
+        Parameters:
+            info_hash (str): The info hash, as hex or base32.
+            view_id (int): The View-ID of the torrent.
+        """
+        self.add_many([(info_hash, view_id)])
+    
+    def get(self: "InfoHashIndex", info_hash: str) -> int | None:
+        """
+        Look up the View-ID of an info hash.
+        
+        Parameters:
+            info_hash (str): The info hash, as hex or base32.
+        
+        Returns:
+            int | None: The View-ID, or None if the info hash is not in the index.
+        """
+        if (info_hash := normalize_info_hash(info_hash)) is None:
+            return None
+        if self._connection is not None:
+            with self._lock:
+                row = self._connection.execute("SELECT view_id FROM info_hashes WHERE info_hash = ?", (info_hash,)).fetchone()
+            return row[0] if row else None
+        return self._view_ids.get(info_hash)
+    
+    def add_search_result(self: "InfoHashIndex", result: SearchResult) -> None:
+        """
+        Record the info hashes of a search result, taken from the magnet links.
+        
+        Parameters:
+            result (SearchResult): The search result.
+        """
+        self.add_many(
+            (info_hash, torrent.view_id)
+            for torrent in result.torrents
+            if (info_hash := parse_magnet(torrent.magnet_link)[0]) is not None
+            )
+    
+    def add_feed(self: "InfoHashIndex", feed: NyaaRSSFeed) -> None:
+        """
+        Record the info hashes of an RSS feed.
+        
+        Parameters:
+            feed (NyaaRSSFeed): The RSS feed.
+        """
+        self.add_many((torrent.info_hash, torrent.view_id) for torrent in feed.torrents)
+    
+    def add_torrent_info(self: "InfoHashIndex", view_id: int, torrent_info: TorrentInfo) -> None:
+        """
+        Record the info hash of a torrent view page.
+        
+        Parameters:
+            view_id (int): The View-ID of the torrent.
+            torrent_info (TorrentInfo): Information of the torrent.
+        """
+        self.add(torrent_info.info_hash, view_id)
+
+class InfoHashResolver:
+    """
+    Resolves info hashes to View-IDs, answering from an index and searching nyaa for the misses.
+    """
+    def __init__(self: "InfoHashResolver", client: "NyaaClient", index: InfoHashIndex | None = None) -> None:
+        """
+        Initialize the resolver.
+        
+        Parameters:
+            client (NyaaClient): The client to search with. Its index is used and populated.
+            index (InfoHashIndex | None, optional): The index to use if the client has none. Defaults to None.
+        """
+        if client.info_hash_index is None:
+            client.info_hash_index = index if index is not None else InfoHashIndex()
+        self.client = client
+        self.index = client.info_hash_index
+    
+    async def resolve(self: "InfoHashResolver", info_hashes: Iterable[str]) -> dict[str, int | None]:
+        """
+        Resolve info hashes to View-IDs.
+        
+        Info hashes not in the index are searched for concurrently; the search results are recorded
+        in the index, so later lookups of them are answered locally.
+        
+        Parameters:
+            info_hashes (Iterable[str]): The info hashes, as hex or base32.
+        
+        Returns:
+            dict[str, int | None]: The View-ID of each info hash, by the info hash as given. None if not found.
+        """
+        info_hashes = list(dict.fromkeys(info_hashes))
+        view_ids = {info_hash: self.index.get(info_hash) for info_hash in info_hashes}
+        misses = list(dict.fromkeys(
+            normalized
+            for info_hash, view_id in view_ids.items()
+            if view_id is None and (normalized := normalize_info_hash(info_hash)) is not None
+            ))
+        if not misses:
+            return view_ids
+        
+        await self.client._run_batch(self._search, misses)
+        return {
+            info_hash: view_id if view_id is not None else self.index.get(info_hash)
+            for info_hash, view_id in view_ids.items()
+            }
+    
+    async def _search(self: "InfoHashResolver", info_hash: str) -> None:
+        """
+        Search nyaa for an info hash. Matches are recorded in the index by the client.
+        """
+        try:
+            await self.client.search(term=info_hash)
+        except httpx.HTTPError:
+            pass
\ No newline at end of file
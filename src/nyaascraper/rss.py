@@ -1,6 +1,18 @@
+import asyncio
+import itertools
+import time
+
 import httpx
 import feedparser
 
+from .instrumentation import Hooks, ParseMetrics, traced_get
+from .resolver import InfoHashIndex
+from .releases import ReleaseIndex
+from .archive import PageArchive
+from .proxies import ProxyPool
+from .warmup import DNSCache, prewarm
+from .deadline import deadline as set_deadline, with_deadline
+
 from .enums import SITE, QualityFilter, FunCategory, FapCategory, TorrentType
 from .utils.categories import get_category_by_id
 
@@ -10,19 +22,43 @@ class NyaaRSSClient:
     DEFAULT_SITE: SITE = SITE.FUN
     TIMEOUT: int = 30
     
-    def __init__(self: "NyaaRSSClient", site: SITE = DEFAULT_SITE, timeout: int = TIMEOUT) -> None:
+    def __init__(
+        self: "NyaaRSSClient",
+        site: SITE = DEFAULT_SITE,
+        timeout: int = TIMEOUT,
+        hooks: Hooks | None = None,
+        info_hash_index: InfoHashIndex | None = None,
+        release_index: ReleaseIndex | None = None,
+        archive: PageArchive | None = None,
+        proxies: ProxyPool | None = None,
+        dns_cache: DNSCache | None = None
+        ) -> None:
         """
         Initialize rss client.
         
         Parameters:
             site (SITE, optional): The site to fetch from. Defaults to DEFAULT_SITE.
             timeout (int, optional): The timeout for HTTP requests. Defaults to TIMEOUT.
+            hooks (Hooks | None, optional): Instrumentation hooks to emit request and parse metrics to. Defaults to None.
+            info_hash_index (InfoHashIndex | None, optional): The index to record the info hash of every parsed torrent in. Defaults to None.
+            release_index (ReleaseIndex | None, optional): The index to parse and record the name of every parsed torrent in. Defaults to None.
+            archive (PageArchive | None, optional): The archive to store the raw feeds in. Defaults to None.
+            proxies (ProxyPool | None, optional): The egress proxies to spread requests over. If not specified, requests are sent directly. Defaults to None.
+            dns_cache (DNSCache | None, optional): The DNS cache to resolve host names with, which can be shared by many clients. Defaults to None.
         """
         self._site = site
         self.base_url = site.value
         self.timeout = timeout
+        self.hooks = hooks
+        self.info_hash_index = info_hash_index
+        self.release_index = release_index
+        self.archive = archive
+        self.proxies = proxies
         
         self._http_client: httpx.AsyncClient = httpx.AsyncClient(timeout=self.timeout)
+        self._in_flight: int = 0
+        if dns_cache is not None:
+            dns_cache.install(self._http_client)
     
     @property
     def site(self: "NyaaRSSClient") -> SITE:
@@ -45,13 +81,103 @@ class NyaaRSSClient:
         self._site = new_site
         self.base_url = new_site.value
     
+    async def warmup(self: "NyaaRSSClient", connections: int = 1) -> None:
+        """
+        Resolve the site and open pooled connections to it ahead of the first request.
+        
+        Connections are kept open for the keep-alive expiry of the pool, 5 seconds by default,
+        so warm up shortly before the requests. With a proxy pool, connections to the proxies are opened.
+        
+        Parameters:
+            connections (int, optional): The number of connections to open to the site or each proxy. Defaults to 1.
+        
+        Raises:
+            httpx.HTTPError: If a connection could not be opened.
+        """
+        if self.proxies is None:
+            await prewarm(self._http_client, [self.base_url], connections)
+        else:
+            await asyncio.gather(*(
+                prewarm(proxy.http_client(self.proxies.timeout), [self.base_url], connections) for proxy in self.proxies.proxies
+                ))
+    
+    async def _get(
+        self: "NyaaRSSClient",
+        url: str,
+        params: dict | None = None,
+        deadline: float | None = None
+        ) -> httpx.Response:
+        """
+        Send a GET request, cancelling it if the deadline passes.
+        
+        Parameters:
+            url (str): The URL of the request.
+            params (dict | None, optional): The query parameters of the request. Defaults to None.
+            deadline (float | None, optional): Seconds the request may take. The deadline of the caller, if any, still applies. Defaults to None.
+        
+        Raises:
+            httpx.HTTPError: If an HTTP-related error occurs during the request.
+            DeadlineExceededError: If the deadline passed first. The request is cancelled.
+        
+        Returns:
+            httpx.Response: The response of the request.
+        """
+        with set_deadline(deadline):
+            return await with_deadline(self.__send(url, params))
+    
+    async def __send(self: "NyaaRSSClient", url: str, params: dict | None = None) -> httpx.Response:
+        """
+        Send a GET request, emitting request metrics if hooks are set.
+        
+        Parameters:
+            url (str): The URL of the request.
+            params (dict | None, optional): The query parameters of the request. Defaults to None.
+        
+        Returns:
+            httpx.Response: The response of the request.
+        """
+        if self.proxies is not None:
+            # The pool calls this once per attempt, so the attempt number counts the retries.
+            attempts = itertools.count()
+            return await self.proxies.request(lambda http_client: self.__send_with(http_client, url, params, next(attempts)))
+        return await self.__send_with(self._http_client, url, params)
+    
+    async def __send_with(
+        self: "NyaaRSSClient",
+        http_client: httpx.AsyncClient,
+        url: str,
+        params: dict | None = None,
+        retries: int = 0
+        ) -> httpx.Response:
+        """
+        Send a GET request with an HTTP client, emitting request metrics if hooks are set.
+        
+        Parameters:
+            http_client (httpx.AsyncClient): The HTTP client, of the client itself or of a proxy.
+            url (str): The URL of the request.
+            params (dict | None, optional): The query parameters of the request. Defaults to None.
+            retries (int, optional): The number of earlier attempts of the request. Defaults to 0.
+        
+        Returns:
+            httpx.Response: The response of the request.
+        """
+        if self.hooks is None:
+            return await http_client.get(url, params=params)
+        
+        self._in_flight += 1
+        try:
+            return await traced_get(http_client, self.hooks, url, params=params, in_flight=self._in_flight, retries=retries)
+        finally:
+            self._in_flight -= 1
+    
     async def get_feed(
         self: "NyaaRSSClient",
         term: str | None = None,
         username: str | None = None,
         quality_filter: QualityFilter | None = QualityFilter.NO_FILTER,
         category: FunCategory | FapCategory | None = None,
-        use_magnet: bool | None = None
+        use_magnet: bool | None = None,
+        deadline: float | None = None
         ) -> NyaaRSSFeed:
         """
         Parameters:
@@ -60,9 +186,11 @@ class NyaaRSSClient:
             quality_filter (QualityFilter | None, optional): Filter torrents by quality. If not specified, defaults to QualityFilter.NO_FILTER.
             category (FunCategory | FapCategory | None, optional): Filter torrents by category. If not specified, a default category is used. Defaults to None.
             use_magnet (bool | None, optional): Whether to use magnet links. Defaults to None.
+            deadline (float | None, optional): Seconds the request may take before it is cancelled. Defaults to None.
         
         Raises:
             httpx.HTTPError: If an HTTP-related error occurs during the request.
+            DeadlineExceededError: If the deadline passed before the response arrived.
         
         Returns:
             NyaaRSSFeed: RSS feed.
@@ -79,10 +207,41 @@ class NyaaRSSClient:
             "magnets": use_magnet
         }
         
-        response: httpx.Response = await self._http_client.get(self.base_url, params=params)
+        response: httpx.Response = await self._get(self.base_url, params=params, deadline=deadline)
         response.raise_for_status()
+        if self.archive is not None:
+            self.archive.append("feed", str(response.url), response.status_code, response.content)
+        
+        started = time.perf_counter()
+        feed = self._parse_feed(response.text, use_magnet=use_magnet)
+        if self.hooks is not None:
+            self.hooks.emit(
+                "parse",
+                ParseMetrics(
+                    phase="feed",
+                    url=str(response.url),
+                    parse_time=time.perf_counter() - started,
+                    rows=len(feed.torrents)
+                    )
+                )
+        if self.info_hash_index is not None:
+            self.info_hash_index.add_feed(feed)
+        if self.release_index is not None:
+            self.release_index.add_feed(feed)
+        return feed
+    
+    def _parse_feed(self: "NyaaRSSClient", text: str, use_magnet: bool | None = None) -> NyaaRSSFeed:
+        """
+        Parse an RSS feed.
+        
+        Parameters:
+            text (str): The XML of the RSS feed.
+            use_magnet (bool | None, optional): Whether the feed links are magnet links. Defaults to None.
         
-        parsed_feed = feedparser.parse(response.text)
+        Returns:
+            NyaaRSSFeed: RSS feed.
+        """
+        parsed_feed = feedparser.parse(text)
         
         torrents: list[NyaaRSSTorrent] = []
         for entry in parsed_feed.entries:
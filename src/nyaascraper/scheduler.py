@@ -0,0 +1,149 @@
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Iterator
+import asyncio
+
+from .enums import Priority
+
+_priority: ContextVar[Priority | None] = ContextVar("nyaascraper_priority", default=None)
+
+@contextmanager
+def priority(level: Priority) -> Iterator[None]:
+    """
+    Run requests made in the block, including those of tasks started in it, at a priority.
+    
+    Parameters:
+        level (Priority): The priority of the requests.
+    """
+    token = _priority.set(level)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+def current_priority() -> Priority | None:
+    """
+    Get the priority set by the innermost `priority()` block.
+    
+    Returns:
+        Priority | None: The current priority, or None if no priority is set.
+    """
+    return _priority.get()
+
+class PriorityScheduler:
+    """
+    Admits requests to the HTTP pool by priority.
+    
+    Free slots go to the highest-priority waiting request, except that each priority with a minimum
+    share is guaranteed that fraction of grants while it has requests waiting, so bulk work keeps
+    progressing under interactive load.
+    """
+    MAX_CONCURRENCY: int = 10
+    MIN_SHARES: dict[Priority, float] = {Priority.BULK: 0.1}
+    
+    def __init__(
+        self: "PriorityScheduler",
+        max_concurrency: int = MAX_CONCURRENCY,
+        min_shares: dict[Priority, float] | None = None
+        ) -> None:
+        """
+        Initialize the scheduler.
+        
+        Parameters:
+            max_concurrency (int, optional): The maximum number of requests admitted at once. Defaults to MAX_CONCURRENCY.
+            min_shares (dict[Priority, float] | None, optional): The minimum share of grants guaranteed to each priority. Defaults to MIN_SHARES.
+        """
+        self.max_concurrency = max_concurrency
+        self.min_shares = dict(self.MIN_SHARES if min_shares is None else min_shares)
+        if sum(self.min_shares.values()) > 1:
+            raise ValueError("Minimum shares must not add up to more than 1")
+        
+        self.in_flight: int = 0
+        self.granted: dict[Priority, int] = {level: 0 for level in Priority}
+        self._waiters: dict[Priority, deque[asyncio.Future]] = {level: deque() for level in Priority}
+        self._credits: dict[Priority, float] = {level: 0.0 for level in Priority}
+    
+    def waiting(self: "PriorityScheduler", level: Priority | None = None) -> int:
+        """
+        Get the number of waiting requests.
+        
+        Parameters:
+            level (Priority | None, optional): Only count requests of this priority. Defaults to None.
+        
+        Returns:
+            int: The number of waiting requests.
+        """
+        if level is not None:
+            return len(self._waiters[level])
+        return sum(len(waiters) for waiters in self._waiters.values())
+    
+    @asynccontextmanager
+    async def slot(self: "PriorityScheduler", level: Priority | None = None) -> AsyncIterator[None]:
+        """
+        Wait for a slot and hold it for the duration of the block.
+        
+        Parameters:
+            level (Priority | None, optional): The priority of the request. If not specified, the current priority or Priority.NORMAL is used. Defaults to None.
+        """
+        if level is None:
+            level = current_priority()
+        if level is None:
+            level = Priority.NORMAL
+        if self.in_flight < self.max_concurrency and not self.waiting():
+            self._grant(level)
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters[level].append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                if waiter.done() and not waiter.cancelled():
+                    # The slot was granted just before cancellation, pass it on.
+                    self._release()
+                else:
+                    self._waiters[level].remove(waiter)
+                raise
+        
+        try:
+            yield
+        finally:
+            self._release()
+    
+    def _grant(self: "PriorityScheduler", level: Priority) -> None:
+        """
+        Account a slot granted to a priority.
+        """
+        self.in_flight += 1
+        self.granted[level] += 1
+        for share_level, share in self.min_shares.items():
+            credit = self._credits[share_level] + share
+            if share_level is level:
+                credit -= 1.0
+            self._credits[share_level] = min(1.0, max(0.0, credit))
+    
+    def _release(self: "PriorityScheduler") -> None:
+        """
+        Free a slot and hand it to the next waiting request.
+        """
+        self.in_flight -= 1
+        while self.in_flight < self.max_concurrency and (level := self._next_level()) is not None:
+            waiter = self._waiters[level].popleft()
+            if waiter.done():
+                continue
+            self._grant(level)
+            waiter.set_result(None)
+    
+    def _next_level(self: "PriorityScheduler") -> Priority | None:
+        """
+        Pick the priority to serve next.
+        """
+        waiting = [level for level in Priority if self._waiters[level]]
+        if not waiting:
+            return None
+        
+        for level in waiting:
+            # Shares like 0.1 don't add up to exactly 1.0.
+            if self._credits.get(level, 0.0) >= 1.0 - 1e-9:
+                return level
+        return waiting[0]
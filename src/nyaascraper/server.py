@@ -0,0 +1,432 @@
+from typing import Any, AsyncIterator
+import asyncio
+import json
+
+from .enums import SITE, QualityFilter
+from .models import NyaaRSSFeed, NyaaRSSTorrent
+from .rss import NyaaRSSClient
+from .utils.categories import get_category_by_id
+from .utils.httpserver import Request, read_request, format_response
+from .utils.serialization import to_json_data
+
+FeedKey = tuple[str | None, str | None, int, str | None]
+
+class FeedSubscription:
+    """
+    A subscriber of a feed, receiving new torrents through a bounded queue.
+    """
+    def __init__(self: "FeedSubscription", hub: "FeedHub", key: FeedKey, queue_size: int) -> None:
+        """
+        Initialize a subscription. Use `FeedHub.subscribe()` to create one.
+        """
+        self.hub = hub
+        self.key = key
+        self.queue: asyncio.Queue[NyaaRSSTorrent | None] = asyncio.Queue(maxsize=queue_size)
+        self.dropped: int = 0
+        self.closed: bool = False
+    
+    def _push(self: "FeedSubscription", torrent: NyaaRSSTorrent) -> None:
+        """
+        Queue a torrent, applying the hub's overflow policy if the subscriber is too slow.
+        """
+        if self.queue.full():
+            if self.hub.overflow == "disconnect":
+                self.close()
+                return
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(torrent)
+    
+    def close(self: "FeedSubscription") -> None:
+        """
+        Stop receiving torrents.
+        """
+        if self.closed:
+            return
+        
+        self.closed = True
+        self.hub._unsubscribe(self)
+        while self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+    
+    async def get(self: "FeedSubscription", timeout: float | None = None) -> NyaaRSSTorrent | None:
+        """
+        Wait for the next new torrent.
+        
+        Parameters:
+            timeout (float | None, optional): Seconds to wait. Defaults to None.
+        
+        Raises:
+            TimeoutError: If no torrent arrived within the timeout.
+        
+        Returns:
+            NyaaRSSTorrent | None: The torrent, or None once the subscription is closed.
+        """
+        if self.closed and self.queue.empty():
+            return None
+        return await asyncio.wait_for(self.queue.get(), timeout)
+    
+    async def __aiter__(self: "FeedSubscription") -> AsyncIterator[NyaaRSSTorrent]:
+        while (torrent := await self.get()) is not None:
+            yield torrent
+
+class FeedHub:
+    """
+    Polls each distinct feed query once and fans new torrents out to all its subscribers.
+    
+    A feed is polled while it has at least one subscriber, so upstream load depends on the number
+    of distinct queries, not the number of subscribers. Each subscriber has a bounded queue; when
+    a slow subscriber's queue is full, its oldest torrent is dropped ("drop_oldest") or it is
+    disconnected ("disconnect"). The last polled state of a feed is kept for `poll_interval`
+    seconds after its last subscriber leaves, so repeated `latest()` calls don't refetch it.
+    
+    A poll that fails is counted in `errors` and retried with exponential backoff, up to MAX_BACKOFF seconds.
+    """
+    POLL_INTERVAL: float = 60.0
+    QUEUE_SIZE: int = 256
+    MAX_BACKOFF: float = 600.0
+    
+    def __init__(
+        self: "FeedHub",
+        client: NyaaRSSClient,
+        poll_interval: float = POLL_INTERVAL,
+        queue_size: int = QUEUE_SIZE,
+        overflow: str = "drop_oldest"
+        ) -> None:
+        """
+        Initialize the hub.
+        
+        Parameters:
+            client (NyaaRSSClient): The client to poll feeds with.
+            poll_interval (float, optional): Seconds between polls of a feed. Defaults to POLL_INTERVAL.
+            queue_size (int, optional): The queue size of each subscriber. Defaults to QUEUE_SIZE.
+            overflow (str, optional): What to do when a subscriber's queue is full, "drop_oldest" or "disconnect". Defaults to "drop_oldest".
+        """
+        if overflow not in ("drop_oldest", "disconnect"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        
+        self.client = client
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.overflow = overflow
+        
+        self.polls: int = 0
+        self.errors: int = 0
+        self._subscribers: dict[FeedKey, set[FeedSubscription]] = {}
+        self._pollers: dict[FeedKey, asyncio.Task] = {}
+        self._latest: dict[FeedKey, NyaaRSSFeed] = {}
+        self._fetched: dict[FeedKey, float] = {}
+        self._ready: dict[FeedKey, asyncio.Event] = {}
+    
+    @staticmethod
+    def feed_key(
+        term: str | None = None,
+        username: str | None = None,
+        quality_filter: QualityFilter = QualityFilter.NO_FILTER,
+        category_id: str | None = None
+        ) -> FeedKey:
+        """
+        Get the key identifying a feed query.
+        
+        Parameters:
+            term (str | None, optional): Search term. Defaults to None.
+            username (str | None, optional): Username of the uploader. Defaults to None.
+            quality_filter (QualityFilter, optional): Quality filter. Defaults to QualityFilter.NO_FILTER.
+            category_id (str | None, optional): Category ID, e.g. "1_2". Defaults to None.
+        
+        Returns:
+            FeedKey: The key of the feed.
+        """
+        return (term or None, username or None, int(quality_filter), category_id or None)
+    
+    def subscribe(self: "FeedHub", key: FeedKey) -> FeedSubscription:
+        """
+        Subscribe to new torrents of a feed, starting to poll it if needed.
+        
+        Parameters:
+            key (FeedKey): The key of the feed, from `feed_key()`.
+        
+        Returns:
+            FeedSubscription: The subscription. Close it when done.
+        """
+        subscription = FeedSubscription(self, key, self.queue_size)
+        self._subscribers.setdefault(key, set()).add(subscription)
+        if key not in self._pollers:
+            ready = self._ready[key] = asyncio.Event()
+            poller = self._pollers[key] = asyncio.create_task(self._poll(key, ready))
+            poller.add_done_callback(lambda poller: self._poller_done(key, poller, ready))
+        return subscription
+    
+    def _poller_done(self: "FeedHub", key: FeedKey, poller: asyncio.Task, ready: asyncio.Event) -> None:
+        """
+        Forget a poller that has finished, so the next subscriber starts a new one, and release waiters of its feed.
+        A poller stopped by unsubscribing may finish after a new one started; the waiters of the new one are left alone.
+        """
+        if self._pollers.get(key) is poller:
+            del self._pollers[key]
+        if self._ready.get(key) is ready:
+            ready.set()
+    
+    def _unsubscribe(self: "FeedHub", subscription: FeedSubscription) -> None:
+        """
+        Remove a subscription, stopping the poller of its feed if it was the last one.
+        """
+        subscribers = self._subscribers.get(subscription.key, set())
+        subscribers.discard(subscription)
+        if not subscribers:
+            self._subscribers.pop(subscription.key, None)
+            if (poller := self._pollers.pop(subscription.key, None)) is not None:
+                poller.cancel()
+            self._ready.pop(subscription.key, None)
+            self._forget_stale()
+    
+    def _forget_stale(self: "FeedHub") -> None:
+        """
+        Drop the last polled state of feeds that are no longer polled and older than `poll_interval`.
+        """
+        now = asyncio.get_running_loop().time()
+        for key, fetched in list(self._fetched.items()):
+            if key not in self._pollers and now - fetched >= self.poll_interval:
+                del self._fetched[key]
+                self._latest.pop(key, None)
+    
+    async def latest(self: "FeedHub", key: FeedKey) -> NyaaRSSFeed:
+        """
+        Get the latest polled state of a feed, subscribing briefly if it isn't polled and
+        its last state is older than `poll_interval`.
+        
+        Parameters:
+            key (FeedKey): The key of the feed.
+        
+        Raises:
+            LookupError: If the feed couldn't be fetched.
+        
+        Returns:
+            NyaaRSSFeed: The latest feed.
+        """
+        if key in self._latest and (
+            key in self._pollers
+            or asyncio.get_running_loop().time() - self._fetched[key] < self.poll_interval
+            ):
+            return self._latest[key]
+        
+        subscription = self.subscribe(key)
+        try:
+            await self._ready[key].wait()
+            if key not in self._latest:
+                raise LookupError("Feed could not be fetched from upstream")
+            return self._latest[key]
+        finally:
+            subscription.close()
+    
+    async def _poll(self: "FeedHub", key: FeedKey, ready: asyncio.Event) -> None:
+        """
+        Poll a feed until it has no subscribers, setting `ready` after each attempt.
+        """
+        term, username, quality_filter, category_id = key
+        kwargs: dict[str, Any] = {"term": term, "username": username, "quality_filter": QualityFilter(quality_filter)}
+        if category_id is not None:
+            kwargs["category"] = get_category_by_id(self.client.site, category_id)
+        
+        last_view_id: int | None = None
+        delay = self.poll_interval
+        while True:
+            try:
+                feed = await self.client.get_feed(**kwargs)
+            except Exception:
+                self.errors += 1
+                delay = min(delay * 2, max(self.poll_interval, self.MAX_BACKOFF))
+                ready.set()
+            else:
+                delay = self.poll_interval
+                self.polls += 1
+                self._latest[key] = feed
+                self._fetched[key] = asyncio.get_running_loop().time()
+                if last_view_id is not None:
+                    new_torrents = sorted(
+                        (torrent for torrent in feed.torrents if torrent.view_id > last_view_id),
+                        key=lambda torrent: torrent.view_id
+                        )
+                    for subscription in list(self._subscribers.get(key, ())):
+                        for torrent in new_torrents:
+                            subscription._push(torrent)
+                last_view_id = max((torrent.view_id for torrent in feed.torrents), default=last_view_id or 0)
+                ready.set()
+            await asyncio.sleep(delay)
+    
+    def stats(self: "FeedHub") -> dict[str, Any]:
+        """
+        Get statistics of the hub.
+        
+        Returns:
+            dict[str, Any]: The number of polled feeds, subscribers, polls, errors and dropped torrents.
+        """
+        subscriptions = [subscription for subscribers in self._subscribers.values() for subscription in subscribers]
+        return {
+            "feeds": len(self._pollers),
+            "subscribers": len(subscriptions),
+            "polls": self.polls,
+            "errors": self.errors,
+            "dropped": sum(subscription.dropped for subscription in subscriptions)
+            }
+
+class FeedServer:
+    """
+    HTTP server publishing a FeedHub to local subscribers.
+    
+    Routes:
+        GET /events?q=&u=&f=&c= : Server-Sent Events stream of new torrents of a feed, as JSON.
+        GET /feed?q=&u=&f=&c= : The latest polled state of a feed, as JSON.
+        GET /stats : Statistics of the hub, as JSON.
+    """
+    HEARTBEAT: float = 15.0
+    
+    def __init__(self: "FeedServer", hub: FeedHub, host: str = "127.0.0.1", port: int = 8080) -> None:
+        """
+        Initialize the server.
+        
+        Parameters:
+            hub (FeedHub): The hub to publish.
+            host (str, optional): The host to listen on. Defaults to "127.0.0.1".
+            port (int, optional): The port to listen on. 0 picks a free port. Defaults to 8080.
+        """
+        self.hub = hub
+        self.host = host
+        self.port = port
+        self._server: asyncio.Server | None = None
+    
+    async def start(self: "FeedServer") -> None:
+        """
+        Start listening. The actual port is stored in `port`.
+        """
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+    
+    async def serve_forever(self: "FeedServer") -> None:
+        """
+        Start listening, if not started yet, and serve until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+    
+    async def close(self: "FeedServer") -> None:
+        """
+        Stop listening.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+    
+    async def _handle(self: "FeedServer", reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while (request := await read_request(reader)) is not None:
+                if request.method != "GET":
+                    writer.write(format_response(405, b"Method Not Allowed", keep_alive=request.keep_alive))
+                elif request.path == "/events":
+                    await self._stream_events(request, reader, writer)
+                    return
+                elif request.path == "/feed":
+                    try:
+                        feed = await self.hub.latest(self._feed_key(request))
+                    except LookupError as exc:
+                        writer.write(format_response(502, str(exc).encode(), keep_alive=request.keep_alive))
+                    else:
+                        writer.write(self._json_response(to_json_data(feed), request.keep_alive))
+                elif request.path == "/stats":
+                    writer.write(self._json_response(self.hub.stats(), request.keep_alive))
+                else:
+                    writer.write(format_response(404, b"Not Found", keep_alive=request.keep_alive))
+                
+                await writer.drain()
+                if not request.keep_alive:
+                    return
+        except (ConnectionError, ValueError, LookupError) as exc:
+            if isinstance(exc, (ValueError, LookupError)) and not writer.is_closing():
+                writer.write(format_response(400, str(exc).encode(), keep_alive=False))
+        finally:
+            writer.close()
+    
+    @staticmethod
+    def _feed_key(request: Request) -> FeedKey:
+        return FeedHub.feed_key(
+            term=request.query.get("q"),
+            username=request.query.get("u"),
+            quality_filter=QualityFilter(int(request.query.get("f", 0))),
+            category_id=request.query.get("c")
+            )
+    
+    @staticmethod
+    def _json_response(data: Any, keep_alive: bool) -> bytes:
+        return format_response(
+            200, json.dumps(data).encode(), content_type="application/json", keep_alive=keep_alive
+            )
+    
+    async def _stream_events(
+        self: "FeedServer",
+        request: Request,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+        ) -> None:
+        """
+        Stream new torrents of a feed as Server-Sent Events until the client disconnects.
+        """
+        subscription = self.hub.subscribe(self._feed_key(request))
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+            )
+        disconnected = asyncio.ensure_future(reader.read())
+        try:
+            await writer.drain()
+            while not disconnected.done():
+                next_torrent = asyncio.ensure_future(subscription.get())
+                await asyncio.wait({next_torrent, disconnected}, timeout=self.HEARTBEAT, return_when=asyncio.FIRST_COMPLETED)
+                if not next_torrent.done():
+                    next_torrent.cancel()
+                    writer.write(b": heartbeat\n\n")
+                elif (torrent := next_torrent.result()) is None:
+                    return
+                else:
+                    data = json.dumps(to_json_data(torrent))
+                    writer.write(f"id: {torrent.view_id}\nevent: torrent\ndata: {data}\n\n".encode())
+                await writer.drain()
+        finally:
+            disconnected.cancel()
+            subscription.close()
+
+async def serve(
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    site: SITE = SITE.FUN,
+    poll_interval: float = FeedHub.POLL_INTERVAL
+    ) -> None:
+    """
+    Run a feed server until cancelled.
+    
+    Parameters:
+        host (str, optional): The host to listen on. Defaults to "127.0.0.1".
+        port (int, optional): The port to listen on. Defaults to 8080.
+        site (SITE, optional): The site to poll feeds from. Defaults to SITE.FUN.
+        poll_interval (float, optional): Seconds between polls of a feed. Defaults to FeedHub.POLL_INTERVAL.
+    """
+    server = FeedServer(FeedHub(NyaaRSSClient(site=site), poll_interval=poll_interval), host=host, port=port)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+if __name__ == "__main__":
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Serve nyaa RSS feeds to local subscribers.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--site", choices=[site.name for site in SITE], default=SITE.FUN.name)
+    parser.add_argument("--poll-interval", type=float, default=FeedHub.POLL_INTERVAL)
+    args = parser.parse_args()
+    
+    asyncio.run(serve(args.host, args.port, SITE[args.site], args.poll_interval))
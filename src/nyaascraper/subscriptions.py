@@ -0,0 +1,208 @@
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Hashable, Iterable
+
+from .enums import FunCategory, FapCategory, TorrentType
+from .models import SearchResultTorrent, NyaaRSSTorrent
+
+@dataclass
+class Subscription:
+    """
+    A watch pattern for torrents.
+    
+    A torrent matches if its name contains all keywords and none of the excluded keywords, and it
+    matches the uploader, categories and torrent types of the subscription, where given.
+    
+    Attributes:
+        id (Hashable): The ID of the subscription.
+        keywords (list[str], optional): Keywords that must all appear in the name, case-insensitively. Defaults to an empty list.
+        exclude (list[str], optional): Keywords that must not appear in the name. Defaults to an empty list.
+        uploader (str | None, optional): The username of the uploader. Defaults to None.
+        categories (list[FunCategory | FapCategory], optional): Allowed categories. A main category includes its subcategories. If empty, any category is allowed. Defaults to an empty list.
+        torrent_types (list[TorrentType], optional): Allowed torrent types. If empty, any type is allowed. Defaults to an empty list.
+    """
+    id: Hashable
+    keywords: list[str] = field(default_factory=list)
+    exclude: list[str] = field(default_factory=list)
+    uploader: str | None = None
+    categories: list[FunCategory | FapCategory] = field(default_factory=list)
+    torrent_types: list[TorrentType] = field(default_factory=list)
+
+class _KeywordAutomaton:
+    """
+    Aho-Corasick automaton finding all keywords in a text in a single pass.
+    """
+    def __init__(self: "_KeywordAutomaton", keywords: Iterable[str]) -> None:
+        self.goto: list[dict[str, int]] = [{}]
+        self.fail: list[int] = [0]
+        self.outputs: list[list[int]] = [[]]
+        self.keywords: list[str] = []
+        
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.outputs.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.outputs[state].append(len(self.keywords))
+            self.keywords.append(keyword)
+        
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fail = self.fail[state]
+                while fail and char not in self.goto[fail]:
+                    fail = self.fail[fail]
+                self.fail[next_state] = self.goto[fail].get(char, 0)
+                self.outputs[next_state] = self.outputs[next_state] + self.outputs[self.fail[next_state]]
+    
+    def search(self: "_KeywordAutomaton", text: str, whole_words: bool) -> set[int]:
+        """
+        Find the indexes of keywords appearing in a text.
+        """
+        found: set[int] = set()
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for keyword_index in self.outputs[state]:
+                if whole_words:
+                    start = end - len(self.keywords[keyword_index]) + 1
+                    if (start > 0 and text[start - 1].isalnum()) or (end + 1 < len(text) and text[end + 1].isalnum()):
+                        continue
+                found.add(keyword_index)
+        return found
+
+class SubscriptionIndex:
+    """
+    Index of subscriptions compiled for matching torrents against all of them at once.
+    
+    Keywords of all subscriptions are compiled into one Aho-Corasick automaton, and categories and
+    torrent types into bitmasks. Subscriptions without keywords are indexed by uploader, or else by
+    category, so matching a torrent costs one pass over its name plus the work for subscriptions
+    sharing its keywords, uploader or category, not a loop over every subscription.
+    """
+    def __init__(self: "SubscriptionIndex", subscriptions: Iterable[Subscription], whole_words: bool = True) -> None:
+        """
+        Compile an index of subscriptions.
+        
+        Parameters:
+            subscriptions (Iterable[Subscription]): The subscriptions.
+            whole_words (bool, optional): Whether keywords only match whole words of names. Defaults to True.
+        """
+        self.whole_words = whole_words
+        self.subscriptions: list[Subscription] = list(subscriptions)
+        
+        self._category_bits: dict[FunCategory | FapCategory, int] = {
+            category: 1 << index for index, category in enumerate([*FunCategory, *FapCategory])
+            }
+        self._type_bits: dict[TorrentType, int] = {
+            torrent_type: 1 << index for index, torrent_type in enumerate(TorrentType)
+            }
+        
+        keyword_ids: dict[str, int] = {}
+        keywords: list[str] = []
+        
+        def keyword_id(keyword: str) -> int:
+            keyword = keyword.lower()
+            if keyword not in keyword_ids:
+                keyword_ids[keyword] = len(keywords)
+                keywords.append(keyword)
+            return keyword_ids[keyword]
+        
+        self._required: list[list[int]] = []
+        self._excluded: list[list[int]] = []
+        self._category_masks: list[int] = []
+        self._type_masks: list[int] = []
+        self._uploaders: list[str | None] = []
+        self._by_keyword: dict[int, list[int]] = {}
+        self._by_uploader: dict[str, list[int]] = {}
+        self._by_category: dict[FunCategory | FapCategory, list[int]] = {}
+        self._unindexed: list[int] = []
+        
+        for position, subscription in enumerate(self.subscriptions):
+            required = sorted({keyword_id(keyword) for keyword in subscription.keywords})
+            excluded = sorted({keyword_id(keyword) for keyword in subscription.exclude})
+            self._required.append(required)
+            self._excluded.append(excluded)
+            self._category_masks.append(self._category_mask(subscription.categories))
+            self._type_masks.append(
+                sum(self._type_bits[torrent_type] for torrent_type in set(subscription.torrent_types)) or -1
+                )
+            self._uploaders.append(subscription.uploader.lower() if subscription.uploader else None)
+            
+            if required:
+                # A subscription is only indexed under its longest keyword, as all its keywords must appear anyway.
+                anchor = max(required, key=lambda keyword_id: len(keywords[keyword_id]))
+                self._by_keyword.setdefault(anchor, []).append(position)
+            elif self._uploaders[position] is not None:
+                self._by_uploader.setdefault(self._uploaders[position], []).append(position)
+            elif self._category_masks[position] != -1:
+                for category, bit in self._category_bits.items():
+                    if self._category_masks[position] & bit:
+                        self._by_category.setdefault(category, []).append(position)
+            else:
+                self._unindexed.append(position)
+        
+        self._automaton = _KeywordAutomaton(keywords)
+    
+    def _category_mask(self: "SubscriptionIndex", categories: list[FunCategory | FapCategory]) -> int:
+        """
+        Get the bitmask of categories, expanding main categories to their subcategories.
+        """
+        if not categories:
+            return -1
+        
+        mask = 0
+        for category in categories:
+            main, sub = category.value.split("_")
+            for member in type(category):
+                member_main = member.value.split("_")[0]
+                if member == category or (sub == "0" and (main == "0" or member_main == main)):
+                    mask |= self._category_bits[member]
+        return mask
+    
+    def match(
+        self: "SubscriptionIndex",
+        torrent: SearchResultTorrent | NyaaRSSTorrent,
+        uploader: str | None = None
+        ) -> list[Hashable]:
+        """
+        Find the subscriptions matching a torrent.
+        
+        Parameters:
+            torrent (SearchResultTorrent | NyaaRSSTorrent): The torrent.
+            uploader (str | None, optional): The username of the uploader, if known. Subscriptions with an uploader never match without it. Defaults to None.
+        
+        Returns:
+            list[Hashable]: The IDs of the matching subscriptions, in the order they were given.
+        """
+        found = self._automaton.search(torrent.name.lower(), self.whole_words)
+        category_bit = self._category_bits.get(torrent.category, 0)
+        type_bit = self._type_bits.get(torrent.torrent_type, 0)
+        uploader = uploader.lower() if uploader else None
+        
+        candidates = list(self._unindexed)
+        candidates.extend(self._by_uploader.get(uploader, ()) if uploader else ())
+        candidates.extend(self._by_category.get(torrent.category, ()))
+        for keyword_id in found:
+            candidates.extend(self._by_keyword.get(keyword_id, ()))
+        
+        matches: list[int] = []
+        for position in candidates:
+            if (
+                self._category_masks[position] & category_bit
+                and self._type_masks[position] & type_bit
+                and (self._uploaders[position] is None or self._uploaders[position] == uploader)
+                and all(keyword_id in found for keyword_id in self._required[position])
+                and not any(keyword_id in found for keyword_id in self._excluded[position])
+                ):
+                matches.append(position)
+        
+        return [self.subscriptions[position].id for position in sorted(matches)]
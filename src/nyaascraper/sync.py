@@ -0,0 +1,366 @@
+from typing import Any, Coroutine, TypeVar
+import asyncio
+import os
+import threading
+
+from .client import NyaaClient
+from .rss import NyaaRSSClient
+from .instrumentation import Hooks
+from .concurrency import AdaptiveConcurrency
+from .hedging import HedgePolicy
+from .scheduler import PriorityScheduler
+from .resolver import InfoHashIndex
+from .releases import ReleaseIndex
+from .archive import PageArchive
+from .proxies import ProxyPool
+from .warmup import DNSCache
+from .deadline import BatchResult
+from .enums import SITE, QualityFilter, FunCategory, FapCategory, SortBy, SortOrder
+from .models import SearchResult, SearchResultTorrent, TorrentInfo, TorrentDownload, NyaaRSSFeed
+
+T = TypeVar("T")
+
+# Options holding SQLite connections, connection pools or state of an event loop, which a forked process can't share.
+_PROCESS_BOUND_OPTIONS: tuple[str, ...] = ("concurrency", "scheduler", "info_hash_index", "archive", "proxies")
+
+class NyaaSyncClient:
+    """
+    Blocking scraper client for synchronous code.
+    
+    All requests run on one event loop in a background thread, so the connection pool is kept
+    between calls and batch methods run their requests concurrently. Methods can be called from
+    any number of threads at once.
+    
+    A client used in a forked child process starts a loop of its own there on first use, so a client
+    without a concurrency controller, scheduler, info hash index, archive or proxy pool can be created
+    before workers are forked. Those objects can't be shared with a forked process; a client using
+    any of them must be created in each worker.
+    """
+    DEFAULT_SITE: SITE = SITE.FUN
+    TIMEOUT: int = 30
+    
+    def __init__(
+        self: "NyaaSyncClient",
+        site: SITE = DEFAULT_SITE,
+        timeout: int = TIMEOUT,
+        hooks: Hooks | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        hedging: HedgePolicy | None = None,
+        scheduler: PriorityScheduler | None = None,
+        info_hash_index: InfoHashIndex | None = None,
+        release_index: ReleaseIndex | None = None,
+        archive: PageArchive | None = None,
+        proxies: ProxyPool | None = None,
+        dns_cache: DNSCache | None = None
+        ) -> None:
+        """
+        Initialize blocking scraper client. The background loop is started on first use.
+        
+        Parameters:
+            site (SITE, optional): The site to scrape from. Defaults to DEFAULT_SITE.
+            timeout (int, optional): The timeout for HTTP requests. Defaults to TIMEOUT.
+            hooks (Hooks | None, optional): Instrumentation hooks, see NyaaClient. Defaults to None.
+            concurrency (AdaptiveConcurrency | None, optional): The concurrency controller of batch methods, see NyaaClient. Defaults to None.
+            hedging (HedgePolicy | None, optional): The hedge policy, see NyaaClient. Defaults to None.
+            scheduler (PriorityScheduler | None, optional): The priority scheduler, see NyaaClient. Defaults to None.
+            info_hash_index (InfoHashIndex | None, optional): The info hash index, see NyaaClient. Defaults to None.
+            release_index (ReleaseIndex | None, optional): The release name index, see NyaaClient. Defaults to None.
+            archive (PageArchive | None, optional): The raw page archive, see NyaaClient. Defaults to None.
+            proxies (ProxyPool | None, optional): The egress proxy pool, see NyaaClient. Defaults to None.
+            dns_cache (DNSCache | None, optional): The DNS cache, see NyaaClient. Defaults to None.
+        """
+        self._site = site
+        self.timeout = timeout
+        self._options: dict[str, Any] = {
+            "hooks": hooks,
+            "concurrency": concurrency,
+            "hedging": hedging,
+            "scheduler": scheduler,
+            "info_hash_index": info_hash_index,
+            "release_index": release_index,
+            "archive": archive,
+            "proxies": proxies,
+            "dns_cache": dns_cache
+            }
+        
+        self._lock = threading.Lock()
+        self._created_pid = os.getpid()
+        self._pid: int | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._client: NyaaClient | None = None
+        self._rss_client: NyaaRSSClient | None = None
+    
+    @property
+    def site(self: "NyaaSyncClient") -> SITE:
+        """
+        Getter property for the current site of the client.
+        
+        Returns:
+            SITE: The current site used by the client.
+        """
+        return self._site
+    
+    @site.setter
+    def site(self: "NyaaSyncClient", new_site: SITE) -> None:
+        """
+        Set the site to scrape from.
+        
+        Parameters:
+            new_site (SITE): The new site to set.
+        """
+        self._site = new_site
+        if self._client is not None:
+            self._client.site = new_site
+            self._rss_client.site = new_site
+    
+    def _start(self: "NyaaSyncClient") -> None:
+        """
+        Start the background loop and the async clients, unless started in this process already.
+        
+        Raises:
+            RuntimeError: If the client was created in another process and has options that can't be shared with it.
+        """
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            
+            if os.getpid() != self._created_pid and (
+                bound := [name for name in _PROCESS_BOUND_OPTIONS if self._options[name] is not None]
+                ):
+                raise RuntimeError(
+                    f"NyaaSyncClient with {', '.join(bound)} was created in another process; create it in each worker process"
+                    )
+            
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="nyaascraper-loop", daemon=True)
+            thread.start()
+            
+            self._client = NyaaClient(site=self._site, timeout=self.timeout, **self._options)
+            self._rss_client = NyaaRSSClient(
+                site=self._site,
+                timeout=self.timeout,
+                hooks=self._options["hooks"],
+                info_hash_index=self._options["info_hash_index"],
+                release_index=self._options["release_index"],
+                archive=self._options["archive"],
+                proxies=self._options["proxies"],
+                dns_cache=self._options["dns_cache"]
+                )
+            self._loop, self._thread, self._pid = loop, thread, os.getpid()
+    
+    def run(self: "NyaaSyncClient", coroutine: Coroutine[Any, Any, T]) -> T:
+        """
+        Run a coroutine on the background loop and wait for its result.
+        
+        Use it to run code built on the async clients, e.g. an InfoHashResolver over `async_client`.
+        
+        Parameters:
+            coroutine (Coroutine[Any, Any, T]): The coroutine.
+        
+        Raises:
+            RuntimeError: If called from the background loop itself, which would deadlock.
+        
+        Returns:
+            T: The result of the coroutine.
+        """
+        self._start()
+        if threading.current_thread() is self._thread:
+            coroutine.close()
+            raise RuntimeError("NyaaSyncClient can't be called from its own event loop; await the async client instead")
+        
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result()
+        except BaseException:
+            # Don't leave the request running if the caller is interrupted.
+            future.cancel()
+            raise
+    
+    @property
+    def async_client(self: "NyaaSyncClient") -> NyaaClient:
+        """
+        Getter property for the async client the requests are made with. Only use it on the background loop, via `run()`.
+        
+        Returns:
+            NyaaClient: The async client.
+        """
+        self._start()
+        return self._client
+    
+    @property
+    def async_rss_client(self: "NyaaSyncClient") -> NyaaRSSClient:
+        """
+        Getter property for the async RSS client. Only use it on the background loop, via `run()`.
+        
+        Returns:
+            NyaaRSSClient: The async RSS client.
+        """
+        self._start()
+        return self._rss_client
+    
+    def warmup(self: "NyaaSyncClient", connections: int = 1, sites: list[SITE] | None = None) -> None:
+        """
+        Start the background loop, resolve the sites and open pooled connections to them. See `NyaaClient.warmup()`.
+        
+        Parameters:
+            connections (int, optional): The number of connections to open to each site. Defaults to 1.
+            sites (list[SITE] | None, optional): The sites to connect to. If not specified, the site of the client. Defaults to None.
+        """
+        self.run(self.async_client.warmup(connections, sites))
+    
+    def search(
+        self: "NyaaSyncClient",
+        term: str | None = None,
+        username: str | None = None,
+        quality_filter: QualityFilter = QualityFilter.NO_FILTER,
+        category: FunCategory | FapCategory | None = None,
+        sort_by: SortBy | None = None,
+        sort_order: SortOrder | None = None,
+        page: int = 1,
+        deadline: float | None = None,
+        site: SITE | None = None
+        ) -> SearchResult:
+        """
+        Search torrents. See `NyaaClient.search()`.
+        
+        Returns:
+            SearchResult: Result of the search.
+        """
+        return self.run(self.async_client.search(
+            term=term,
+            username=username,
+            quality_filter=quality_filter,
+            category=category,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            page=page,
+            deadline=deadline,
+            site=site
+            ))
+    
+    def get_torrent_info(self: "NyaaSyncClient", view_id: int, deadline: float | None = None) -> TorrentInfo:
+        """
+        Get information of a torrent. See `NyaaClient.get_torrent_info()`.
+        
+        Returns:
+            TorrentInfo: Information of the torrent.
+        """
+        return self.run(self.async_client.get_torrent_info(view_id, deadline=deadline))
+    
+    def search_many(
+        self: "NyaaSyncClient",
+        searches: list[dict[str, Any]],
+        deadline: float | None = None
+        ) -> BatchResult[SearchResult]:
+        """
+        Run many searches concurrently. See `NyaaClient.search_many()`.
+        
+        Returns:
+            BatchResult[SearchResult]: Results of the searches, in the order of the searches.
+        """
+        return self.run(self.async_client.search_many(searches, deadline=deadline))
+    
+    def search_top(
+        self: "NyaaSyncClient",
+        queries: list[dict[str, Any]],
+        k: int,
+        sort_by: SortBy = SortBy.SEEDERS,
+        sort_order: SortOrder = SortOrder.DESCENDING,
+        sites: list[SITE] | None = None,
+        deadline: float | None = None
+        ) -> list[SearchResultTorrent]:
+        """
+        Get the top K torrents over several searches and sites. See `NyaaClient.search_top()`.
+        
+        Returns:
+            list[SearchResultTorrent]: Up to K torrents in order, without duplicates.
+        """
+        return self.run(self.async_client.search_top(queries, k, sort_by, sort_order, sites=sites, deadline=deadline))
+    
+    def get_torrent_infos(self: "NyaaSyncClient", view_ids: list[int], deadline: float | None = None) -> BatchResult[TorrentInfo]:
+        """
+        Get information of many torrents concurrently. See `NyaaClient.get_torrent_infos()`.
+        
+        Returns:
+            BatchResult[TorrentInfo]: Information of the torrents, in the order of the View-IDs.
+        """
+        return self.run(self.async_client.get_torrent_infos(view_ids, deadline=deadline))
+    
+    def download_torrent(
+        self: "NyaaSyncClient",
+        torrent: str | int,
+        directory: str | None = None,
+        deadline: float | None = None
+        ) -> TorrentDownload:
+        """
+        Download a torrent file. See `NyaaClient.download_torrent()`.
+        
+        Returns:
+            TorrentDownload: The downloaded torrent.
+        """
+        return self.run(self.async_client.download_torrent(torrent, directory=directory, deadline=deadline))
+    
+    def download_torrents(
+        self: "NyaaSyncClient",
+        torrents: list[str | int],
+        directory: str | None = None,
+        deadline: float | None = None
+        ) -> BatchResult[TorrentDownload]:
+        """
+        Download many torrent files concurrently. See `NyaaClient.download_torrents()`.
+        
+        Returns:
+            BatchResult[TorrentDownload]: The downloaded torrents, in the order of the torrents.
+        """
+        return self.run(self.async_client.download_torrents(torrents, directory=directory, deadline=deadline))
+    
+    def get_feed(
+        self: "NyaaSyncClient",
+        term: str | None = None,
+        username: str | None = None,
+        quality_filter: QualityFilter | None = QualityFilter.NO_FILTER,
+        category: FunCategory | FapCategory | None = None,
+        use_magnet: bool | None = None,
+        deadline: float | None = None
+        ) -> NyaaRSSFeed:
+        """
+        Get an RSS feed. See `NyaaRSSClient.get_feed()`.
+        
+        Returns:
+            NyaaRSSFeed: The feed.
+        """
+        return self.run(self.async_rss_client.get_feed(
+            term=term,
+            username=username,
+            quality_filter=quality_filter,
+            category=category,
+            use_magnet=use_magnet,
+            deadline=deadline
+            ))
+    
+    def close(self: "NyaaSyncClient") -> None:
+        """
+        Close the connection pools and stop the background loop. The client starts again if used afterwards.
+        """
+        with self._lock:
+            if self._pid != os.getpid():
+                return
+            
+            async def close_clients() -> None:
+                await self._client._http_client.aclose()
+                await self._rss_client._http_client.aclose()
+                if self._options["proxies"] is not None:
+                    await self._options["proxies"].close()
+            
+            asyncio.run_coroutine_threadsafe(close_clients(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._pid = self._loop = self._thread = None
+    
+    def __enter__(self: "NyaaSyncClient") -> "NyaaSyncClient":
+        return self
+    
+    def __exit__(self: "NyaaSyncClient", *exc_info: Any) -> None:
+        self.close()
\ No newline at end of file
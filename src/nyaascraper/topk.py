@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Iterable, TYPE_CHECKING
+import asyncio
+import heapq
+
+from .enums import SITE, SortBy, SortOrder, FunCategory, FapCategory
+from .models import SearchResult, SearchResultTorrent
+from .utils.size import parse_size
+
+if TYPE_CHECKING:
+    from .client import NyaaClient
+
+_EPOCH = datetime(1970, 1, 1)
+
+# The value nyaa sorts by for each sort option.
+SORT_KEYS: dict[SortBy, Callable[[SearchResultTorrent], float]] = {
+    SortBy.COMMENTS: lambda torrent: torrent.total_comments,
+    SortBy.SIZE: lambda torrent: parse_size(torrent.size),
+    SortBy.DATE: lambda torrent: (torrent.timestamp - _EPOCH).total_seconds(),
+    SortBy.SEEDERS: lambda torrent: torrent.seeders,
+    SortBy.LEECHERS: lambda torrent: torrent.leechers,
+    SortBy.DOWNLOADS: lambda torrent: torrent.completed
+    }
+
+@dataclass
+class _PageStream:
+    """
+    The pages of one sub-query, consumed in order.
+    """
+    query: dict[str, Any]
+    site: SITE
+    torrents: list[SearchResultTorrent] = field(default_factory=list)
+    position: int = 0
+    page: int = 0
+    next_page: int | None = 1
+    prefetch: asyncio.Task | None = None
+    
+    @property
+    def remaining(self: "_PageStream") -> int:
+        return len(self.torrents) - self.position
+
+def _applies(query: dict[str, Any], site: SITE) -> bool:
+    """
+    Check whether a query can run on a site, i.e. its category, if any, belongs to the site.
+    """
+    category = query.get("category")
+    if category is None:
+        return True
+    return isinstance(category, FunCategory if site == SITE.FUN else FapCategory)
+
+async def search_top(
+    client: "NyaaClient",
+    queries: Iterable[dict[str, Any]],
+    k: int,
+    sort_by: SortBy,
+    sort_order: SortOrder,
+    sites: Iterable[SITE] | None = None
+    ) -> list[SearchResultTorrent]:
+    """
+    Get the top K torrents over several queries and sites. See `NyaaClient.search_top()`.
+    
+    Every query runs on every site, sorted by nyaa itself, so each one is a stream of sorted pages.
+    A heap merges the heads of the streams. The next page of a stream is only fetched once its
+    current page is used up by the top K, so streams that can't contribute stop after one page.
+    """
+    sites = [client.site] if sites is None else list(dict.fromkeys(sites))
+    streams = [_PageStream(dict(query), site) for query in queries for site in sites if _applies(query, site)]
+    key = SORT_KEYS[sort_by]
+    sign = -1 if sort_order == SortOrder.DESCENDING else 1
+    
+    async def fetch(stream: _PageStream) -> SearchResult:
+        async with client.concurrency.slot():
+            return await client.search(
+                **stream.query,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                page=stream.next_page,
+                site=stream.site
+                )
+    
+    heap: list[tuple[float, int]] = []
+    
+    def load(index: int, result: SearchResult) -> None:
+        stream = streams[index]
+        stream.page = stream.next_page
+        stream.torrents, stream.position, stream.prefetch = result.torrents, 0, None
+        # Stop at the last page, and don't loop if the pagination doesn't advance.
+        next_page = result.next_page if result.torrents else None
+        stream.next_page = next_page if next_page is not None and next_page > stream.page else None
+        if stream.torrents:
+            heapq.heappush(heap, (sign * key(stream.torrents[0]), index))
+    
+    top: list[SearchResultTorrent] = []
+    seen: set[tuple[SITE, int]] = set()
+    first_pages = [asyncio.ensure_future(fetch(stream)) for stream in streams]
+    try:
+        for index, result in enumerate(await asyncio.gather(*first_pages)):
+            load(index, result)
+        
+        while heap and len(top) < k:
+            _, index = heapq.heappop(heap)
+            stream = streams[index]
+            torrent = stream.torrents[stream.position]
+            stream.position += 1
+            # New uploads shift pages, so a torrent can show up twice in a stream.
+            if (stream.site, torrent.view_id) not in seen:
+                seen.add((stream.site, torrent.view_id))
+                top.append(torrent)
+            
+            if stream.remaining:
+                heapq.heappush(heap, (sign * key(stream.torrents[stream.position]), index))
+                # Fetch the next page ahead once the stream is half used and might run out before the top K is full.
+                if (
+                    stream.next_page is not None and stream.prefetch is None
+                    and stream.remaining * 2 <= len(stream.torrents) and k - len(top) > stream.remaining
+                    ):
+                    stream.prefetch = asyncio.ensure_future(fetch(stream))
+            elif stream.next_page is not None and len(top) < k:
+                load(index, await (stream.prefetch or fetch(stream)))
+        return top
+    finally:
+        # Cancel prefetches that weren't needed, and the other first pages if one failed.
+        tasks = first_pages + [stream.prefetch for stream in streams if stream.prefetch is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
\ No newline at end of file
@@ -0,0 +1,285 @@
+from typing import Callable, Iterable, Mapping
+from urllib.parse import urlsplit, quote_from_bytes
+import asyncio
+import random
+import struct
+import time
+
+import httpx
+
+from .exceptions import TrackerError, BencodeError
+from .models import TrackerScrape
+from .utils.bencode import bdecode
+from .utils.magnet import normalize_info_hash, parse_magnet
+
+# Trackers listed in the magnet links of nyaa.si.
+DEFAULT_TRACKERS: list[str] = [
+    "http://nyaa.tracker.wf:7777/announce",
+    "udp://open.stealth.si:80/announce",
+    "udp://tracker.opentrackr.org:1337/announce",
+    "udp://exodus.desync.com:6969/announce",
+    "udp://tracker.torrent.eu.org:451/announce"
+    ]
+
+_PROTOCOL_ID = 0x41727101980
+_CONNECT, _SCRAPE, _ERROR = 0, 2, 3
+
+class _UDPTrackerProtocol(asyncio.DatagramProtocol):
+    """
+    Datagram endpoint matching UDP tracker responses to requests by transaction ID.
+    """
+    def __init__(self: "_UDPTrackerProtocol") -> None:
+        self.transport: asyncio.DatagramTransport | None = None
+        self.waiters: dict[int, asyncio.Future[tuple[int, bytes]]] = {}
+    
+    def connection_made(self: "_UDPTrackerProtocol", transport: asyncio.DatagramTransport) -> None:
+        self.transport = transport
+    
+    def datagram_received(self: "_UDPTrackerProtocol", data: bytes, addr: tuple) -> None:
+        if len(data) < 8:
+            return
+        action, transaction_id = struct.unpack_from(">II", data)
+        waiter = self.waiters.pop(transaction_id, None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result((action, data[8:]))
+    
+    def error_received(self: "_UDPTrackerProtocol", exc: Exception) -> None:
+        for waiter in self.waiters.values():
+            if not waiter.done():
+                waiter.set_exception(exc)
+        self.waiters.clear()
+    
+    def connection_lost(self: "_UDPTrackerProtocol", exc: Exception | None) -> None:
+        self.error_received(exc or ConnectionError("UDP endpoint closed"))
+    
+    async def request(self: "_UDPTrackerProtocol", build: Callable[[int], bytes], timeout: float, retries: int) -> tuple[int, bytes]:
+        """
+        Send a request built for a fresh transaction ID, resending it on timeout.
+        """
+        for attempt in range(retries + 1):
+            transaction_id = random.getrandbits(32)
+            waiter = asyncio.get_running_loop().create_future()
+            self.waiters[transaction_id] = waiter
+            self.transport.sendto(build(transaction_id))
+            try:
+                action, payload = await asyncio.wait_for(waiter, timeout)
+            except asyncio.TimeoutError:
+                continue
+            finally:
+                self.waiters.pop(transaction_id, None)
+            if action == _ERROR:
+                raise TrackerError(payload.decode("utf-8", errors="replace") or "Tracker returned an error")
+            return action, payload
+        raise TrackerError(f"No response after {retries + 1} attempts")
+
+class TrackerScraper:
+    """
+    Scrapes peer counts of torrents from BitTorrent trackers directly, without requests to nyaa.
+    
+    Info hashes are batched per tracker: up to UDP_BATCH_SIZE per UDP scrape packet (BEP 15) and
+    HTTP_BATCH_SIZE per HTTP scrape request (BEP 48). Trackers and batches are scraped concurrently.
+    """
+    TIMEOUT: float = 5.0
+    RETRIES: int = 1
+    CONCURRENCY: int = 32
+    UDP_BATCH_SIZE: int = 70
+    HTTP_BATCH_SIZE: int = 50
+    CONNECTION_ID_TTL: float = 60.0
+    
+    def __init__(
+        self: "TrackerScraper",
+        timeout: float = TIMEOUT,
+        retries: int = RETRIES,
+        concurrency: int = CONCURRENCY,
+        http_client: httpx.AsyncClient | None = None
+        ) -> None:
+        """
+        Initialize the scraper.
+        
+        Parameters:
+            timeout (float, optional): Seconds to wait for each tracker response. Defaults to TIMEOUT.
+            retries (int, optional): How often an unanswered UDP request is resent. Defaults to RETRIES.
+            concurrency (int, optional): The maximum number of scrape requests in flight. Defaults to CONCURRENCY.
+            http_client (httpx.AsyncClient | None, optional): The client for HTTP trackers. If not specified, one is created. Defaults to None.
+        """
+        self.timeout = timeout
+        self.retries = retries
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._own_http_client = http_client is None
+        self._http_client = http_client or httpx.AsyncClient(timeout=timeout)
+        self._connection_ids: dict[tuple[str, int], tuple[int, float]] = {}
+    
+    async def close(self: "TrackerScraper") -> None:
+        """
+        Close the HTTP client, if created by the scraper.
+        """
+        if self._own_http_client:
+            await self._http_client.aclose()
+    
+    async def scrape(self: "TrackerScraper", tracker: str, info_hashes: Iterable[str]) -> dict[str, TrackerScrape]:
+        """
+        Scrape torrents from one tracker.
+        
+        Parameters:
+            tracker (str): The announce URL of the tracker, "udp://", "http://" or "https://".
+            info_hashes (Iterable[str]): The info hashes, as hex or base32.
+        
+        Returns:
+            dict[str, TrackerScrape]: The peer counts by info hash as lower-case hex. Failed batches, and torrents an HTTP tracker left out of its response, have `error` set.
+        """
+        hashes = list(dict.fromkeys(
+            normalized for info_hash in info_hashes if (normalized := normalize_info_hash(info_hash)) is not None
+            ))
+        scheme = urlsplit(tracker).scheme
+        if scheme == "udp":
+            batch_size, scrape_batch = self.UDP_BATCH_SIZE, self._scrape_udp
+        elif scheme in ("http", "https"):
+            batch_size, scrape_batch = self.HTTP_BATCH_SIZE, self._scrape_http
+        else:
+            return {info_hash: self._failed(info_hash, tracker, f"Unsupported tracker scheme: {scheme}") for info_hash in hashes}
+        
+        async def run(batch: list[str]) -> dict[str, TrackerScrape]:
+            async with self._semaphore:
+                try:
+                    return await scrape_batch(tracker, batch)
+                except (TrackerError, BencodeError, httpx.HTTPError, OSError, ValueError) as exc:
+                    return {info_hash: self._failed(info_hash, tracker, str(exc) or type(exc).__name__) for info_hash in batch}
+        
+        results: dict[str, TrackerScrape] = {}
+        batches = [hashes[index:index + batch_size] for index in range(0, len(hashes), batch_size)]
+        for batch_results in await asyncio.gather(*(run(batch) for batch in batches)):
+            results.update(batch_results)
+        return results
+    
+    async def scrape_many(self: "TrackerScraper", torrents: Mapping[str, Iterable[str]]) -> dict[str, list[TrackerScrape]]:
+        """
+        Scrape torrents from their trackers, all trackers concurrently.
+        
+        Parameters:
+            torrents (Mapping[str, Iterable[str]]): The announce URLs of the trackers of each torrent, by info hash. Torrents without trackers are scraped from DEFAULT_TRACKERS.
+        
+        Returns:
+            dict[str, list[TrackerScrape]]: The peer counts from each tracker, by info hash as lower-case hex.
+        """
+        by_tracker: dict[str, list[str]] = {}
+        results: dict[str, list[TrackerScrape]] = {}
+        for info_hash, trackers in torrents.items():
+            if (info_hash := normalize_info_hash(info_hash)) is None:
+                continue
+            results[info_hash] = []
+            for tracker in list(trackers) or DEFAULT_TRACKERS:
+                by_tracker.setdefault(tracker, []).append(info_hash)
+        
+        for tracker_results in await asyncio.gather(
+            *(self.scrape(tracker, info_hashes) for tracker, info_hashes in by_tracker.items())
+            ):
+            for info_hash, scrape in tracker_results.items():
+                results[info_hash].append(scrape)
+        return results
+    
+    async def scrape_magnets(self: "TrackerScraper", magnet_links: Iterable[str]) -> dict[str, list[TrackerScrape]]:
+        """
+        Scrape torrents from the trackers listed in their magnet links.
+        
+        Parameters:
+            magnet_links (Iterable[str]): The magnet links, e.g. `SearchResultTorrent.magnet_link`.
+        
+        Returns:
+            dict[str, list[TrackerScrape]]: The peer counts from each tracker, by info hash as lower-case hex.
+        """
+        torrents: dict[str, list[str]] = {}
+        for magnet_link in magnet_links:
+            info_hash, trackers = parse_magnet(magnet_link)
+            if info_hash is None:
+                continue
+            known_trackers = torrents.setdefault(info_hash, [])
+            known_trackers.extend(tracker for tracker in trackers if tracker not in known_trackers)
+        return await self.scrape_many(torrents)
+    
+    @staticmethod
+    def _failed(info_hash: str, tracker: str, error: str) -> TrackerScrape:
+        return TrackerScrape(info_hash=info_hash, tracker=tracker, seeders=None, leechers=None, completed=None, error=error)
+    
+    async def _scrape_udp(self: "TrackerScraper", tracker: str, info_hashes: list[str]) -> dict[str, TrackerScrape]:
+        """
+        Scrape a batch of torrents from a UDP tracker (BEP 15).
+        """
+        url = urlsplit(tracker)
+        address = (url.hostname, url.port or 80)
+        loop = asyncio.get_running_loop()
+        transport, protocol = await loop.create_datagram_endpoint(_UDPTrackerProtocol, remote_addr=address)
+        try:
+            connection_id, expires = self._connection_ids.get(address, (None, 0.0))
+            if connection_id is None or expires < time.monotonic():
+                action, payload = await protocol.request(
+                    lambda transaction_id: struct.pack(">QII", _PROTOCOL_ID, _CONNECT, transaction_id),
+                    self.timeout,
+                    self.retries
+                    )
+                if action != _CONNECT or len(payload) < 8:
+                    raise TrackerError("Malformed connect response")
+                (connection_id,) = struct.unpack_from(">Q", payload)
+                self._connection_ids[address] = (connection_id, time.monotonic() + self.CONNECTION_ID_TTL)
+            
+            hashes = b"".join(bytes.fromhex(info_hash) for info_hash in info_hashes)
+            action, payload = await protocol.request(
+                lambda transaction_id: struct.pack(">QII", connection_id, _SCRAPE, transaction_id) + hashes,
+                self.timeout,
+                self.retries
+                )
+        except TrackerError:
+            # The connection ID may have expired on the tracker's side.
+            self._connection_ids.pop(address, None)
+            raise
+        finally:
+            transport.close()
+        
+        if action != _SCRAPE or len(payload) < 12 * len(info_hashes):
+            raise TrackerError("Malformed scrape response")
+        results: dict[str, TrackerScrape] = {}
+        for index, info_hash in enumerate(info_hashes):
+            seeders, completed, leechers = struct.unpack_from(">III", payload, 12 * index)
+            results[info_hash] = TrackerScrape(
+                info_hash=info_hash, tracker=tracker, seeders=seeders, leechers=leechers, completed=completed
+                )
+        return results
+    
+    async def _scrape_http(self: "TrackerScraper", tracker: str, info_hashes: list[str]) -> dict[str, TrackerScrape]:
+        """
+        Scrape a batch of torrents from an HTTP tracker (BEP 48).
+        """
+        base, _, last = tracker.rpartition("/")
+        if not last.startswith("announce"):
+            raise TrackerError("Tracker does not support scraping")
+        query = "&".join("info_hash=" + quote_from_bytes(bytes.fromhex(info_hash)) for info_hash in info_hashes)
+        separator = "&" if "?" in last else "?"
+        response = await self._http_client.get(f"{base}/scrape{last[8:]}{separator}{query}")
+        response.raise_for_status()
+        
+        data = bdecode(response.content)
+        if not isinstance(data, dict):
+            raise TrackerError("Malformed scrape response")
+        if b"failure reason" in data:
+            raise TrackerError(data[b"failure reason"].decode("utf-8", errors="replace"))
+        
+        files = data.get(b"files", {})
+        if not isinstance(files, dict):
+            raise TrackerError("Malformed scrape response")
+        
+        results: dict[str, TrackerScrape] = {}
+        for info_hash in info_hashes:
+            stats = files.get(bytes.fromhex(info_hash))
+            if stats is None:
+                results[info_hash] = self._failed(info_hash, tracker, "Torrent not reported by tracker")
+                continue
+            
+            counts = [stats.get(key) if isinstance(stats, dict) else None for key in (b"complete", b"incomplete", b"downloaded")]
+            if not all(isinstance(count, int) for count in counts):
+                results[info_hash] = self._failed(info_hash, tracker, "Malformed scrape response")
+                continue
+            
+            seeders, leechers, completed = counts
+            results[info_hash] = TrackerScrape(
+                info_hash=info_hash, tracker=tracker, seeders=seeders, leechers=leechers, completed=completed
+                )
+        return results
\ No newline at end of file
@@ -0,0 +1,116 @@
+from typing import Any
+
+from ..exceptions import BencodeError
+
+# Lists and dictionaries nested deeper than this are rejected, well before Python's recursion limit.
+MAX_DEPTH: int = 64
+
+def bdecode(data: bytes) -> Any:
+    """
+    Decode bencoded data.
+    
+    Strings are returned as bytes, dictionary keys included.
+    
+    Parameters:
+        data (bytes): The bencoded data.
+    
+    Raises:
+        BencodeError: If the data is not valid bencode.
+    
+    Returns:
+        Any: The decoded value.
+    """
+    value, end = decode_value(data, 0)
+    if end != len(data):
+        raise BencodeError(f"Trailing data at offset {end}")
+    return value
+
+def decode_value(
+    data: bytes,
+    index: int,
+    spans: dict[bytes, tuple[int, int]] | None = None,
+    depth: int = 0
+    ) -> tuple[Any, int]:
+    """
+    Decode a single bencoded value starting at an offset.
+    
+    Parameters:
+        data (bytes): The bencoded data.
+        index (int): The offset of the value.
+        spans (dict[bytes, tuple[int, int]] | None, optional): If given, filled with the (start, end) offsets of the values of the outermost dictionary, by key. Defaults to None.
+        depth (int, optional): The nesting depth of the value. Defaults to 0.
+    
+    Raises:
+        BencodeError: If the data is not valid bencode or is nested deeper than MAX_DEPTH.
+    
+    Returns:
+        tuple[Any, int]: The decoded value and the offset after it.
+    """
+    if depth > MAX_DEPTH:
+        raise BencodeError(f"Value at offset {index} is nested deeper than {MAX_DEPTH} levels")
+    
+    try:
+        token = data[index:index + 1]
+        if token == b"i":
+            end = data.index(b"e", index)
+            return int(data[index + 1:end]), end + 1
+        elif token == b"l":
+            index += 1
+            items: list[Any] = []
+            while data[index:index + 1] != b"e":
+                item, index = decode_value(data, index, depth=depth + 1)
+                items.append(item)
+            return items, index + 1
+        elif token == b"d":
+            index += 1
+            dictionary: dict[bytes, Any] = {}
+            while data[index:index + 1] != b"e":
+                key, index = decode_value(data, index, depth=depth + 1)
+                if not isinstance(key, bytes):
+                    raise BencodeError(f"Dictionary key at offset {index} is not a string")
+                start = index
+                dictionary[key], index = decode_value(data, index, depth=depth + 1)
+                if spans is not None:
+                    spans[key] = (start, index)
+            return dictionary, index + 1
+        elif token.isdigit():
+            colon = data.index(b":", index)
+            start = colon + 1
+            end = start + int(data[index:colon])
+            if end > len(data):
+                raise BencodeError(f"String at offset {index} runs past the end of data")
+            return data[start:end], end
+    except ValueError as exc:
+        raise BencodeError(f"Malformed value at offset {index}") from exc
+    
+    raise BencodeError(f"Unexpected token {token!r} at offset {index}")
+
+def bencode(value: Any) -> bytes:
+    """
+    Encode a value as bencode.
+    
+    Parameters:
+        value (Any): An int, bytes, str, list or dict to encode.
+    
+    Raises:
+        BencodeError: If the value has a type that can't be bencoded.
+    
+    Returns:
+        bytes: The bencoded data.
+    """
+    if isinstance(value, bool):
+        raise BencodeError("Booleans can't be bencoded")
+    elif isinstance(value, int):
+        return b"i%de" % value
+    elif isinstance(value, str):
+        value = value.encode()
+    
+    if isinstance(value, bytes):
+        return b"%d:%s" % (len(value), value)
+    elif isinstance(value, (list, tuple)):
+        return b"l" + b"".join(bencode(item) for item in value) + b"e"
+    elif isinstance(value, dict):
+        items = sorted((key.encode() if isinstance(key, str) else key, item) for key, item in value.items())
+        return b"d" + b"".join(bencode(key) + bencode(item) for key, item in items) + b"e"
+    
+    raise BencodeError(f"Can't bencode value of type {type(value).__name__}")
@@ -0,0 +1,263 @@
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Type, TypeVar, Union, get_args, get_origin, get_type_hints
+import base64
+import calendar
+import json
+import time
+import types
+
+M = TypeVar("M")
+
+Encoder = Callable[[Any], Any]
+Decoder = Callable[[Any], Any]
+
+FORMATS: tuple[str, ...] = ("msgpack", "json")
+
+_encoders: dict[type, Encoder] = {}
+_decoders: dict[type, Decoder] = {}
+
+def _msgpack():
+    """
+    Import msgpack, which is optional.
+    """
+    try:
+        import msgpack
+    except ImportError as exc:
+        raise ImportError("The msgpack format requires msgpack: pip install nyaasi-scraper[msgpack]") from exc
+    return msgpack
+
+@lru_cache(maxsize=None)
+def _default_format() -> str:
+    """
+    Get the format used when none is given: msgpack if installed, else JSON.
+    """
+    try:
+        _msgpack()
+    except ImportError:
+        return "json"
+    return "msgpack"
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, bytes):
+        return base64.b64encode(value).decode("ascii")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _compile(hint: Any) -> tuple[Encoder | None, Decoder | None]:
+    """
+    Build the encoder and decoder of a type hint. None means the value is kept as is.
+    """
+    origin = get_origin(hint)
+    args = get_args(hint)
+    
+    if origin in (Union, types.UnionType):
+        options = [arg for arg in args if arg is not type(None)]
+        if len(options) == 1:
+            encode, decode = _compile(options[0])
+            return (
+                (lambda value: None if value is None else encode(value)) if encode else None,
+                (lambda value: None if value is None else decode(value)) if decode else None
+                )
+        
+        if all(isinstance(option, type) and issubclass(option, Enum) for option in options):
+            # Members of all enums of the union share one id space.
+            members = [member for option in options for member in option]
+            ids = {member: index for index, member in enumerate(members)}
+            return (
+                lambda value: None if value is None else ids[value],
+                lambda value: None if value is None else members[value]
+                )
+        
+        if all(is_dataclass(option) for option in options):
+            # Prefix the fields with the position of the class in the union.
+            positions = {option: index for index, option in enumerate(options)}
+            
+            def encode_union(value: Any) -> list | None:
+                if value is None:
+                    return None
+                encoded = model_encoder(type(value))(value)
+                encoded.insert(0, positions[type(value)])
+                return encoded
+            
+            def decode_union(value: list | None) -> Any:
+                if value is None:
+                    return None
+                return model_decoder(options[value[0]])(value, 1)
+            
+            return encode_union, decode_union
+        
+        raise TypeError(f"Unsupported union: {hint}")
+    
+    if origin is list:
+        encode, decode = _compile(args[0]) if args else (None, None)
+        return (
+            (lambda value: [encode(item) for item in value]) if encode else list,
+            (lambda value: [decode(item) for item in value]) if decode else list
+            )
+    
+    if isinstance(hint, type) and issubclass(hint, Enum):
+        members = list(hint)
+        ids = {member: index for index, member in enumerate(members)}
+        return ids.__getitem__, members.__getitem__
+    
+    if hint is datetime:
+        # Timestamps of the models are naive UTC.
+        def encode_datetime(value: datetime) -> int | float:
+            seconds = calendar.timegm(value.utctimetuple())
+            return seconds + value.microsecond / 1000000 if value.microsecond else seconds
+        return encode_datetime, datetime.utcfromtimestamp
+    
+    if hint is time.struct_time:
+        return calendar.timegm, time.gmtime
+    
+    if hint is bytes:
+        return None, lambda value: base64.b64decode(value) if isinstance(value, str) else value
+    
+    if is_dataclass(hint):
+        return (
+            lambda value: model_encoder(type(value))(value),
+            lambda value: model_decoder(hint)(value)
+            )
+    
+    return None, None
+
+def model_encoder(cls: type) -> Encoder:
+    """
+    Get the encoder of a model class, compiling it on first use.
+    
+    Parameters:
+        cls (type): The dataclass.
+    
+    Returns:
+        Callable[[Any], list]: The function converting an instance to a list of its encoded field values.
+    """
+    if (encoder := _encoders.get(cls)) is not None:
+        return encoder
+    
+    hints = get_type_hints(cls)
+    names = [field.name for field in fields(cls)]
+    field_encoders = [_compile(hints[name])[0] for name in names]
+    plan = list(zip(names, field_encoders))
+    
+    def encoder(value: Any) -> list:
+        return [
+            getattr(value, name) if encode is None else encode(getattr(value, name))
+            for name, encode in plan
+            ]
+    
+    _encoders[cls] = encoder
+    return encoder
+
+def model_decoder(cls: Type[M]) -> Callable[[list, int], M]:
+    """
+    Get the decoder of a model class, compiling it on first use.
+    
+    Parameters:
+        cls (Type[M]): The dataclass.
+    
+    Returns:
+        Callable[[list, int], M]: The function building an instance from a list of encoded field values, starting at an optional index.
+    """
+    if (decoder := _decoders.get(cls)) is not None:
+        return decoder
+    
+    hints = get_type_hints(cls)
+    names = [field.name for field in fields(cls)]
+    field_decoders = [_compile(hints[name])[1] for name in names]
+    
+    def decoder(values: list, start: int = 0) -> M:
+        if len(values) - start != len(field_decoders):
+            raise ValueError(f"Expected {len(field_decoders)} fields of {cls.__name__}, got {len(values) - start}")
+        return cls(*[
+            value if decode is None else decode(value)
+            for value, decode in zip(values[start:] if start else values, field_decoders)
+            ])
+    
+    _decoders[cls] = decoder
+    return decoder
+
+def encode(value: Any, format: str | None = None) -> bytes:
+    """
+    Encode a model compactly.
+    
+    Fields are stored by position instead of by name, enums as their index in the enum,
+    datetimes and struct_times as Unix timestamps, and unions of models with the index of the model.
+    The encoding is meant for caches and for passing models between processes running the same
+    version of the library, as ids and positions follow the order of declaration.
+    
+    Parameters:
+        value (Any): The model.
+        format (str | None, optional): "msgpack" or "json". If not specified, msgpack is used if installed, else JSON. Defaults to None.
+    
+    Raises:
+        ImportError: If the msgpack format is used and msgpack is not installed.
+        ValueError: If the format is unknown.
+    
+    Returns:
+        bytes: The encoded model.
+    """
+    data = model_encoder(type(value))(value)
+    format = format or _default_format()
+    if format == "msgpack":
+        return _msgpack().packb(data, use_bin_type=True)
+    elif format == "json":
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_json_default).encode("utf-8")
+    raise ValueError(f"Unknown format: {format}")
+
+def decode(cls: Type[M], data: bytes) -> M:
+    """
+    Decode a model encoded by `encode()`. The format is detected.
+    
+    Parameters:
+        cls (Type[M]): The class of the model.
+        data (bytes): The encoded model.
+    
+    Raises:
+        ImportError: If the data is msgpack and msgpack is not installed.
+        ValueError: If the data is not an encoded model of the class, e.g. one encoded by another version of the library.
+    
+    Returns:
+        M: The model.
+    """
+    # JSON arrays start with "[", msgpack arrays never do.
+    if data[:1] == b"[":
+        values = json.loads(data)
+    else:
+        values = _msgpack().unpackb(data, raw=False)
+    if not isinstance(values, list):
+        raise ValueError(f"Not an encoded {cls.__name__}")
+    try:
+        return model_decoder(cls)(values)
+    except (IndexError, KeyError, TypeError) as exc:
+        raise ValueError(f"Not an encoded {cls.__name__}: {exc!r}") from exc
+
+class Codec:
+    """
+    Mixin adding compact binary encoding to a model dataclass.
+    """
+    def to_bytes(self: "Codec", format: str | None = None) -> bytes:
+        """
+        Encode the model compactly. See `nyaascraper.utils.codec.encode()`.
+        
+        Parameters:
+            format (str | None, optional): "msgpack" or "json". If not specified, msgpack is used if installed, else JSON. Defaults to None.
+        
+        Returns:
+            bytes: The encoded model.
+        """
+        return encode(self, format)
+    
+    @classmethod
+    def from_bytes(cls: Type[M], data: bytes) -> M:
+        """
+        Decode a model encoded by `to_bytes()`.
+        
+        Parameters:
+            data (bytes): The encoded model.
+        
+        Returns:
+            The model.
+        """
+        return decode(cls, data)
\ No newline at end of file
@@ -0,0 +1,87 @@
+from dataclasses import dataclass
+from http import HTTPStatus
+from urllib.parse import urlsplit, parse_qsl
+import asyncio
+
+@dataclass
+class Request:
+    """
+    An HTTP request read by `read_request()`.
+    
+    Attributes:
+        method (str): The HTTP method.
+        path (str): The path of the URL.
+        query (dict[str, str]): The query parameters. Repeated parameters keep the last value.
+        headers (dict[str, str]): The headers, with lower-case names.
+        query_string (str): The raw query string, for parameters that repeat or aren't text.
+    """
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    query_string: str = ""
+    
+    @property
+    def keep_alive(self: "Request") -> bool:
+        """
+        Getter property for whether the client wants to keep the connection open.
+        
+        Returns:
+            bool: True unless the client sent "Connection: close".
+        """
+        return self.headers.get("connection", "").lower() != "close"
+
+async def read_request(reader: asyncio.StreamReader) -> Request | None:
+    """
+    Read the head of an HTTP/1.1 request. Request bodies are not supported.
+    
+    Parameters:
+        reader (asyncio.StreamReader): The stream to read from.
+    
+    Returns:
+        Request | None: The request, or None if the connection was closed or the request is malformed.
+    """
+    try:
+        request_line = await reader.readline()
+        parts = request_line.decode("latin-1").split()
+        if len(parts) != 3:
+            return None
+        
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        return None
+    
+    url = urlsplit(parts[1])
+    return Request(method=parts[0], path=url.path, query=dict(parse_qsl(url.query)), headers=headers, query_string=url.query)
+
+def format_response(
+    status: int,
+    body: bytes = b"",
+    content_type: str = "text/plain; charset=utf-8",
+    headers: dict[str, str] | None = None,
+    keep_alive: bool = True
+    ) -> bytes:
+    """
+    Format an HTTP/1.1 response.
+    
+    Parameters:
+        status (int): The status code.
+        body (bytes, optional): The body. Defaults to b"".
+        content_type (str, optional): The content type of the body. Defaults to "text/plain; charset=utf-8".
+        headers (dict[str, str] | None, optional): Extra headers. Defaults to None.
+        keep_alive (bool, optional): Whether the connection is kept open. Defaults to True.
+    
+    Returns:
+        bytes: The response.
+    """
+    head = [
+        f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        *(f"{name}: {value}" for name, value in (headers or {}).items())
+        ]
+    return ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
\ No newline at end of file
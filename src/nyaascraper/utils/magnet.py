@@ -0,0 +1,45 @@
+from urllib.parse import urlsplit, parse_qs
+import base64
+import binascii
+
+def normalize_info_hash(info_hash: str) -> str | None:
+    """
+    Normalize a BitTorrent v1 info hash to lower-case hex.
+    
+    Parameters:
+        info_hash (str): The info hash, as 40 hex characters or 32 base32 characters.
+    
+    Returns:
+        str | None: The info hash as 40 lower-case hex characters, or None if it is not a valid info hash.
+    """
+    info_hash = info_hash.strip()
+    if len(info_hash) == 40:
+        try:
+            bytes.fromhex(info_hash)
+        except ValueError:
+            return None
+        return info_hash.lower()
+    elif len(info_hash) == 32:
+        try:
+            return base64.b32decode(info_hash.upper()).hex()
+        except binascii.Error:
+            return None
+    return None
+
+def parse_magnet(magnet_link: str) -> tuple[str | None, list[str]]:
+    """
+    Get the info hash and trackers of a magnet link.
+    
+    Parameters:
+        magnet_link (str): The magnet link.
+    
+    Returns:
+        tuple[str | None, list[str]]: The info hash as lower-case hex (None if missing) and the tracker URLs.
+    """
+    params = parse_qs(urlsplit(magnet_link).query)
+    info_hash = None
+    for topic in params.get("xt", []):
+        if topic.lower().startswith("urn:btih:"):
+            info_hash = normalize_info_hash(topic[9:])
+            break
+    return info_hash, params.get("tr", [])
\ No newline at end of file
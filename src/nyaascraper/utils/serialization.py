@@ -0,0 +1,29 @@
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any
+import time
+
+def to_json_data(value: Any) -> Any:
+    """
+    Convert a model into JSON-compatible data.
+    
+    Enums are converted to their values, datetimes to ISO 8601 strings and struct_times to lists.
+    
+    Parameters:
+        value (Any): The model, or a list or dict of models.
+    
+    Returns:
+        Any: The JSON-compatible data.
+    """
+    if is_dataclass(value) and not isinstance(value, type):
+        return {field.name: to_json_data(getattr(value, field.name)) for field in fields(value)}
+    elif isinstance(value, dict):
+        return {key: to_json_data(item) for key, item in value.items()}
+    elif isinstance(value, (list, tuple, time.struct_time)):
+        return [to_json_data(item) for item in value]
+    elif isinstance(value, Enum):
+        return value.value
+    elif isinstance(value, datetime):
+        return value.isoformat()
+    return value
\ No newline at end of file
@@ -0,0 +1,25 @@
+import re
+
+_UNITS: dict[str, int] = {
+    "bytes": 1, "byte": 1, "b": 1,
+    "kib": 1 << 10, "mib": 1 << 20, "gib": 1 << 30, "tib": 1 << 40, "pib": 1 << 50,
+    "kb": 1000, "mb": 1000 ** 2, "gb": 1000 ** 3, "tb": 1000 ** 4, "pb": 1000 ** 5
+    }
+
+def parse_size(size: str) -> int:
+    """
+    Convert a size as displayed by nyaa, e.g. "1.4 GiB", to bytes.
+    
+    Parameters:
+        size (str): The size.
+    
+    Raises:
+        ValueError: If the size is not a number followed by a known unit.
+    
+    Returns:
+        int: The size in bytes.
+    """
+    match = re.fullmatch(r"\s*([\d.]+)\s*([A-Za-z]+)\s*", size)
+    if match is None or match[2].lower() not in _UNITS:
+        raise ValueError(f"Unknown size: {size}")
+    return int(float(match[1]) * _UNITS[match[2].lower()])
\ No newline at end of file
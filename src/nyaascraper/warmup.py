@@ -0,0 +1,186 @@
+from typing import Iterable
+import asyncio
+import ipaddress
+import socket
+import threading
+import time
+
+import httpcore
+import httpx
+
+from .instrumentation import Hooks, record_dns_time
+
+class DNSCache:
+    """
+    Cache of DNS lookups, shared by every client it is installed in.
+    
+    Lookups of the same host from concurrent connections are made once. Addresses are kept for
+    `ttl` seconds, as `getaddrinfo()` doesn't report the TTL of the records. A host whose addresses
+    all refuse connections is looked up again on the next connection.
+    """
+    TTL: float = 300.0
+    
+    def __init__(self: "DNSCache", ttl: float = TTL, hooks: Hooks | None = None) -> None:
+        """
+        Initialize the cache.
+        
+        Parameters:
+            ttl (float, optional): Seconds to keep the addresses of a host. Defaults to TTL.
+            hooks (Hooks | None, optional): Hooks to emit "cache_hit" events to, with keys like "dns:nyaa.si:443". Defaults to None.
+        """
+        self.ttl = ttl
+        self.hooks = hooks
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: dict[tuple[str, int], tuple[list[str], float]] = {}
+        self._lookups: dict[tuple[asyncio.AbstractEventLoop, str, int], asyncio.Task[list[str]]] = {}
+        self._lock = threading.Lock()
+    
+    async def resolve(self: "DNSCache", host: str, port: int) -> list[str]:
+        """
+        Get the addresses of a host, looking them up if not cached.
+        
+        Parameters:
+            host (str): The host name.
+            port (int): The port, as addresses can differ by service.
+        
+        Raises:
+            OSError: If the lookup failed.
+        
+        Returns:
+            list[str]: The IP addresses, in the order `getaddrinfo()` returned them.
+        """
+        with self._lock:
+            entry = self._entries.get((host, port))
+            hit = entry is not None and entry[1] > time.monotonic()
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if hit:
+            if self.hooks is not None:
+                self.hooks.emit("cache_hit", f"dns:{host}:{port}")
+            return entry[0]
+        
+        key = (asyncio.get_running_loop(), host, port)
+        if (lookup := self._lookups.get(key)) is None:
+            lookup = self._lookups[key] = asyncio.ensure_future(self._lookup(host, port))
+            lookup.add_done_callback(lambda task: self._done(key, task))
+        # A caller giving up doesn't cancel the lookup others may be waiting for.
+        return await asyncio.shield(lookup)
+    
+    async def _lookup(self: "DNSCache", host: str, port: int) -> list[str]:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            self._entries[(host, port)] = (addresses, time.monotonic() + self.ttl)
+        return addresses
+    
+    def _done(self: "DNSCache", key: tuple, task: asyncio.Task) -> None:
+        self._lookups.pop(key, None)
+        if not task.cancelled():
+            # Retrieve the exception, so it isn't logged if every caller gave up.
+            task.exception()
+    
+    def invalidate(self: "DNSCache", host: str, port: int) -> None:
+        """
+        Forget the addresses of a host.
+        
+        Parameters:
+            host (str): The host name.
+            port (int): The port.
+        """
+        with self._lock:
+            self._entries.pop((host, port), None)
+    
+    def clear(self: "DNSCache") -> None:
+        """
+        Forget all addresses.
+        """
+        with self._lock:
+            self._entries.clear()
+    
+    def install(self: "DNSCache", http_client: httpx.AsyncClient) -> None:
+        """
+        Make an HTTP client resolve host names through the cache.
+        
+        Parameters:
+            http_client (httpx.AsyncClient): The HTTP client. Its default transport and mounted transports are patched.
+        """
+        transports = [http_client._transport, *http_client._mounts.values()]
+        for transport in transports:
+            pool = getattr(transport, "_pool", None)
+            if isinstance(pool, httpcore.AsyncConnectionPool) and not isinstance(pool._network_backend, _CachingBackend):
+                pool._network_backend = _CachingBackend(self, pool._network_backend)
+
+class _CachingBackend(httpcore.AsyncNetworkBackend):
+    """
+    Network backend connecting to the addresses of a DNS cache.
+    
+    TLS still verifies and sends the host name, as httpcore passes it separately to `start_tls()`.
+    """
+    def __init__(self: "_CachingBackend", cache: DNSCache, backend: httpcore.AsyncNetworkBackend) -> None:
+        self.cache = cache
+        self.backend = backend
+    
+    async def connect_tcp(
+        self: "_CachingBackend",
+        host: str,
+        port: int,
+        timeout: float | None = None,
+        local_address: str | None = None,
+        socket_options: Iterable | None = None
+        ) -> httpcore.AsyncNetworkStream:
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            pass
+        else:
+            return await self.backend.connect_tcp(host, port, timeout, local_address, socket_options)
+        
+        started = time.perf_counter()
+        try:
+            addresses = await asyncio.wait_for(self.cache.resolve(host, port), timeout)
+        except asyncio.TimeoutError as exc:
+            raise httpcore.ConnectTimeout(f"Timed out resolving {host}") from exc
+        except OSError as exc:
+            raise httpcore.ConnectError(str(exc)) from exc
+        finally:
+            record_dns_time(time.perf_counter() - started)
+        
+        error: Exception = httpcore.ConnectError(f"No addresses found for {host}")
+        for address in addresses:
+            try:
+                return await self.backend.connect_tcp(address, port, timeout, local_address, socket_options)
+            except (httpcore.ConnectError, httpcore.ConnectTimeout) as exc:
+                error = exc
+        self.cache.invalidate(host, port)
+        raise error
+    
+    async def connect_unix_socket(
+        self: "_CachingBackend",
+        path: str,
+        timeout: float | None = None,
+        socket_options: Iterable | None = None
+        ) -> httpcore.AsyncNetworkStream:
+        return await self.backend.connect_unix_socket(path, timeout, socket_options)
+    
+    async def sleep(self: "_CachingBackend", seconds: float) -> None:
+        await self.backend.sleep(seconds)
+
+async def prewarm(http_client: httpx.AsyncClient, urls: Iterable[str], connections: int = 1) -> None:
+    """
+    Open pooled connections to the origins of URLs ahead of the first requests.
+    
+    Sends `connections` concurrent HEAD requests to each URL, which resolves the host, connects,
+    and completes the TLS handshake. The connections stay in the pool for its keep-alive expiry.
+    
+    Parameters:
+        http_client (httpx.AsyncClient): The HTTP client to warm up.
+        urls (Iterable[str]): The URLs.
+        connections (int, optional): The number of connections to open to each origin. Defaults to 1.
+    
+    Raises:
+        httpx.HTTPError: If a connection could not be opened.
+    """
+    await asyncio.gather(*(http_client.head(url) for url in dict.fromkeys(urls) for _ in range(connections)))
\ No newline at end of file
@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+def pytest_addoption(parser):
+    parser.addoption("--run-slow", action="store_true", help="Run tests marked as slow, like memory soaks.")
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "slow: a long-running test, skipped unless --run-slow is given.")
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--run-slow"):
+        return
+    skip = pytest.mark.skip(reason="Slow, run with --run-slow")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip)
\ No newline at end of file
@@ -0,0 +1,51 @@
+import threading
+
+from nyaascraper.archive import PageArchive
+
+def test_pages_are_written_by_the_writer_thread(tmp_path) -> None:
+    archive = PageArchive(str(tmp_path), write_batch_size=8)
+    writer_threads = set()
+    write_batch = archive._write_batch
+    
+    def recording_write_batch(connection, batch):
+        writer_threads.add(threading.current_thread())
+        write_batch(connection, batch)
+    
+    archive._write_batch = recording_write_batch
+    futures = [
+        archive.append("view", f"https://nyaa.si/view/{view_id}", 200, b"page %d" % view_id, fetched=view_id)
+        for view_id in range(1, 101)
+        ]
+    archive.flush()
+    
+    assert threading.current_thread() not in writer_threads
+    assert [future.result().id for future in futures] == list(range(1, 101))
+    assert archive.get("https://nyaa.si/view/42").content == b"page 42"
+    assert len(list(archive.entries(kind="view"))) == 100
+    archive.close()
+
+def test_close_stores_queued_pages(tmp_path) -> None:
+    archive = PageArchive(str(tmp_path))
+    for fetched in range(3):
+        archive.append("search", "https://nyaa.si/?q=test", 200, b"fetch %d" % fetched, fetched=fetched)
+    archive.close()
+    
+    archive = PageArchive(str(tmp_path))
+    assert archive.get("https://nyaa.si/?q=test").content == b"fetch 2"
+    assert archive.get("https://nyaa.si/?q=test", at=1).content == b"fetch 1"
+    assert archive.rebuild_index() == 3
+    archive.close()
+
+def test_write_errors_are_set_on_futures(tmp_path) -> None:
+    archive = PageArchive(str(tmp_path))
+    
+    def full_disk():
+        raise OSError("No space left on device")
+    
+    archive._writable_segment = full_disk
+    future = archive.append("view", "https://nyaa.si/view/1", 200, b"page")
+    archive.flush()
+    
+    assert isinstance(future.exception(), OSError)
+    assert list(archive.entries()) == []
+    archive.close()
\ No newline at end of file
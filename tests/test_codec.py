@@ -0,0 +1,93 @@
+from dataclasses import replace
+from datetime import datetime
+import json
+
+import pytest
+
+from nyaascraper import NyaaClient, NyaaRSSClient
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+from nyaascraper.models import (
+    SearchResult,
+    TorrentInfo,
+    NyaaRSSFeed,
+    MetainfoFile,
+    TorrentMetainfo,
+    TorrentDownload,
+    TrackerScrape
+    )
+from nyaascraper.utils import codec
+
+FORMATS = ["json", pytest.param("msgpack", marks=pytest.mark.skipif(codec._default_format() != "msgpack", reason="msgpack is not installed"))]
+
+def parsed_pages() -> list:
+    server = MockNyaaServer(MockNyaaConfig(rows=10, files=6, folders=2, comments=3))
+    client, rss_client = NyaaClient(), NyaaRSSClient()
+    client.base_url = rss_client.base_url = server.url
+    return [
+        client._parse_search_result(server.search_page()),
+        client._parse_torrent_info(server.view_page(1234)),
+        rss_client._parse_feed(server.feed_page()),
+        rss_client._parse_feed(server.feed_page(magnets=True), use_magnet=True)
+        ]
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_parsed_pages_round_trip(format) -> None:
+    for page in parsed_pages():
+        assert type(page).from_bytes(page.to_bytes(format)) == page
+
+@pytest.mark.parametrize("format", FORMATS)
+def test_none_and_optional_fields(format) -> None:
+    metainfo = TorrentMetainfo(
+        info_hash="0" * 40,
+        name="name",
+        total_size=3,
+        piece_length=16384,
+        piece_count=1,
+        files=[MetainfoFile("a/b", 3)],
+        trackers=[],
+        private=False
+        )
+    dated = replace(metainfo, comment="comment", created_by="tool", creation_date=datetime(2024, 1, 2, 3, 4, 5, 600000))
+    search_result, torrent_info = parsed_pages()[:2]
+    values = [
+        metainfo,
+        dated,
+        TorrentDownload("https://nyaa.si/download/1.torrent", metainfo, data=b"\x00\xffdata"),
+        TorrentDownload("https://nyaa.si/download/1.torrent", metainfo, path="name.torrent"),
+        TrackerScrape("0" * 40, "udp://tracker", None, None, None, error="timed out"),
+        replace(search_result, torrents=[], previous_page=None, next_page=None, available_pages=None),
+        replace(torrent_info, submitter=None, files=[])
+        ]
+    
+    for value in values:
+        assert type(value).from_bytes(value.to_bytes(format)) == value
+
+def test_format_is_detected() -> None:
+    metainfo = TorrentMetainfo("0" * 40, "name", 0, 16384, 0, [], [], True)
+    data = metainfo.to_bytes("json")
+    
+    assert data.startswith(b"[")
+    assert TorrentMetainfo.from_bytes(data) == metainfo
+    with pytest.raises(ValueError):
+        metainfo.to_bytes("xml")
+
+def test_version_mismatch() -> None:
+    metainfo = TorrentMetainfo("0" * 40, "name", 0, 16384, 0, [], [], True)
+    values = json.loads(metainfo.to_bytes("json"))
+    
+    # A field was added or removed by another version.
+    for changed in (values[:-1], values + [None]):
+        with pytest.raises(ValueError, match="Expected 11 fields of TorrentMetainfo"):
+            TorrentMetainfo.from_bytes(json.dumps(changed).encode())
+    
+    # An enum member that doesn't exist in this version.
+    search_result = parsed_pages()[0]
+    values = json.loads(search_result.to_bytes("json"))
+    values[0][0][0] = 1000
+    with pytest.raises(ValueError, match="Not an encoded SearchResult"):
+        SearchResult.from_bytes(json.dumps(values).encode())
+    
+    with pytest.raises(ValueError):
+        TorrentInfo.from_bytes(b'{"name": "not a model"}')
+    with pytest.raises(ValueError):
+        NyaaRSSFeed.from_bytes(metainfo.to_bytes("json"))
\ No newline at end of file
@@ -0,0 +1,121 @@
+import asyncio
+
+import httpx
+import pytest
+
+from nyaascraper import NyaaClient
+from nyaascraper.concurrency import AdaptiveConcurrency
+from nyaascraper.instrumentation import Hooks
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+
+def status_error(status_code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://nyaa.si/")
+    return httpx.HTTPStatusError("error", request=request, response=httpx.Response(status_code, request=request))
+
+def test_limit_grows_additively() -> None:
+    controller = AdaptiveConcurrency(initial=4)
+    
+    for _ in range(4):
+        controller._record(0.01, None)
+    assert controller.limit == 4
+    controller._record(0.01, None)
+    assert controller.limit == 5
+    
+    for _ in range(200):
+        controller._record(0.01, None)
+    limits = [4] + [sample.limit for sample in controller.history]
+    # About one more slot per round of `limit` successes.
+    assert all(later - earlier == 1 for earlier, later in zip(limits, limits[1:]))
+    assert {sample.reason for sample in controller.history} == {"increase"}
+    assert 20 <= controller.limit <= 22
+
+@pytest.mark.parametrize("error, reason", [
+    (status_error(429), "throttled"),
+    (status_error(503), "throttled"),
+    (httpx.ReadTimeout("timed out"), "timeout"),
+    (httpx.ConnectError("refused"), "error")
+    ])
+def test_limit_halves_on_back_off(error, reason) -> None:
+    samples = []
+    hooks = Hooks()
+    hooks.on("concurrency", samples.append)
+    controller = AdaptiveConcurrency(initial=16, hooks=hooks)
+    
+    controller._record(0.01, error)
+    
+    assert controller.limit == 8
+    assert [(sample.limit, sample.reason) for sample in samples] == [(8, reason)]
+
+def test_other_errors_are_ignored() -> None:
+    controller = AdaptiveConcurrency(initial=16)
+    controller._record(0.01, status_error(404))
+    controller._record(0.01, ValueError("parse error"))
+    
+    assert controller.limit == 16
+    assert not controller.history
+
+def test_limit_halves_on_latency_inflation() -> None:
+    controller = AdaptiveConcurrency(initial=16)
+    for _ in range(10):
+        controller._record(0.01, None)
+    limit = controller.limit
+    
+    controller._record(0.5, None)
+    
+    assert controller.limit == limit // 2
+    assert controller.history[-1].reason == "latency"
+
+def test_back_offs_within_one_latency_are_one_event() -> None:
+    controller = AdaptiveConcurrency(initial=16)
+    controller._record(10.0, None)
+    
+    controller._record(0.01, status_error(429))
+    controller._record(0.01, status_error(429))
+    
+    assert controller.limit == 8
+
+def test_limit_stays_within_bounds() -> None:
+    controller = AdaptiveConcurrency(initial=4, minimum=2, maximum=6)
+    for _ in range(1000):
+        controller._record(0.01, None)
+    assert controller.limit == 6
+    
+    controller._average_latency = None
+    for _ in range(10):
+        controller._record(0.01, status_error(429))
+    assert controller.limit == 2
+    
+    with pytest.raises(ValueError):
+        AdaptiveConcurrency(initial=1, minimum=2)
+
+def test_slots_are_limited() -> None:
+    async def main() -> None:
+        controller = AdaptiveConcurrency(initial=3, maximum=3)
+        peak = 0
+        
+        async def request() -> None:
+            nonlocal peak
+            async with controller.slot():
+                peak = max(peak, controller.in_flight)
+                await asyncio.sleep(0.01)
+        
+        await asyncio.gather(*(request() for _ in range(20)))
+        assert peak == 3
+        assert controller.in_flight == 0
+    
+    asyncio.run(main())
+
+def test_throttled_batch_backs_off() -> None:
+    async def main() -> None:
+        controller = AdaptiveConcurrency(initial=8)
+        async with MockNyaaServer(MockNyaaConfig(throttle_rate=1.0)) as server:
+            client = NyaaClient(concurrency=controller)
+            client.base_url = server.url
+            with pytest.raises(httpx.HTTPStatusError):
+                await client.get_torrent_infos(list(range(1, 9)))
+            await client._http_client.aclose()
+        
+        assert controller.limit < 8
+        assert controller.history[0].reason == "throttled"
+    
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,52 @@
+import asyncio
+import os
+import sqlite3
+
+from nyaascraper.crawl import WorkQueue, _work
+from nyaascraper.enums import SITE
+
+def test_expired_lease_is_leased_again(tmp_path) -> None:
+    queue = WorkQueue(os.path.join(tmp_path, "crawl.db"))
+    queue.add_view_range(1, 3)
+    
+    assert len(queue.lease("dead", 10, lease_seconds=-1)) == 2
+    tasks = queue.lease("alive", 10)
+    
+    assert [task.attempts for task in tasks] == [2, 2]
+    assert queue.lease("other", 10) == []
+    queue.close()
+
+def test_task_that_keeps_expiring_fails(tmp_path) -> None:
+    queue = WorkQueue(os.path.join(tmp_path, "crawl.db"))
+    queue.add_view_range(1, 2)
+    
+    for _ in range(WorkQueue.MAX_ATTEMPTS):
+        assert len(queue.lease("dead", 10, lease_seconds=-1)) == 1
+    
+    assert queue.lease("alive", 10) == []
+    assert queue.progress() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+    queue.close()
+
+def test_worker_waits_for_stranded_leases(tmp_path) -> None:
+    path = os.path.join(tmp_path, "crawl.db")
+    queue = WorkQueue(path)
+    # Unknown kinds fail without touching the network.
+    queue.add("unknown", [{}])
+    queue.lease("dead", 1, lease_seconds=0.2)
+    
+    asyncio.run(_work(path, SITE.FUN, "alive", 10, poll_interval=0.05))
+    
+    assert queue.progress() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+    queue.close()
+
+def test_shared_queue_uses_rollback_journal(tmp_path) -> None:
+    path = os.path.join(tmp_path, "crawl.db")
+    WorkQueue(path).close()
+    queue = WorkQueue(path, shared=True)
+    
+    assert queue._connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    queue.close()
+    
+    connection = sqlite3.connect(path)
+    assert connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    connection.close()
\ No newline at end of file
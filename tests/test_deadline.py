@@ -0,0 +1,107 @@
+import asyncio
+import time
+
+import pytest
+
+from nyaascraper import NyaaClient
+from nyaascraper.concurrency import AdaptiveConcurrency
+from nyaascraper.deadline import BatchResult, deadline, remaining, with_deadline
+from nyaascraper.exceptions import DeadlineExceededError
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+
+def test_nested_deadlines_take_tighter_bound() -> None:
+    async def main() -> None:
+        assert remaining() is None
+        with deadline(1.0) as outer:
+            assert 0.9 < remaining() <= 1.0
+            with deadline(0.1) as inner:
+                assert inner < outer
+                assert remaining() <= 0.1
+            with deadline(10.0) as inner:
+                assert inner == outer
+            with deadline(None) as inner:
+                assert inner == outer
+            
+            async def child() -> float | None:
+                return remaining()
+            
+            assert await asyncio.create_task(child()) <= 1.0
+        assert remaining() is None
+    
+    asyncio.run(main())
+
+def test_with_deadline_cancels_awaitable() -> None:
+    async def main() -> None:
+        cancelled = asyncio.Event()
+        
+        async def slow() -> str:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+            return "done"
+        
+        started = time.perf_counter()
+        with deadline(0.05), pytest.raises(DeadlineExceededError):
+            await with_deadline(slow())
+        assert time.perf_counter() - started < 1.0
+        assert cancelled.is_set()
+        
+        with deadline(0.05):
+            await asyncio.sleep(0.06)
+            assert remaining() < 0
+            with pytest.raises(DeadlineExceededError):
+                await with_deadline(asyncio.sleep(0, "late"))
+        
+        assert await with_deadline(asyncio.sleep(0, "no deadline")) == "no deadline"
+    
+    asyncio.run(main())
+
+def test_batch_result() -> None:
+    result = BatchResult(["a", None, "c"], incomplete=[2])
+    
+    assert result == ["a", None, "c"]
+    assert not result.complete
+    assert BatchResult(["a"]).complete
+    assert repr(result) == "BatchResult(['a', None, 'c'], incomplete=[2])"
+
+def test_expired_batch_is_partial() -> None:
+    async def main() -> None:
+        async with MockNyaaServer(MockNyaaConfig(latency=0.1)) as server:
+            # Two requests at a time: the first four finish after 0.2 seconds, the next two would after 0.3.
+            client = NyaaClient(concurrency=AdaptiveConcurrency(initial=2, maximum=2))
+            client.base_url = server.url
+            view_ids = list(range(1, 9))
+            
+            result = await client.get_torrent_infos(view_ids, deadline=0.25)
+            
+            assert all(torrent_info is not None for torrent_info in result[:4])
+            assert result[4:] == [None] * 4
+            assert result.incomplete == view_ids[4:]
+            assert not result.complete
+            # The requests cut off were cancelled and gave their connections back.
+            assert client.concurrency.in_flight == 0
+            pool = client._http_client._transport._pool
+            assert not pool._requests
+            assert all(connection.is_idle() for connection in pool.connections)
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_caller_deadline_bounds_batch() -> None:
+    async def main() -> None:
+        async with MockNyaaServer(MockNyaaConfig(latency=0.2)) as server:
+            client = NyaaClient()
+            client.base_url = server.url
+            
+            started = time.perf_counter()
+            with deadline(0.05):
+                result = await client.get_torrent_infos([1, 2, 3], deadline=10)
+            
+            assert time.perf_counter() - started < 0.2
+            assert result == [None, None, None]
+            assert result.incomplete == [1, 2, 3]
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+import httpx
+
+from nyaascraper import NyaaClient
+from nyaascraper.hedging import HedgePolicy, LatencyHistogram
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+
+def test_histogram_percentiles() -> None:
+    histogram = LatencyHistogram()
+    assert histogram.percentile(0.95) is None
+    
+    for _ in range(90):
+        histogram.record(0.01)
+    for _ in range(10):
+        histogram.record(1.0)
+    
+    assert 0.01 <= histogram.percentile(0.5) < 0.01 * LatencyHistogram.GROWTH
+    assert 1.0 <= histogram.percentile(0.95) < 1.0 * LatencyHistogram.GROWTH
+    assert [count for _, count in histogram.buckets()] == [90, 10]
+    
+    histogram.record(3600.0)
+    assert histogram.buckets()[-1] == (float("inf"), 1)
+
+async def warm(policy: HedgePolicy, kind: str) -> None:
+    async def send() -> httpx.Response:
+        return httpx.Response(200)
+    
+    for _ in range(policy.min_samples):
+        await policy.run(kind, send)
+
+def test_no_hedge_before_enough_samples() -> None:
+    async def main() -> None:
+        policy = HedgePolicy(min_samples=5, budget=1.0)
+        
+        async def send() -> httpx.Response:
+            await asyncio.sleep(0.05)
+            return httpx.Response(200)
+        
+        for _ in range(5):
+            await policy.run("view", send)
+        
+        assert policy.hedges == 0
+        assert policy.delay("view") is not None
+        assert policy.delay("search") is None
+    
+    asyncio.run(main())
+
+def test_hedge_fires_after_percentile_delay() -> None:
+    async def main() -> None:
+        policy = HedgePolicy(min_samples=5, min_delay=0.02, budget=1.0)
+        await warm(policy, "view")
+        assert policy.delay("view") == 0.02
+        
+        started = time.perf_counter()
+        sends = []
+        
+        async def send() -> httpx.Response:
+            sends.append((time.perf_counter() - started, asyncio.current_task()))
+            await asyncio.sleep(10.0 if len(sends) == 1 else 0.0)
+            return httpx.Response(200)
+        
+        response = await policy.run("view", send)
+        await asyncio.sleep(0)
+        
+        assert response.status_code == 200
+        assert time.perf_counter() - started < 1.0
+        assert (policy.hedges, policy.hedge_wins) == (1, 1)
+        (_, primary), (hedged_at, _) = sends
+        assert hedged_at >= 0.02
+        assert primary.cancelled()
+    
+    asyncio.run(main())
+
+def test_failed_hedge_falls_back_to_primary() -> None:
+    async def main() -> None:
+        policy = HedgePolicy(min_samples=5, min_delay=0.02, budget=1.0)
+        await warm(policy, "view")
+        calls = 0
+        
+        async def send() -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(0.1)
+                return httpx.Response(200)
+            return httpx.Response(503)
+        
+        response = await policy.run("view", send)
+        
+        assert response.status_code == 200
+        assert (policy.hedges, policy.hedge_wins) == (1, 0)
+    
+    asyncio.run(main())
+
+def test_budget_caps_hedges() -> None:
+    async def main() -> None:
+        policy = HedgePolicy(min_samples=5, min_delay=0.02, budget=0.1, burst=10.0)
+        await warm(policy, "view")
+        started = time.perf_counter()
+        
+        async def send() -> httpx.Response:
+            # Primaries are slow, hedges sent after the delay are fast.
+            await asyncio.sleep(0.3 if time.perf_counter() - started < 0.01 else 0.0)
+            return httpx.Response(200)
+        
+        await asyncio.gather(*(policy.run("view", send) for _ in range(20)))
+        
+        # 5 warm-up and 20 slow requests earn 2.5 tokens.
+        assert policy.requests == 25
+        assert policy.hedges == policy.hedge_wins == 2
+    
+    asyncio.run(main())
+
+def test_burst_caps_saved_tokens() -> None:
+    async def main() -> None:
+        policy = HedgePolicy(min_samples=50, min_delay=0.02, budget=0.1, burst=1.0)
+        await warm(policy, "view")
+        started = time.perf_counter()
+        
+        async def send() -> httpx.Response:
+            await asyncio.sleep(0.3 if time.perf_counter() - started < 0.01 else 0.0)
+            return httpx.Response(200)
+        
+        await asyncio.gather(*(policy.run("view", send) for _ in range(5)))
+        
+        assert policy.hedges == 1
+    
+    asyncio.run(main())
+
+def test_hedged_request_against_slow_server() -> None:
+    async def main() -> None:
+        policy = HedgePolicy(min_samples=5, min_delay=0.05, budget=1.0)
+        async with MockNyaaServer(MockNyaaConfig(rows=5)) as server:
+            client = NyaaClient(hedging=policy)
+            client.base_url = server.url
+            for _ in range(5):
+                await client.get_torrent_info(1)
+            
+            server.config.latency = 1.0
+            started = time.perf_counter()
+            request = asyncio.create_task(client.get_torrent_info(1))
+            # The primary is now delayed by the server, the hedge won't be.
+            await asyncio.sleep(0.02)
+            server.config.latency = 0.0
+            torrent_info = await request
+            elapsed = time.perf_counter() - started
+            await asyncio.sleep(0.01)
+            
+            assert torrent_info.name == server._name(1)
+            assert elapsed < 0.5
+            assert (policy.hedges, policy.hedge_wins) == (1, 1)
+            assert server.requests["view 200"] == 6
+            # The cancelled primary closed its connection instead of leaking it.
+            pool = client._http_client._transport._pool
+            assert not pool._requests
+            assert all(connection.is_idle() for connection in pool.connections)
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
\ No newline at end of file
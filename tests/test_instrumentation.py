@@ -0,0 +1,50 @@
+import asyncio
+
+from nyaascraper import NyaaClient
+from nyaascraper.instrumentation import Hooks
+from nyaascraper.loadtest import MockNyaaServer
+from nyaascraper.proxies import ProxyPool
+from nyaascraper.warmup import DNSCache
+
+def test_dns_time_and_cache_hits() -> None:
+    async def main() -> None:
+        hooks = Hooks()
+        requests, cache_hits = [], []
+        hooks.on("request", requests.append)
+        hooks.on("cache_hit", cache_hits.append)
+        dns_cache = DNSCache(hooks=hooks)
+        
+        async with MockNyaaServer() as server:
+            for _ in range(2):
+                client = NyaaClient(hooks=hooks, dns_cache=dns_cache)
+                client.base_url = f"http://localhost:{server.port}"
+                await client.search("test")
+                await client._http_client.aclose()
+        
+        assert len(requests) == 2
+        assert all(metrics.dns_time is not None for metrics in requests)
+        assert cache_hits == [f"dns:localhost:{server.port}"]
+    
+    asyncio.run(main())
+
+def test_proxy_retry_is_emitted() -> None:
+    async def main() -> None:
+        hooks = Hooks()
+        requests, retries = [], []
+        hooks.on("request", requests.append)
+        hooks.on("retry", retries.append)
+        
+        async with MockNyaaServer() as server:
+            # Nothing listens on port 1, so the first attempt fails and is retried on the mock server.
+            proxies = ProxyPool(["http://127.0.0.1:1", server.url], retries=1)
+            client = NyaaClient(hooks=hooks, proxies=proxies)
+            client.base_url = "http://nyaa.test"
+            await client.search("test")
+            await proxies.close()
+            await client._http_client.aclose()
+        
+        assert [metrics.retries for metrics in requests] == [0, 1]
+        assert requests[0].error is not None
+        assert retries == [requests[1]]
+    
+    asyncio.run(main())
\ No newline at end of file
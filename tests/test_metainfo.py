@@ -0,0 +1,66 @@
+import hashlib
+
+import pytest
+
+from nyaascraper.exceptions import BencodeError
+from nyaascraper.metainfo import parse_metainfo
+from nyaascraper.utils.bencode import MAX_DEPTH, bdecode, bencode
+
+def torrent(info: dict, **root: object) -> bytes:
+    return bencode({"announce": "udp://tracker.test:1337", "info": info, **root})
+
+def test_multi_file_torrent() -> None:
+    info = {
+        "name": "Show",
+        "piece length": 262144,
+        "pieces": b"\0" * 40,
+        "files": [
+            {"path": ["Season 1", "01.mkv"], "length": 100},
+            {"path": ["Season 1", "02.mkv"], "length": 200}
+            ]
+        }
+    metainfo = parse_metainfo(torrent(info, **{"creation date": 1700000000}))
+    
+    assert metainfo.info_hash == hashlib.sha1(bencode(info)).hexdigest()
+    assert [(file.path, file.size) for file in metainfo.files] == [("Season 1/01.mkv", 100), ("Season 1/02.mkv", 200)]
+    assert metainfo.total_size == 300
+    assert metainfo.piece_count == 2
+    assert metainfo.trackers == ["udp://tracker.test:1337"]
+
+@pytest.mark.parametrize(
+    "info",
+    [
+        {"name": "x", "files": "not a list"},
+        {"name": "x", "files": ["not a dict"]},
+        {"name": "x", "files": [{"length": 1}]},
+        {"name": "x", "files": [{"path": ["a", 1], "length": 1}]},
+        {"name": "x", "files": [{"path": ["a"]}]},
+        {"name": "x", "files": [{"path": ["a"], "length": "1"}]},
+        {"name": "x", "length": -1},
+        {"name": "x", "length": 1, "pieces": 5},
+        {"name": "x", "length": 1, "piece length": b"16"}
+        ],
+    ids=["files", "entry", "no-path", "path-part", "no-length", "length-type", "negative", "pieces", "piece-length"]
+    )
+def test_malformed_info_raises_bencode_error(info: dict) -> None:
+    with pytest.raises(BencodeError):
+        parse_metainfo(torrent(info))
+
+def test_malformed_optional_fields_are_ignored() -> None:
+    data = torrent({"name": "x", "length": 1}, **{"announce-list": [5, ["udp://b.test"]], "creation date": 10 ** 20})
+    metainfo = parse_metainfo(data)
+    
+    assert metainfo.trackers == ["udp://tracker.test:1337", "udp://b.test"]
+    assert metainfo.creation_date is None
+
+def test_nesting_depth_is_limited() -> None:
+    assert bdecode(b"l" * MAX_DEPTH + b"e" * MAX_DEPTH) is not None
+    with pytest.raises(BencodeError):
+        bdecode(b"l" * 100000 + b"e" * 100000)
+    with pytest.raises(BencodeError):
+        parse_metainfo(b"d4:info" + b"l" * 100000 + b"e" * 100000 + b"e")
+
+@pytest.mark.parametrize("data", [b"", b"d", b"i12", b"5:abc", b"d1:ai1e", b"di1ei2ee", b"le"])
+def test_truncated_or_invalid_data(data: bytes) -> None:
+    with pytest.raises(BencodeError):
+        parse_metainfo(data)
\ No newline at end of file
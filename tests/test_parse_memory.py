@@ -0,0 +1,100 @@
+from dataclasses import fields, is_dataclass
+import gc
+import tracemalloc
+import weakref
+
+from bs4 import BeautifulSoup
+from bs4.element import PageElement
+import pytest
+
+import nyaascraper.client
+from nyaascraper import NyaaClient, NyaaRSSClient
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+
+# Small pages, as parsing under tracemalloc is several times slower.
+FIXTURES = MockNyaaServer(MockNyaaConfig(rows=10, files=4, folders=2, comments=2))
+
+@pytest.fixture
+def documents(monkeypatch):
+    """
+    Record weak references to every element of the documents parsed by NyaaClient.
+    """
+    elements: list[weakref.ref] = []
+    
+    class RecordingSoup(BeautifulSoup):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            elements.append(weakref.ref(self))
+            elements.extend(weakref.ref(element) for element in self.descendants)
+    
+    monkeypatch.setattr(nyaascraper.client, "BeautifulSoup", RecordingSoup)
+    return elements
+
+def plain_values(value) -> list:
+    """
+    Collect every value of a parsed result, recursing into models and lists.
+    """
+    if is_dataclass(value):
+        return [item for field in fields(value) for item in plain_values(getattr(value, field.name))]
+    if isinstance(value, list):
+        return [item for element in value for item in plain_values(element)]
+    return [value]
+
+@pytest.mark.parametrize("page", ["search", "view"])
+def test_documents_are_freed_without_garbage_collection(documents, page) -> None:
+    client = NyaaClient()
+    gc.collect()
+    gc.disable()
+    try:
+        if page == "search":
+            result = client._parse_search_result(FIXTURES.search_page())
+        else:
+            result = client._parse_torrent_info(FIXTURES.view_page(1))
+        
+        # Freed by reference counting alone: nothing in the document is part of a reference cycle,
+        # and the held result doesn't reference it.
+        assert len(documents) > 100
+        assert [ref() for ref in documents if ref() is not None] == []
+    finally:
+        gc.enable()
+    assert not any(isinstance(value, PageElement) for value in plain_values(result))
+
+# A result that pinned its document would grow memory by over 100 KiB per cycle, so 40 cycles show it
+# clearly. The slow soak also catches leaks of a few hundred bytes per parse; run it with --run-slow.
+@pytest.mark.parametrize("cycles", [40, pytest.param(1000, marks=pytest.mark.slow)])
+def test_parse_memory_does_not_grow(cycles) -> None:
+    client, rss_client = NyaaClient(), NyaaRSSClient()
+    search_pages = [FIXTURES.search_page(page).encode() for page in range(1, 5)]
+    view_pages = [FIXTURES.view_page(view_id).encode() for view_id in range(1, 5)]
+    feed_pages = [FIXTURES.feed_page(), FIXTURES.feed_page(magnets=True)]
+    held = []
+    
+    def cycle(index: int) -> None:
+        held.append(client._parse_search_result(search_pages[index % len(search_pages)]))
+        held.append(client._parse_torrent_info(view_pages[index % len(view_pages)]))
+        held.append(rss_client._parse_feed(feed_pages[index % len(feed_pages)]))
+        del held[:-30]
+    
+    tracemalloc.start()
+    try:
+        # Warm up caches of bs4, feedparser and the parsers, and fill the held results.
+        for index in range(10):
+            cycle(index)
+        gc.collect()
+        baseline = tracemalloc.get_traced_memory()[0]
+        
+        for index in range(cycles):
+            cycle(index)
+        gc.collect()
+        growth = tracemalloc.get_traced_memory()[0] - baseline
+        
+        before = tracemalloc.get_traced_memory()[0]
+        held.clear()
+        gc.collect()
+        per_result = (before - tracemalloc.get_traced_memory()[0]) / 30
+    finally:
+        tracemalloc.stop()
+    
+    assert growth < 256 * 1024
+    # A result pinning its document holds about ten times more.
+    assert per_result < 32 * 1024
\ No newline at end of file
@@ -0,0 +1,222 @@
+import asyncio
+import socket
+import time
+
+import httpx
+import pytest
+
+from nyaascraper import NyaaClient
+from nyaascraper.enums import ProxyState
+from nyaascraper.instrumentation import Hooks
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+from nyaascraper.proxies import Proxy, ProxyPool
+
+# MockNyaaServer also answers requests in proxy form, so each server stands in for an egress proxy.
+BASE_URL = "http://nyaa.test"
+
+def recording_hooks() -> tuple[Hooks, list]:
+    samples = []
+    hooks = Hooks()
+    hooks.on("proxy", samples.append)
+    return hooks, samples
+
+def closed_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def respond(*status_codes: int, headers: dict[str, str] | None = None):
+    """
+    Get a send function answering with the given status codes in turn, then with 200.
+    """
+    status_codes = list(status_codes)
+    
+    async def send(http_client: httpx.AsyncClient) -> httpx.Response:
+        return httpx.Response(status_codes.pop(0) if status_codes else 200, headers=headers)
+    
+    return send
+
+def test_throttled_proxy_is_evicted_and_request_retried() -> None:
+    async def main() -> None:
+        hooks, samples = recording_hooks()
+        async with (
+            MockNyaaServer(MockNyaaConfig(throttle_rate=1.0)) as throttled,
+            MockNyaaServer() as healthy
+            ):
+            async with ProxyPool([throttled.url, healthy.url], hooks=hooks) as pool:
+                client = NyaaClient(proxies=pool)
+                client.base_url = BASE_URL
+                
+                assert (await client.get_torrent_info(1)).name == healthy._name(1)
+                assert (await client.get_torrent_info(2)).name == healthy._name(2)
+                await client._http_client.aclose()
+            
+            assert throttled.requests["view 429"] == 1
+            assert healthy.requests["view 200"] == 2
+            first, second = pool.proxies
+            assert first.state() is ProxyState.EVICTED
+            assert (first.requests, first.errors, first.failures) == (1, 1, 1)
+            assert second.state() is ProxyState.HEALTHY
+            assert pool.healthy() == [second]
+            assert [(sample.proxy, sample.state, sample.reason) for sample in samples] == [
+                (throttled.url, ProxyState.EVICTED, "throttled")
+                ]
+    
+    asyncio.run(main())
+
+def test_unreachable_proxy_is_evicted_and_request_retried() -> None:
+    async def main() -> None:
+        hooks, samples = recording_hooks()
+        unreachable = f"http://127.0.0.1:{closed_port()}"
+        async with MockNyaaServer() as healthy:
+            async with ProxyPool([unreachable, healthy.url], hooks=hooks) as pool:
+                client = NyaaClient(proxies=pool)
+                client.base_url = BASE_URL
+                
+                assert (await client.get_torrent_info(1)).name == healthy._name(1)
+                await client._http_client.aclose()
+        
+        assert pool.proxies[0].state() is ProxyState.EVICTED
+        assert [(sample.proxy, sample.reason) for sample in samples] == [(unreachable, "error")]
+    
+    asyncio.run(main())
+
+def test_failure_is_raised_without_healthy_proxies() -> None:
+    async def main() -> None:
+        async with ProxyPool([f"http://127.0.0.1:{closed_port()}"]) as pool:
+            client = NyaaClient(proxies=pool)
+            client.base_url = BASE_URL
+            with pytest.raises(httpx.ConnectError):
+                await client.get_torrent_info(1)
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+@pytest.mark.parametrize("status_code, reason", [(403, "blocked"), (429, "throttled"), (503, "throttled")])
+def test_blocked_and_throttled_proxies_are_evicted(status_code, reason) -> None:
+    async def main() -> None:
+        hooks, samples = recording_hooks()
+        pool = ProxyPool(["http://first.test", "http://second.test"], hooks=hooks)
+        
+        response = await pool.request(respond(status_code))
+        
+        assert response.status_code == 200
+        assert [proxy.state() for proxy in pool.proxies] == [ProxyState.EVICTED, ProxyState.HEALTHY]
+        assert [sample.reason for sample in samples] == [reason]
+        
+        # With no other proxy to retry on, the failed response is returned.
+        response = await pool.request(respond(status_code))
+        assert response.status_code == status_code
+        assert pool.healthy() == []
+    
+    asyncio.run(main())
+
+def test_cooldown_doubles_up_to_maximum() -> None:
+    async def main() -> None:
+        pool = ProxyPool(["http://proxy.test"], cooldown=0.05, max_cooldown=0.15, retries=0)
+        proxy = pool.proxies[0]
+        cooldowns = []
+        
+        for _ in range(4):
+            # Each request waits for the cooldown to end and probes the proxy.
+            await pool.request(respond(429))
+            cooldowns.append(proxy.evicted_until - time.monotonic())
+        
+        assert proxy.failures == 4
+        assert cooldowns == pytest.approx([0.05, 0.1, 0.15, 0.15], abs=0.02)
+    
+    asyncio.run(main())
+
+def test_retry_after_extends_cooldown() -> None:
+    async def main() -> None:
+        pool = ProxyPool(["http://proxy.test"], cooldown=0.05, retries=0)
+        proxy = pool.proxies[0]
+        
+        await pool.request(respond(429, headers={"Retry-After": "2"}))
+        assert proxy.evicted_until - time.monotonic() == pytest.approx(2.0, abs=0.05)
+        
+        # Retry-After can't shorten the cooldown.
+        proxy.evicted_until = None
+        proxy.failures = 0
+        pool.cooldown = 5.0
+        await pool.request(respond(429, headers={"Retry-After": "2"}))
+        assert proxy.evicted_until - time.monotonic() == pytest.approx(5.0, abs=0.05)
+    
+    asyncio.run(main())
+
+def test_probe_readmits_proxy() -> None:
+    async def main() -> None:
+        hooks, samples = recording_hooks()
+        pool = ProxyPool(["http://proxy.test"], cooldown=0.05, hooks=hooks)
+        proxy = pool.proxies[0]
+        await pool.request(respond(429))
+        assert proxy.state() is ProxyState.EVICTED
+        
+        seen = []
+        
+        async def send(http_client: httpx.AsyncClient) -> httpx.Response:
+            seen.append((proxy.state(), proxy.in_flight))
+            await asyncio.sleep(0.02)
+            return httpx.Response(200)
+        
+        await asyncio.gather(*(pool.request(send) for _ in range(3)))
+        
+        # One request probes the proxy alone, the others follow once it is healthy again.
+        assert seen == [(ProxyState.PROBING, 1), (ProxyState.HEALTHY, 1), (ProxyState.HEALTHY, 2)]
+        assert (proxy.state(), proxy.failures) == (ProxyState.HEALTHY, 0)
+        assert [(sample.state, sample.reason) for sample in samples] == [
+            (ProxyState.EVICTED, "throttled"),
+            (ProxyState.HEALTHY, "recovered")
+            ]
+    
+    asyncio.run(main())
+
+def test_failed_probe_evicts_again() -> None:
+    async def main() -> None:
+        pool = ProxyPool(["http://proxy.test"], cooldown=0.05, retries=0)
+        proxy = pool.proxies[0]
+        await pool.request(respond(429))
+        await asyncio.sleep(0.06)
+        assert proxy.state() is ProxyState.PROBING
+        
+        await pool.request(respond(503))
+        
+        assert proxy.state() is ProxyState.EVICTED
+        assert proxy.failures == 2
+    
+    asyncio.run(main())
+
+def test_rate_limit_per_proxy() -> None:
+    async def main() -> None:
+        pool = ProxyPool(["http://first.test", "http://second.test"], rate=20.0)
+        started = time.perf_counter()
+        
+        await asyncio.gather(*(pool.request(respond()) for _ in range(10)))
+        
+        # One request at once, then one every 0.05 seconds on each proxy.
+        assert 0.15 < time.perf_counter() - started < 0.5
+        assert min(proxy.requests for proxy in pool.proxies) >= 4
+    
+    asyncio.run(main())
+
+def test_least_loaded_proxy_is_chosen() -> None:
+    async def main() -> None:
+        pool = ProxyPool([Proxy("http://small.test", max_connections=1), Proxy("http://large.test", max_connections=4)])
+        urls = {proxy.http_client(pool.timeout): proxy.url for proxy in pool.proxies}
+        used = []
+        
+        async def send(http_client: httpx.AsyncClient) -> httpx.Response:
+            used.append(urls[http_client])
+            await asyncio.sleep(0.01)
+            return httpx.Response(200)
+        
+        await asyncio.gather(*(pool.request(send) for _ in range(5)))
+        
+        assert sorted(used) == ["http://large.test"] * 4 + ["http://small.test"]
+        await pool.close()
+    
+    asyncio.run(main())
+
+def test_pool_needs_proxies() -> None:
+    with pytest.raises(ValueError):
+        ProxyPool([])
\ No newline at end of file
@@ -0,0 +1,50 @@
+import pytest
+
+from nyaascraper.releases import ReleaseIndex, parse_release_name
+
+@pytest.mark.parametrize("name, title, season, episode, episode_end, is_batch", [
+    ("[SubsPlease] Sousou no Frieren - 12 (1080p) [ABCD1234].mkv", "Sousou no Frieren", None, 12, None, False),
+    ("[Erai-raws] Kimetsu no Yaiba S2 - 05v2 [1080p]", "Kimetsu no Yaiba", 2, 5, None, False),
+    ("Kimetsu no Yaiba 2nd Season - 05", "Kimetsu no Yaiba", 2, 5, None, False),
+    ("[Judas] Kimetsu no Yaiba (Season 2) [1080p] (Batch)", "Kimetsu no Yaiba", 2, None, None, True),
+    ("[Group] Title (01-12) [BD 1080p]", "Title", None, 1, 12, True),
+    ("[Group] Title (2019) [1080p]", "Title", None, None, None, False),
+    ("Title.S01E05.1080p.WEB-DL.x264-GROUP", "Title", 1, 5, None, False),
+    ])
+def test_parse_release_name(name, title, season, episode, episode_end, is_batch) -> None:
+    release = parse_release_name(name)
+    
+    assert release.title == title
+    assert release.season == season
+    assert release.episode == episode
+    assert release.episode_end == episode_end
+    assert release.is_batch == is_batch
+
+def test_parse_release_metadata() -> None:
+    release = parse_release_name("[SubsPlease] Sousou no Frieren - 12v2 (1080p) [ABCD1234].mkv")
+    
+    assert (release.group, release.version, release.resolution, release.checksum, release.extension) == (
+        "SubsPlease", 2, "1080p", "ABCD1234", "mkv"
+        )
+
+def test_find_by_season() -> None:
+    index = ReleaseIndex()
+    index.add(1, "[SubsPlease] Kimetsu no Yaiba - 05 (1080p)")
+    index.add(2, "[SubsPlease] Kimetsu no Yaiba S2 - 05 (1080p)")
+    index.add(3, "[Erai-raws] Kimetsu no Yaiba 2nd Season - 06 [720p]")
+    index.add(4, "[Judas] Kimetsu no Yaiba (Season 2) [1080p] (Batch)")
+    index.add(5, "[Judas] Kimetsu no Yaiba S2 (01-11) [1080p]")
+    index.add(6, "[SubsPlease] Kimetsu no Yaiba S01E06 (1080p)")
+    
+    assert index.find("Kimetsu no Yaiba", episode=5) == [1]
+    assert index.find("Kimetsu no Yaiba", season=1, episode=5) == [1]
+    assert index.find("Kimetsu no Yaiba", season=2, episode=5) == [2]
+    assert index.find("Kimetsu no Yaiba", season=2, episode=5, batches=True) == [5, 2]
+    assert index.find("Kimetsu no Yaiba", season=2, batches=True) == [5, 4, 3, 2]
+    assert index.find("Kimetsu no Yaiba") == [6, 3, 2, 1]
+    assert index.episodes("Kimetsu no Yaiba") == {5: [1], 6: [6]}
+    assert index.episodes("Kimetsu no Yaiba", season=2) == {5: [2], 6: [3]}
+    
+    index.remove(2)
+    assert index.find("Kimetsu no Yaiba", season=2, episode=5) == []
+    assert index.series() == ["kimetsu no yaiba"]
\ No newline at end of file
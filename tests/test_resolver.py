@@ -0,0 +1,89 @@
+import asyncio
+import base64
+import threading
+
+from nyaascraper import NyaaClient
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+from nyaascraper.resolver import InfoHashIndex, InfoHashResolver
+
+# Every search returns the newest torrents, View-IDs 100 to 26; their info hashes are the View-IDs in hex.
+CONFIG = MockNyaaConfig(rows=75, total_results=100, torrents=100)
+
+def info_hash(view_id: int) -> str:
+    return f"{view_id:040x}"
+
+def base32(info_hash: str) -> str:
+    return base64.b32encode(bytes.fromhex(info_hash)).decode()
+
+def test_index_normalizes_info_hashes() -> None:
+    index = InfoHashIndex()
+    index.add(base32(info_hash(1)), 1)
+    index.add(info_hash(2).upper(), 2)
+    index.add("not an info hash", 3)
+    
+    assert len(index) == 2
+    assert index.get(info_hash(1)) == 1
+    assert index.get(base32(info_hash(2)).lower()) == 2
+    assert index.get(info_hash(3)) is None
+    assert index.get("not an info hash") is None
+
+def test_sqlite_index_survives_reopening(tmp_path) -> None:
+    path = str(tmp_path / "index.db")
+    index = InfoHashIndex(path)
+    
+    def add(start: int) -> None:
+        index.add_many((info_hash(view_id), view_id) for view_id in range(start, start + 100))
+    
+    threads = [threading.Thread(target=add, args=(start,)) for start in range(0, 400, 100)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    index.add(info_hash(7), 8)
+    index.close()
+    
+    index = InfoHashIndex(path)
+    assert len(index) == 400
+    assert index.get(base32(info_hash(123))) == 123
+    assert index.get(info_hash(7)) == 8
+    assert index.get(info_hash(400)) is None
+    index.close()
+
+def test_resolver_searches_misses_once() -> None:
+    async def main() -> None:
+        async with MockNyaaServer(CONFIG) as server:
+            client = NyaaClient()
+            client.base_url = server.url
+            resolver = InfoHashResolver(client)
+            
+            hit, miss = info_hash(50), base32(info_hash(5))
+            assert await resolver.resolve([hit, miss, hit, "invalid"]) == {hit: 50, miss: None, "invalid": None}
+            assert server.requests["search 200"] == 2
+            # The search for the miss recorded every torrent on its page.
+            assert len(resolver.index) == 75
+            
+            assert await resolver.resolve([info_hash(60), hit]) == {info_hash(60): 60, hit: 50}
+            assert server.requests["search 200"] == 2
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_resolver_uses_index_of_client(tmp_path) -> None:
+    async def main() -> None:
+        index = InfoHashIndex(str(tmp_path / "index.db"))
+        index.add(info_hash(5), 5)
+        async with MockNyaaServer(CONFIG) as server:
+            client = NyaaClient(info_hash_index=index)
+            client.base_url = server.url
+            resolver = InfoHashResolver(client, InfoHashIndex())
+            
+            assert resolver.index is index
+            assert await resolver.resolve([info_hash(5)]) == {info_hash(5): 5}
+            assert not server.requests
+            
+            await client.search(term="test")
+            assert index.get(info_hash(100)) == 100
+            await client._http_client.aclose()
+        index.close()
+    
+    asyncio.run(main())
\ No newline at end of file
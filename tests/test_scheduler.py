@@ -0,0 +1,126 @@
+import asyncio
+
+from nyaascraper.enums import Priority
+from nyaascraper.scheduler import PriorityScheduler, current_priority, priority
+
+async def hold(scheduler: PriorityScheduler, release: asyncio.Event) -> None:
+    async with scheduler.slot():
+        await release.wait()
+
+async def queue(scheduler: PriorityScheduler, levels: list[Priority]) -> list[Priority]:
+    """
+    Queue requests of the given priorities behind a held slot and return the order they were admitted in.
+    """
+    order = []
+    
+    async def request(level: Priority) -> None:
+        async with scheduler.slot(level):
+            order.append(level)
+            await asyncio.sleep(0)
+    
+    release = asyncio.Event()
+    holder = asyncio.create_task(hold(scheduler, release))
+    await asyncio.sleep(0)
+    requests = [asyncio.create_task(request(level)) for level in levels]
+    await asyncio.sleep(0)
+    assert scheduler.waiting() == len(levels)
+    
+    release.set()
+    await asyncio.gather(holder, *requests)
+    assert scheduler.in_flight == 0
+    return order
+
+def test_waiters_are_served_by_priority() -> None:
+    async def main() -> None:
+        scheduler = PriorityScheduler(max_concurrency=1, min_shares={})
+        levels = [Priority.BULK, Priority.NORMAL, Priority.INTERACTIVE] * 3
+        
+        order = await queue(scheduler, levels)
+        
+        assert order == sorted(levels, key=list(Priority).index)
+    
+    asyncio.run(main())
+
+def test_bulk_gets_minimum_share() -> None:
+    async def main() -> None:
+        scheduler = PriorityScheduler(max_concurrency=1)
+        levels = [Priority.INTERACTIVE] * 50 + [Priority.BULK] * 5
+        
+        order = await queue(scheduler, levels)
+        
+        bulk = [index for index, level in enumerate(order) if level is Priority.BULK]
+        # Counting the held slot, every tenth grant goes to bulk work while it is waiting.
+        assert bulk == [9, 19, 29, 39, 49]
+        assert scheduler.granted[Priority.BULK] == 5
+    
+    asyncio.run(main())
+
+def test_bulk_is_starved_without_minimum_share() -> None:
+    async def main() -> None:
+        scheduler = PriorityScheduler(max_concurrency=1, min_shares={})
+        levels = [Priority.INTERACTIVE] * 50 + [Priority.BULK] * 5
+        
+        order = await queue(scheduler, levels)
+        
+        assert order[-5:] == [Priority.BULK] * 5
+    
+    asyncio.run(main())
+
+def test_cancelled_waiter_leaves_queue() -> None:
+    async def main() -> None:
+        scheduler = PriorityScheduler(max_concurrency=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(scheduler, release))
+        await asyncio.sleep(0)
+        
+        waiter = asyncio.create_task(hold(scheduler, asyncio.Event()))
+        await asyncio.sleep(0)
+        assert scheduler.waiting() == 1
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        assert scheduler.waiting() == 0
+        
+        release.set()
+        await holder
+        assert scheduler.in_flight == 0
+    
+    asyncio.run(main())
+
+def test_slot_granted_to_cancelled_waiter_is_passed_on() -> None:
+    async def main() -> None:
+        scheduler = PriorityScheduler(max_concurrency=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(scheduler, release))
+        await asyncio.sleep(0)
+        
+        first = asyncio.create_task(hold(scheduler, asyncio.Event()))
+        second_release = asyncio.Event()
+        second = asyncio.create_task(hold(scheduler, second_release))
+        await asyncio.sleep(0)
+        
+        release.set()
+        await holder
+        # The slot is granted to the first waiter, which is cancelled before it runs.
+        assert scheduler.waiting() == 1
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+        
+        assert scheduler.in_flight == 1
+        assert scheduler.waiting() == 0
+        second_release.set()
+        await second
+        assert scheduler.in_flight == 0
+    
+    asyncio.run(main())
+
+def test_priority_reaches_spawned_tasks() -> None:
+    async def main() -> None:
+        assert current_priority() is None
+        with priority(Priority.BULK):
+            assert await asyncio.create_task(asyncio.sleep(0, current_priority())) is Priority.BULK
+            with priority(Priority.INTERACTIVE):
+                assert current_priority() is Priority.INTERACTIVE
+            assert current_priority() is Priority.BULK
+        assert current_priority() is None
+    
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,103 @@
+import asyncio
+
+import pytest
+
+from nyaascraper import NyaaRSSClient
+from nyaascraper.loadtest import MockNyaaServer
+from nyaascraper.server import FeedHub
+
+def test_latest_is_served_from_snapshot() -> None:
+    async def main() -> None:
+        async with MockNyaaServer() as server:
+            client = NyaaRSSClient()
+            client.base_url = server.url
+            hub = FeedHub(client, poll_interval=60)
+            key = hub.feed_key(term="test")
+            
+            first = await hub.latest(key)
+            second = await hub.latest(key)
+            
+            assert second is first
+            assert server.requests["feed 200"] == 1
+            assert hub.stats()["feeds"] == 0
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_poller_survives_unexpected_errors() -> None:
+    async def main() -> None:
+        async with MockNyaaServer() as server:
+            client = NyaaRSSClient()
+            client.base_url = server.url
+            get_feed = client.get_feed
+            calls = 0
+            
+            async def flaky_get_feed(**kwargs):
+                nonlocal calls
+                calls += 1
+                if calls == 1:
+                    raise AttributeError("unexpected feed layout")
+                return await get_feed(**kwargs)
+            
+            client.get_feed = flaky_get_feed
+            hub = FeedHub(client, poll_interval=0.01)
+            key = hub.feed_key(term="test")
+            
+            with pytest.raises(LookupError):
+                await asyncio.wait_for(hub.latest(key), 5)
+            
+            subscription = hub.subscribe(key)
+            for _ in range(100):
+                if hub.polls:
+                    break
+                await asyncio.sleep(0.01)
+            
+            assert hub.errors == 1
+            assert hub.polls >= 1
+            assert (await hub.latest(key)).torrents
+            subscription.close()
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_finished_poller_is_restarted() -> None:
+    async def main() -> None:
+        async with MockNyaaServer() as server:
+            client = NyaaRSSClient()
+            client.base_url = server.url
+            hub = FeedHub(client, poll_interval=60)
+            key = hub.feed_key(term="test")
+            
+            subscription = hub.subscribe(key)
+            poller = hub._pollers[key]
+            poller.cancel()
+            await asyncio.sleep(0.01)
+            
+            assert key not in hub._pollers
+            
+            other = hub.subscribe(key)
+            assert hub._pollers[key] is not poller
+            assert (await asyncio.wait_for(hub.latest(key), 5)).torrents
+            subscription.close()
+            other.close()
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_latest_right_after_unsubscribe() -> None:
+    async def main() -> None:
+        async with MockNyaaServer() as server:
+            client = NyaaRSSClient()
+            client.base_url = server.url
+            hub = FeedHub(client, poll_interval=60)
+            key = hub.feed_key(term="test")
+            
+            hub.subscribe(key).close()
+            # The cancelled poller finishes while the new one is fetching.
+            feed = await asyncio.wait_for(hub.latest(key), 5)
+            
+            assert feed.torrents
+            assert server.requests["feed 200"] == 1
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,40 @@
+from nyaascraper.enums import FunCategory, TorrentType
+from nyaascraper.models import NyaaRSSTorrent
+from nyaascraper.subscriptions import Subscription, SubscriptionIndex
+
+def torrent(name, category=FunCategory.ANIME__ENGLISH_TRANSLATED, torrent_type=TorrentType.TRUSTED):
+    return NyaaRSSTorrent(torrent_type, 1, name, category, "1 GiB", "", None, None, None, 0, 0, 0, "hash", "", 0)
+
+SUBSCRIPTIONS = [
+    Subscription("keywords", ["one piece", "1080p"]),
+    Subscription("excluded", ["one piece"], exclude=["480p"], categories=[FunCategory.ANIME]),
+    Subscription("audio", categories=[FunCategory.AUDIO]),
+    Subscription("uploader", uploader="SubsPlease", categories=[FunCategory.ANIME]),
+    Subscription("remakes", torrent_types=[TorrentType.REMAKE]),
+    ]
+
+def test_keyword_subscriptions() -> None:
+    index = SubscriptionIndex(SUBSCRIPTIONS)
+    
+    assert index.match(torrent("[SubsPlease] One Piece - 1120 (1080p).mkv")) == ["keywords", "excluded"]
+    assert index.match(torrent("[X] One Piece - 12 (480p)")) == []
+    assert index.match(torrent("Someone Piecemeal (1080p)")) == []
+
+def test_subscriptions_without_keywords() -> None:
+    index = SubscriptionIndex(SUBSCRIPTIONS)
+    
+    assert index.match(torrent("Song", FunCategory.AUDIO__LOSSY)) == ["audio"]
+    assert index.match(torrent("Song", FunCategory.AUDIO__LOSSY), uploader="subsplease") == ["audio"]
+    assert index.match(torrent("Show"), uploader="subsplease") == ["uploader"]
+    assert index.match(torrent("Show", FunCategory.LITERATURE), uploader="subsplease") == []
+    assert index.match(torrent("Show")) == []
+    assert index.match(torrent("Show", torrent_type=TorrentType.REMAKE)) == ["remakes"]
+
+def test_keywordless_subscriptions_are_not_scanned_for_every_torrent() -> None:
+    subscriptions = [Subscription(index, uploader=f"user{index}") for index in range(1000)]
+    subscriptions += [Subscription("audio", categories=[FunCategory.AUDIO])]
+    index = SubscriptionIndex(subscriptions)
+    
+    assert index._unindexed == []
+    assert index.match(torrent("Show"), uploader="user7") == [7]
+    assert index.match(torrent("Song", FunCategory.AUDIO__LOSSLESS), uploader="user7") == [7, "audio"]
\ No newline at end of file
@@ -0,0 +1,59 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+
+import pytest
+
+from nyaascraper import NyaaSyncClient
+from nyaascraper.archive import PageArchive
+from nyaascraper.loadtest import MockNyaaServer
+from nyaascraper.resolver import InfoHashIndex
+
+@pytest.fixture
+def server():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    server = MockNyaaServer()
+    asyncio.run_coroutine_threadsafe(server.start(), loop).result()
+    yield server
+    asyncio.run_coroutine_threadsafe(server.close(), loop).result()
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+def test_file_backed_options(server, tmp_path) -> None:
+    index = InfoHashIndex(os.path.join(tmp_path, "index.db"))
+    archive = PageArchive(os.path.join(tmp_path, "archive"))
+    
+    with NyaaSyncClient(info_hash_index=index, archive=archive) as client:
+        client.async_client.base_url = server.url
+        result = client.search(term="test")
+    
+    assert len(index) == len(result.torrents)
+    assert [entry.kind for entry in archive.entries()] == ["search"]
+    archive.close()
+    index.close()
+
+def _search_in_child(client: NyaaSyncClient, errors: multiprocessing.Queue) -> None:
+    try:
+        client.search(term="test")
+    except RuntimeError as exc:
+        errors.put(str(exc))
+    else:
+        errors.put(None)
+
+def test_process_bound_options_are_refused_after_fork(tmp_path) -> None:
+    context = multiprocessing.get_context("fork")
+    errors = context.Queue()
+    index = InfoHashIndex(os.path.join(tmp_path, "index.db"))
+    client = NyaaSyncClient(info_hash_index=index)
+    
+    process = context.Process(target=_search_in_child, args=(client, errors))
+    process.start()
+    error = errors.get(timeout=30)
+    process.join()
+    
+    assert error is not None and "info_hash_index" in error
+    index.close()
\ No newline at end of file
@@ -0,0 +1,83 @@
+import asyncio
+import math
+
+import pytest
+
+from nyaascraper import NyaaClient
+from nyaascraper.enums import SortBy, SortOrder
+from nyaascraper.loadtest import MockNyaaConfig, MockNyaaServer
+
+# 10 pages of 10 torrents per search, with distinct View-IDs whose seeders interleave.
+CONFIG = MockNyaaConfig(rows=10, total_results=100, torrents=10000)
+TERMS = ["a", "b", "s"]
+
+async def search_all(client: NyaaClient, term: str) -> list:
+    torrents, page = [], 1
+    while page is not None:
+        result = await client.search(term=term, sort_by=SortBy.SEEDERS, sort_order=SortOrder.DESCENDING, page=page)
+        torrents += result.torrents
+        page = result.next_page
+    return torrents
+
+@pytest.mark.parametrize("k", [5, 30, 50, 100, 300])
+def test_search_top_matches_full_sort(k) -> None:
+    async def main() -> None:
+        async with MockNyaaServer(CONFIG) as server:
+            client = NyaaClient()
+            client.base_url = server.url
+            
+            pages = {term: await search_all(client, term) for term in TERMS}
+            assert server.requests["search 200"] == 30
+            everything = [(term, torrent) for term in TERMS for torrent in pages[term]]
+            ranked = sorted(everything, key=lambda entry: entry[1].seeders, reverse=True)[:k]
+            
+            server.requests.clear()
+            top = await client.search_top([{"term": term} for term in TERMS], k)
+            
+            assert len(top) == min(k, len(everything))
+            assert len({torrent.view_id for torrent in top}) == len(top)
+            assert [torrent.seeders for torrent in top] == [torrent.seeders for _, torrent in ranked]
+            # Ties at the cut-off may be broken either way.
+            cutoff = ranked[-1][1].seeders
+            assert (
+                {torrent.view_id for torrent in top if torrent.seeders > cutoff}
+                == {torrent.view_id for _, torrent in ranked if torrent.seeders > cutoff}
+                )
+            
+            # Each search fetches the pages its share of the top K is on, and at most one page ahead.
+            needed = sum(
+                max(1, math.ceil(sum(1 for term_, _ in ranked if term_ == term) / CONFIG.rows))
+                for term in TERMS
+                )
+            assert needed <= server.requests["search 200"] <= needed + 1
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_search_top_fetches_first_pages_only_for_small_k() -> None:
+    async def main() -> None:
+        async with MockNyaaServer(CONFIG) as server:
+            client = NyaaClient()
+            client.base_url = server.url
+            
+            top = await client.search_top([{"term": term} for term in TERMS], 5, sort_by=SortBy.SEEDERS)
+            
+            assert len(top) == 5
+            assert server.requests["search 200"] == len(TERMS)
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_search_top_ascending() -> None:
+    async def main() -> None:
+        async with MockNyaaServer(CONFIG) as server:
+            client = NyaaClient()
+            client.base_url = server.url
+            
+            top = await client.search_top([{"term": "a"}], 15, sort_by=SortBy.SIZE, sort_order=SortOrder.ASCENDING)
+            full = sorted(await search_all(client, "a"), key=lambda torrent: torrent.view_id % 1000)
+            
+            assert [torrent.view_id for torrent in top] == [torrent.view_id for torrent in full[:15]]
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,80 @@
+import asyncio
+import hashlib
+
+import httpx
+
+from nyaascraper.loadtest import MockTracker
+from nyaascraper.tracker import TrackerScraper
+from nyaascraper.utils.bencode import bencode
+
+INFO_HASHES = [hashlib.sha1(str(index).encode()).hexdigest() for index in range(120)]
+
+def expected(info_hash: str) -> tuple[int, int, int]:
+    return MockTracker.counts(bytes.fromhex(info_hash))
+
+def counts(scrape) -> tuple:
+    return scrape.seeders, scrape.leechers, scrape.completed
+
+def test_udp_scrape_with_dropped_packets() -> None:
+    async def main() -> None:
+        async with MockTracker(drop_rate=0.3, seed=1) as tracker:
+            scraper = TrackerScraper(timeout=0.2, retries=8)
+            results = await scraper.scrape(tracker.udp_url, INFO_HASHES)
+            await scraper.close()
+        
+        assert sorted(results) == sorted(INFO_HASHES)
+        for info_hash, scrape in results.items():
+            assert scrape.error is None
+            assert counts(scrape) == expected(info_hash)
+        assert tracker.udp_packets >= 2
+    
+    asyncio.run(main())
+
+def test_http_scrape() -> None:
+    async def main() -> None:
+        async with MockTracker() as tracker:
+            scraper = TrackerScraper()
+            results = await scraper.scrape(tracker.http_url, INFO_HASHES)
+            await scraper.close()
+        
+        assert tracker.http_requests == 3
+        for info_hash, scrape in results.items():
+            assert scrape.error is None
+            assert counts(scrape) == expected(info_hash)
+    
+    asyncio.run(main())
+
+def test_http_tracker_omitting_hashes() -> None:
+    async def main() -> None:
+        async with MockTracker(omit_rate=0.5, seed=1) as tracker:
+            scraper = TrackerScraper()
+            results = await scraper.scrape(tracker.http_url, INFO_HASHES)
+            await scraper.close()
+        
+        omitted = [scrape for scrape in results.values() if scrape.error is not None]
+        reported = [scrape for scrape in results.values() if scrape.error is None]
+        assert omitted and reported
+        assert all(counts(scrape) == (None, None, None) for scrape in omitted)
+        assert all(counts(scrape) == expected(scrape.info_hash) for scrape in reported)
+    
+    asyncio.run(main())
+
+def test_malformed_http_scrape() -> None:
+    info_hash = INFO_HASHES[0]
+    responses = [
+        {b"files": [b"not", b"a", b"dict"]},
+        {b"files": {bytes.fromhex(info_hash): {b"complete": b"many"}}},
+        {b"files": {bytes.fromhex(info_hash): [1, 2, 3]}}
+        ]
+    
+    async def main() -> None:
+        for response in responses:
+            http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, content=bencode(response))))
+            scraper = TrackerScraper(http_client=http_client)
+            scrape = (await scraper.scrape("http://tracker.test/announce", [info_hash]))[info_hash]
+            await http_client.aclose()
+            
+            assert scrape.error == "Malformed scrape response"
+            assert counts(scrape) == (None, None, None)
+    
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,130 @@
+import asyncio
+import socket
+
+import httpx
+import pytest
+
+from nyaascraper import NyaaClient
+from nyaascraper.loadtest import MockNyaaServer
+from nyaascraper.warmup import DNSCache, prewarm
+
+def count_lookups(monkeypatch) -> list[str]:
+    """
+    Count the getaddrinfo() calls of the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    lookups = []
+    getaddrinfo = loop.getaddrinfo
+    
+    async def counting(host, *args, **kwargs):
+        lookups.append(host)
+        return await getaddrinfo(host, *args, **kwargs)
+    
+    monkeypatch.setattr(loop, "getaddrinfo", counting)
+    return lookups
+
+def test_addresses_expire_after_ttl(monkeypatch) -> None:
+    async def main() -> None:
+        lookups = count_lookups(monkeypatch)
+        cache = DNSCache(ttl=0.05)
+        
+        addresses = await cache.resolve("localhost", 80)
+        assert addresses
+        assert await cache.resolve("localhost", 80) == addresses
+        assert (cache.hits, cache.misses, len(lookups)) == (1, 1, 1)
+        
+        await asyncio.sleep(0.06)
+        await cache.resolve("localhost", 80)
+        assert (cache.hits, cache.misses, len(lookups)) == (1, 2, 2)
+        
+        cache.invalidate("localhost", 80)
+        await cache.resolve("localhost", 80)
+        assert len(lookups) == 3
+    
+    asyncio.run(main())
+
+def test_concurrent_lookups_are_made_once(monkeypatch) -> None:
+    async def main() -> None:
+        lookups = count_lookups(monkeypatch)
+        cache = DNSCache()
+        
+        results = await asyncio.gather(*(cache.resolve("localhost", 80) for _ in range(10)))
+        
+        assert lookups == ["localhost"]
+        assert all(result == results[0] for result in results)
+    
+    asyncio.run(main())
+
+def test_cache_is_shared_between_clients(monkeypatch) -> None:
+    async def main() -> None:
+        lookups = count_lookups(monkeypatch)
+        cache = DNSCache()
+        async with MockNyaaServer() as server:
+            clients = [NyaaClient(dns_cache=cache) for _ in range(3)]
+            for client in clients:
+                client.base_url = f"http://localhost:{server.port}"
+            
+            await asyncio.gather(*(client.search("test") for client in clients))
+            
+            assert lookups == ["localhost"]
+            assert server.requests["search 200"] == 3
+            for client in clients:
+                await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_refused_host_is_looked_up_again(monkeypatch) -> None:
+    async def main() -> None:
+        lookups = count_lookups(monkeypatch)
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        cache = DNSCache()
+        client = NyaaClient(dns_cache=cache)
+        client.base_url = f"http://localhost:{port}"
+        
+        for _ in range(2):
+            with pytest.raises(httpx.ConnectError):
+                await client.search("test")
+        
+        assert lookups == ["localhost", "localhost"]
+        await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_host_without_addresses_fails_to_connect(monkeypatch) -> None:
+    async def main() -> None:
+        cache = DNSCache()
+        
+        async def resolve(host: str, port: int) -> list[str]:
+            return []
+        
+        monkeypatch.setattr(cache, "resolve", resolve)
+        client = NyaaClient(dns_cache=cache)
+        client.base_url = "http://nyaa.test"
+        
+        with pytest.raises(httpx.ConnectError, match="No addresses found for nyaa.test"):
+            await client.search("test")
+        await client._http_client.aclose()
+    
+    asyncio.run(main())
+
+def test_prewarm_opens_connections() -> None:
+    async def main() -> None:
+        async with MockNyaaServer() as server:
+            client = NyaaClient(dns_cache=DNSCache())
+            client.base_url = f"http://localhost:{server.port}"
+            
+            await client.warmup(connections=3)
+            assert len(server._connections) == 3
+            
+            # The requests reuse the warm connections instead of opening new ones.
+            await asyncio.gather(*(client.search("test") for _ in range(3)))
+            assert len(server._connections) == 3
+            assert server.requests["search 200"] == 6
+            
+            await prewarm(client._http_client, [f"{client.base_url}/view/1"])
+            assert len(server._connections) == 3
+            await client._http_client.aclose()
+    
+    asyncio.run(main())
\ No newline at end of file